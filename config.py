@@ -45,10 +45,30 @@ SOLVER_ABNORMAL_ERROR_STATUS = 4
 SOLVER_MODEL_INVALID_ERROR_STATUS = 5
 # solve() function is yet to be called.
 SOLVER_MODEL_NOT_SOLVED_ERROR_STATUS = 6
+# Found a feasible solution which is not proven optimal, without a timeout (e.g. by the approximate engine).
+SOLVER_FEASIBLE_NOT_PROVEN_STATUS = 7
 
 SOLVER_TIME_LIMIT = int(0.5 * HOUR)
-SOLVER_NAMES = ["SAT", "CP_SAT", "SAT", "GLPK", "GUROBI"]
+# The native CP-SAT solver (the other solvers are used through the pywraplp linear solver wrapper).
+NATIVE_CP_SAT_SOLVER_NAME = "NATIVE_CP_SAT"
+# The approximate engine (a lazy greedy and a swap local search, without a solver), a fast but not necessarily optimal
+# mode.
+APPROXIMATE_SOLVER_NAME = "APPROXIMATE"
+SOLVER_NAMES = ["SAT", "CP_SAT", "SAT", "GLPK", "GUROBI", NATIVE_CP_SAT_SOLVER_NAME, APPROXIMATE_SOLVER_NAME]
 SOLVER_NAME = SOLVER_NAMES[0]
+# Race a portfolio of solvers (pywraplp solver name and solver specific parameters) in parallel worker processes, the
+# first member that proves optimality (or infeasibility or unboundedness) wins and the others are stopped.
+SOLVER_PORTFOLIO = False
+SOLVER_PORTFOLIO_MEMBERS = [("CP_SAT", "num_workers:8"), ("SCIP", ""), ("CP_SAT", "num_workers:1")]
+# The number of parallel workers of the native CP-SAT solver (0 means using all the available cores).
+CP_SAT_NUM_WORKERS = 0
+# The max factor for scaling the (fractional) score values to integers in the native CP-SAT solver, if the exact
+# scaling factor (the lcm of the score values denominators) is larger, the score values are rounded.
+CP_SAT_MAX_SCALING_FACTOR = 10 ** 9
+# The time budget (in seconds) of the approximate engine local search, and whether to calculate the bound gap of the
+# approximate committee (an upper bound of the optimum, only for concave score functions).
+APPROXIMATE_TIME_BUDGET = 1
+APPROXIMATE_BOUND_GAP = True
 SCORE_RULES = {
     'Chamberlin-Courant': score_functions.cc_thiele_function,
     'Proportional Approval Voting': score_functions.pav_thiele_function,
@@ -61,6 +81,75 @@ SCORE_FUNCTION = SCORE_RULES[SCORE_RULE_NAME]
 LIFTED_INFERENCE = True
 MINIMIZE_VOTER_CONTRIBUTION_EQUATIONS = True
 MINIMIZE_DC_CONSTRAINTS_EQUATIONS = True
+# The budget of the greedy DC hypercliques cover (with MINIMIZE_DC_CONSTRAINTS_EQUATIONS) - the max contraction time
+# (sec) of each DC, after which the uncovered DC sets are kept as they are, and the max size of a hyperclique.
+DC_CONTRACTION_TIME_BUDGET = 10
+DC_CONTRACTION_MAX_CLIQUE_SIZE = 200
+# Extract the DC tuples from the db in chunks of rows (instead of the whole distinct join), removing the duplicates by a
+# vectorized rows sort, hence the extraction memory depends on the chunk size and the distinct DC sets.
+DC_STREAMING_EXTRACTION = True
+DC_EXTRACTION_CHUNK_SIZE = 100000
+# Extract a single ordering of the values of interchangeable DC committee members (with the same tables atoms and
+# symmetric comparison atoms), by adding ordering comparison atoms to the DC join (instead of all their permutations).
+ORDER_INTERCHANGEABLE_COMMITTEE_MEMBERS = True
+# Plan the constraints join queries - filter each table in its own subquery (by the candidates ids range, the constants
+# and its own comparison atoms), project only the needed variables, and join the tables in the order of their estimated
+# cardinality (from the ANALYZE statistics), and whether to log the SQLite query plan of each join query.
+JOIN_QUERY_PLANNER = True
+LOG_QUERY_PLAN = False
+# Join an inequality comparison atom between two tables of a planned join query (such as a price or a runtime
+# comparison) by index range probes, materializing the inner table (with at least the min estimated number of rows)
+# into an indexed temporary table, instead of a nested loop over all the rows pairs.
+INEQUALITY_RANGE_JOINS = True
+RANGE_JOIN_MIN_ROWS = 1000
+# Model the voters score contribution with ordered slots of decreasing weights (instead of the general abs value
+# formulation), whenever the score function is known to be concave.
+CONCAVE_SCORE_FORMULATION = True
+# Fold the approval profile into a single weight per candidate (without any voter variables), whenever the score
+# function is known to be linear.
+LINEAR_SCORE_FORMULATION = True
+# Construct the ABC setting model in bulk (from arrays over dense candidates and voters indices) instead of a
+# per-expression construction, and whether to name the model variables (naming slows down the construction).
+BULK_MODEL_CONSTRUCTION = True
+NAME_MODEL_VARIABLES = False
+# Find a feasible committee by a constraint aware sequential Thiele greedy, and pass it to the solver as a solution
+# hint (warm start).
+GREEDY_WARM_START = True
+# Compile DCs of the form 'no k committee members share the same attribute value' and TGDs of the form 'for each
+# attribute value there are at least k committee members with it' into a single counting constraint per attribute
+# value (extracted with a GROUP BY query, instead of a k-way self join).
+COMPILE_CARDINALITY_CONSTRAINTS = True
+# Extract a TGD with a single joined query of both sides (grouping the right hand side representatives per left hand
+# side assignment), instead of a right hand side query per left hand side assignment.
+BATCH_TGD_EXTRACTION = True
+# Copy the db to the current experiment directory for each experiment (instead of opening the shared db file as a read
+# only immutable file).
+COPY_DATABASE = False
+# Cache the data extracted from the db (the ABC setting and the DC/TGD tuples) on disk, under the experiments results
+# folder, keyed by the db file fingerprint, the constraint definition, the ids ranges and the approval threshold (the
+# least recently used entries are evicted above the size limit, in bytes).
+EXTRACTION_CACHE = False
+EXTRACTION_CACHE_FOLDER_PATH = os.path.join('..', 'results', 'extraction_cache')
+EXTRACTION_CACHE_SIZE_LIMIT = 2 * 1024 ** 3
+# Run the sweep runners incrementally: the ticking voters runner keeps one model and adds only the new voters in each
+# step, the ticking committee size runner keeps one model (defined for the largest committee size) and updates only the
+# committee size, and every step is warm started from the committee of the previous step (the district runner, where
+# the candidates and the committee size grow, uses only the warm start).
+INCREMENTAL_SWEEP = True
+# Check the feasibility of the contextual constraints alone (only the committee size, the DCs and the TGDs, without the
+# voters) before extracting the ABC setting, and report an infeasible model (and the constraint causing it) right away.
+# Each pre-check solve has a short time limit (in milliseconds), and an inconclusive pre-check is ignored (the
+# experiment runs as usual).
+CONSTRAINTS_FEASIBILITY_PRE_CHECK = True
+FEASIBILITY_PRE_CHECK_SOLVER_NAME = "CP_SAT"
+FEASIBILITY_PRE_CHECK_TIME_LIMIT = 10 * 1000
+# Presolve the contextual constraints (a unit propagation over the extracted DCs and TGDs) before the model is
+# constructed - fix the candidates that must be in the committee, remove the candidates that cannot be in it, the
+# constraints that are always satisfied, and the voters that approve none of the remaining candidates.
+PRESOLVE = True
+# Detect the classes of interchangeable candidates (the same approving voters, and symmetric in all the contextual
+# constraints), and restrict the committee to the first members of each class (lexicographic symmetry breaking).
+CANDIDATES_SYMMETRY_BREAKING = True
 # --------------------------------------------------------------------------------
 
 # DB and dataset configuration:
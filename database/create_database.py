@@ -32,6 +32,28 @@ def create_voting_table(cur, con, voting_table_path: str):
     df.to_sql(config.VOTING_TABLE_NAME, con, if_exists='append', index=False)
 
 
+def create_indexes(cur, con, indexes: list):
+    """Create the (covering) indexes for the extraction queries, and collect the tables statistics for the query
+    planner.
+
+    :param cur: The db cursor.
+    :param con: The db connection.
+    :param indexes: A list of tuples of the table name and the index columns names (in the index order).
+    """
+    for table_name, columns_names in indexes:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_{'_'.join(columns_names)}_index "
+                    f"ON {table_name} ({', '.join(columns_names)})")
+    cur.execute("ANALYZE")
+    con.commit()
+
+
+# The approval profile queries filter on the voters ids range, the candidates ids range and the approval threshold, so
+# this index covers them (and turns them into a range scan on the voters ids).
+VOTING_TABLE_INDEXES = [
+    (config.VOTING_TABLE_NAME, [config.VOTERS_COLUMN_NAME, config.CANDIDATES_COLUMN_NAME, config.APPROVAL_COLUMN_NAME]),
+]
+
+
 # Example DB:
 # ---------------------------------------------------------------------------
 def create_tests_db(cur):
@@ -113,6 +135,9 @@ def create_tests_db_main():
 
     create_tests_db(cur)
 
+    create_indexes(cur, con, VOTING_TABLE_INDEXES +
+                   [(config.CANDIDATES_TABLE_NAME, ['genres', config.CANDIDATES_COLUMN_NAME])])
+
     # Committing changes.
     con.commit()
     # Closing the connection.
@@ -265,6 +290,10 @@ def trip_advisor_create_database_main():
                                      f"voting_table.csv"))
     create_trip_advisor_candidates_table(cur, con)
 
+    create_indexes(cur, con, VOTING_TABLE_INDEXES +
+                   [(config.CANDIDATES_TABLE_NAME, ['location', 'price_range_extended', config.CANDIDATES_COLUMN_NAME]),
+                    ('hotel_location', ['location', config.CANDIDATES_COLUMN_NAME])])
+
     # Committing changes.
     con.commit()
     # Closing the connection.
@@ -472,6 +501,15 @@ def the_movies_database_create_database_main():
     create_movies_voting_table(cur, con)
     create_movies_candidates_table(cur, con)
 
+    create_indexes(cur, con, VOTING_TABLE_INDEXES +
+                   [('movie_genre', ['genre', config.CANDIDATES_COLUMN_NAME]),
+                    ('movie_genre', [config.CANDIDATES_COLUMN_NAME, 'genre']),
+                    ('movie_original_language', ['original_language', config.CANDIDATES_COLUMN_NAME]),
+                    ('movie_original_language', [config.CANDIDATES_COLUMN_NAME, 'original_language']),
+                    ('movie_runtime', ['runtime', config.CANDIDATES_COLUMN_NAME]),
+                    ('movie_runtime', [config.CANDIDATES_COLUMN_NAME, 'runtime']),
+                    ('movie_spoken_languages', [config.CANDIDATES_COLUMN_NAME, 'spoken_language'])])
+
     # Committing changes.
     con.commit()
     # Closing the connection.
@@ -679,6 +717,12 @@ def glasgow_create_database_main():
     for i in range(1, 22):
         create_glasgow_voting_table(cur, con, i)
 
+    create_indexes(cur, con, VOTING_TABLE_INDEXES +
+                   [(config.CANDIDATES_TABLE_NAME, ['party', config.CANDIDATES_COLUMN_NAME]),
+                    (config.CANDIDATES_TABLE_NAME, ['district', config.CANDIDATES_COLUMN_NAME]),
+                    ('candidate_party', ['party', config.CANDIDATES_COLUMN_NAME]),
+                    ('candidate_district', ['district_number', config.CANDIDATES_COLUMN_NAME])])
+
     # Committing changes.
     con.commit()
     # Closing the connection.
@@ -1,21 +1,164 @@
+import os
+from urllib.request import pathname2url
+
 from sqlalchemy.engine import URL
+import numpy as np
 import pandas as pd
 import sqlalchemy as sa
 import sqlite3
 
 
+# The number of compiled (prepared) statements that are cached per connection, a statement is reused when the same
+# query text is executed again (with different bound parameters).
+STATEMENT_CACHE_SIZE = 256
+# Read oriented connection settings - memory map up to 1GB of the db file, a 256MB page cache (a negative value is in
+# KiB), and in memory temporary tables (used by DISTINCT, ORDER BY and GROUP BY).
+READ_PRAGMAS = {
+    'mmap_size': 2 ** 30,
+    'cache_size': -(2 ** 18),
+    'temp_store': 'MEMORY',
+}
+
+
 class Database:
-    def __init__(self, database_path: str):
-        # Connect the db in the current working directory,
-        # implicitly creating one if it does not exist.
-        self._con = sqlite3.connect(database_path)
+    def __init__(self, database_path: str, read_only: bool = False):
+        """A SQLite database engine.
+
+        :param database_path: The db file path.
+        :param read_only: Whether to open the db as a read only immutable file (no locks and no journal, hence many
+        engines can share the same file concurrently, the file must not be changed while it is open).
+        """
+        self.database_path = database_path
+        if read_only:
+            database_uri = f"file:{pathname2url(os.path.abspath(database_path))}?mode=ro&immutable=1"
+            self._con = sqlite3.connect(database_uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+        else:
+            # Connect the db in the current working directory,
+            # implicitly creating one if it does not exist.
+            self._con = sqlite3.connect(database_path, cached_statements=STATEMENT_CACHE_SIZE)
 
         # Creating a curser.
         self._cur = self._con.cursor()
+        # The tables statistics for the query planner (see get_table_statistics), by the table name.
+        self._tables_statistics = dict()
+        for pragma_name, pragma_value in READ_PRAGMAS.items():
+            self._cur.execute(f"PRAGMA {pragma_name}={pragma_value}")
+
+    def _execute(self, query: str, parameters) -> tuple:
+        # Execute the query once, and fetch the resulted columns names and rows.
+        self._cur.execute(query, parameters)
+        columns = [column_description[0] for column_description in self._cur.description]
+        return columns, self._cur.fetchall()
+
+    def run_query(self, query: str, parameters=()) -> pd.DataFrame:
+        """Run a query on the database.
+
+        :param query: An input SQL query (could contain '?' placeholders).
+        :param parameters: The values bound to the query placeholders.
+        :return: The query dataframe result.
+        """
+        columns, rows = self._execute(query, parameters)
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    def run_query_columns(self, query: str, parameters=()) -> dict:
+        """Run a query on the database, and get a columnar result (for callers that do not need a dataframe).
+
+        :param query: An input SQL query (could contain '?' placeholders).
+        :param parameters: The values bound to the query placeholders.
+        :return: A dict with the column name as key, and the column values (NumPy array, where integer columns are
+        downcast to the smallest integer type) as value.
+        """
+        columns, rows = self._execute(query, parameters)
+        columns_values = list(zip(*rows)) if len(rows) > 0 else [()] * len(columns)
+        return {column: to_compact_array(column_values) for column, column_values in zip(columns, columns_values)}
+
+    def run_query_chunks(self, query: str, parameters=(), chunk_size: int = 100000):
+        """Run a query on the database, and fetch the result rows in chunks (hence the whole result is never held in
+        memory at once).
+
+        :param query: An input SQL query (could contain '?' placeholders).
+        :param parameters: The values bound to the query placeholders.
+        :param chunk_size: The max number of rows in a chunk.
+        :return: A generator of the result chunks, each is a tuple of the columns names and a list of the rows.
+        """
+        # A cursor of its own, hence other queries can run while the chunks are consumed.
+        cursor = self._con.cursor()
+        try:
+            cursor.execute(query, parameters)
+            columns = [column_description[0] for column_description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if len(rows) == 0:
+                    break
+                yield columns, rows
+        finally:
+            cursor.close()
 
-    def run_query(self, query: str):
-        self._cur.execute(query)
-        return pd.read_sql_query(query, self._con)
+    def get_table_statistics(self, table_name: str) -> tuple:
+        """Get the statistics of a table for the query planner (from sqlite_stat1, collected by ANALYZE), the number of
+        rows is counted when there are no statistics.
+
+        :param table_name: The table name.
+        :return: A tuple of the number of rows, and a dict with the column name as key, and the average number of rows
+        per column value as value (for the primary key and the first columns of the analyzed indexes).
+        """
+        if table_name in self._tables_statistics:
+            return self._tables_statistics[table_name]
+        rows_number = None
+        columns_rows_per_value = dict()
+        table_columns = self._cur.execute(f"PRAGMA table_info({table_name})").fetchall()
+        primary_key_columns = [column[1] for column in table_columns if column[5] > 0]
+        if len(primary_key_columns) == 1:
+            columns_rows_per_value[primary_key_columns[0]] = 1
+        if self._cur.execute("SELECT name FROM sqlite_master WHERE name='sqlite_stat1'").fetchone() is not None:
+            for index_name, index_statistics in self._cur.execute(
+                    "SELECT idx, stat FROM sqlite_stat1 WHERE tbl=?", (table_name,)).fetchall():
+                index_statistics = [int(value) for value in str(index_statistics).split() if value.isdigit()]
+                if len(index_statistics) == 0:
+                    continue
+                rows_number = index_statistics[0]
+                if index_name is not None and len(index_statistics) > 1:
+                    index_columns = self._cur.execute(f"PRAGMA index_info({index_name})").fetchall()
+                    if len(index_columns) > 0:
+                        columns_rows_per_value.setdefault(index_columns[0][2], index_statistics[1])
+        if rows_number is None:
+            rows_number = self._cur.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        self._tables_statistics[table_name] = (rows_number, columns_rows_per_value)
+        return self._tables_statistics[table_name]
+
+    def explain_query_plan(self, query: str, parameters=()) -> str:
+        """Get the SQLite query plan of a query.
+
+        :param query: An input SQL query (could contain '?' placeholders).
+        :param parameters: The values bound to the query placeholders.
+        :return: The query plan, a line per plan step (indented by its depth).
+        """
+        plan_steps = self._cur.execute("EXPLAIN QUERY PLAN " + query, parameters).fetchall()
+        steps_depths = dict()
+        plan_lines = []
+        for step_id, parent_id, _, step_description in plan_steps:
+            steps_depths[step_id] = steps_depths.get(parent_id, -1) + 1
+            plan_lines.append('  ' * steps_depths[step_id] + step_description)
+        return '\n'.join(plan_lines)
+
+    def create_temporary_table(self, table_name: str, query: str, parameters=(), index_columns: list = ()) -> None:
+        """Create a temporary table (of this connection only, kept in memory) with a query result, and an index.
+
+        :param table_name: The temporary table name.
+        :param query: An input SQL query (could contain '?' placeholders).
+        :param parameters: The values bound to the query placeholders.
+        :param index_columns: The index columns names (in the index order), no index if empty.
+        """
+        self._cur.execute(f"CREATE TEMP TABLE {table_name} AS {query}", parameters)
+        if len(index_columns) > 0:
+            self._cur.execute(f"CREATE INDEX temp.{table_name}_index ON {table_name} ({', '.join(index_columns)})")
+
+    def drop_temporary_table(self, table_name: str) -> None:
+        """Drop a temporary table (see create_temporary_table).
+
+        :param table_name: The temporary table name.
+        """
+        self._cur.execute(f"DROP TABLE IF EXISTS temp.{table_name}")
 
     def __del__(self):
         try:
@@ -28,6 +171,25 @@ class Database:
             pass
 
 
+def to_compact_array(values) -> np.ndarray:
+    """Convert column values to a NumPy array, where integer values are downcast to the smallest integer type.
+
+    :param values: A sequence of the column values.
+    :return: The column array (of objects, for text, mixed or empty columns).
+    """
+    if len(values) == 0:
+        return np.array(values, dtype=object)
+    array = np.array(values)
+    if array.dtype.kind == 'i':
+        for integer_type in (np.int8, np.int16, np.int32):
+            if np.iinfo(integer_type).min <= array.min() and array.max() <= np.iinfo(integer_type).max:
+                return array.astype(integer_type)
+        return array
+    if array.dtype.kind == 'f':
+        return array
+    return np.array(values, dtype=object)
+
+
 def database_connect(server_name: str, database_name: str, username='', password='') -> sa.engine.Engine:
     """Establish a connection with SQL database server.
 
@@ -70,8 +70,11 @@ def advanced_abc_settings_input(selected_db: str):
         # User input - solver settings.
         solver_timeout = st.number_input("Solver time limit (in minutes)", min_value=1, step=1,
                                          value=int(config.SOLVER_TIME_LIMIT / (1000 * 60)))
+        approximate_mode = st.checkbox("Fast approximate mode (the committee is not necessarily optimal)",
+                                       value=config.SOLVER_NAME == config.APPROXIMATE_SOLVER_NAME)
 
-    return voters_starting_point, voters_group_size, candidates_starting_point, candidates_group_size, solver_timeout
+    return voters_starting_point, voters_group_size, candidates_starting_point, candidates_group_size, \
+        solver_timeout, approximate_mode
 
 
 def present_selected_configuration(selected_db, selected_rule, committee_size, tgds, dcs, voters_starting_point,
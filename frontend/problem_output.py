@@ -78,9 +78,30 @@ def present_solver_results(db: Database, experiment_results_row_df: pd.DataFrame
                 st.dataframe(experiment_results_row_df)
 
     elif experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_PROVEN_INFEASIBLE_STATUS:
-        st.write("Model proven infeasible.")
+        if 'infeasible_constraint' in experiment_results_row_df and \
+                experiment_results_row_df['infeasible_constraint'].iloc[-1] != '-':
+            st.write(f"Model proven infeasible, due to the "
+                     f"{experiment_results_row_df['infeasible_constraint'].iloc[-1]} constraint.")
+        else:
+            st.write("Model proven infeasible.")
     elif experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_PROVEN_UNBOUNDED_STATUS:
         st.write("Model proven unbounded.")
+    elif experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS or \
+            (experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS and
+             experiment_results_row_df['resulted_committee'].iloc[-1] != '-'):
+        # A feasible committee that is not proven optimal (found by the approximate engine, or by a timed out solver).
+        if experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS:
+            st.write("The winning committee is not proven optimal - due to solver timeout.")
+        else:
+            st.write("The winning committee is not proven optimal.")
+        if 'approximation_bound_gap' in experiment_results_row_df and \
+                experiment_results_row_df['approximation_bound_gap'].iloc[-1] != '-':
+            st.write(f"The committee score is at least "
+                     f"{1 - experiment_results_row_df['approximation_bound_gap'].iloc[-1]:.2%} of the optimal score.")
+        candidates_summary_df = get_candidates_summary_df(experiment_results_row_df['resulted_committee'].iloc[-1],
+                                                          db)
+        present_experiment_results_and_summary(committee_size, candidates_summary_df, experiment_results_row_df,
+                                               selected_db, voting_rule)
     elif experiment_results_row_df['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS:
         st.write("No winning committee found - due to solver timeout.")
     else:
@@ -87,18 +87,20 @@ def extract_table_names(db_name: str) -> List[str]:
                     "FROM sqlite_master\n" \
                     "WHERE type='table';"
 
-    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name))
-    result = db_engine.run_query(EXTRACT_QUERY)
+    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name),
+                                                   read_only=True)
+    result = db_engine.run_query_columns(EXTRACT_QUERY)
     db_engine.__del__()
     return result['table_name'].tolist()
 
 
 def extract_table_attributes(db_name: str, table_name: str) -> List[str]:
-    EXTRACT_QUERY = f"PRAGMA\n" \
-                    f"table_info('{table_name}');"
+    EXTRACT_QUERY = "SELECT name\n" \
+                    "FROM pragma_table_info(?);"
 
-    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name))
-    result = db_engine.run_query(EXTRACT_QUERY)
+    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name),
+                                                   read_only=True)
+    result = db_engine.run_query_columns(EXTRACT_QUERY, (table_name,))
     db_engine.__del__()
     return result['name'].tolist()
 
@@ -147,10 +149,11 @@ def set_text_input_style(
 def extract_table_size(db_name: str, table_name: str, column_name: str):
     EXTRACT_QUERY = f"SELECT COUNT(DISTINCT {column_name}) AS distinct_value_count\n" \
                     f"FROM {table_name};"
-    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name))
-    result = db_engine.run_query(EXTRACT_QUERY)
+    db_engine = database_server_interface.Database(os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, db_name),
+                                                   read_only=True)
+    result = db_engine.run_query_columns(EXTRACT_QUERY)
     db_engine.__del__()
-    return result['distinct_value_count'][0]
+    return int(result['distinct_value_count'][0])
 
 
 def create_cols_for_buffer(cols_relation: list, left_buffer: Optional[str] = None, right_buffer: Optional[str] = None, alignment: str = "bottom") -> st.delta_generator.DeltaGenerator:
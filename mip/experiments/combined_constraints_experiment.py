@@ -13,6 +13,11 @@ import mip.mip_db_data_extractors.abc_setting_extractor as abc_setting_extractor
 import mip.mip_db_data_extractors.dc_extractor as dc_extractor
 import mip.mip_db_data_extractors.tgd_extractor as tgd_extractor
 import mip.experiments.experiment as experiment
+import mip.mip_reduction.abc_approximate_engine as abc_approximate_engine
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.candidates_symmetry as candidates_symmetry
+import mip.mip_reduction.mip_convertor as mip_convertor
+import mip.mip_reduction.presolve as presolve
 
 MODULE_NAME = "Combined Constraint Experiment"
 
@@ -56,14 +61,34 @@ class CombinedConstraintsExperiment(experiment.Experiment):
         """
         super().__init__(experiment_name, database_name)
 
-        # Copy the required db to the experiment folder.
-        config.copy_db(self._database_name)
-
         self._candidates_starting_point = candidates_starting_point
         self._voters_starting_point = voters_starting_point
         self._voters_group_size = voters_size_limit
         self._candidates_group_size = candidates_size_limit
         self._committee_size = committee_size
+        # Whether the constraints are already extracted and converted (in a previous run of the experiment).
+        self._constraints_extracted = False
+        # The resulted committee of the last run (None if no committee was found).
+        self.resulted_committee = None
+        # The name of the constraint that makes the contextual constraints infeasible (None if they are not proven
+        # infeasible by the feasibility pre-check), the pre-check result ('feasible', 'infeasible' or 'inconclusive',
+        # '-' if it didn't run) and its time.
+        self.infeasible_constraint = None
+        self.feasibility_check_result = '-'
+        self.feasibility_check_time = 0
+        # Whether the contextual constraints are guarded by activation literals (see guard_constraints).
+        self._constraints_guarded = False
+        # The contextual constraints presolve results - the fixed (forced in) candidates, the number of removed
+        # candidates (forced out), voters and constraints (DC sets, TGD tuples and compiled groups), and its time.
+        self.presolve_fixed_candidates = set()
+        self.presolve_removed_candidates = 0
+        self.presolve_removed_constraints = 0
+        self.presolve_time = 0
+        # The classes of interchangeable candidates (restricted by symmetry breaking constraints), and their detection
+        # time. Whether the experiment model should be kept extensible with new voters (see keep_voters_extensible).
+        self.candidates_classes = []
+        self.symmetry_detection_time = 0
+        self._voters_extensible = False
 
         # Create the data extractors.
         self._dc_db_extractors = []
@@ -104,41 +129,248 @@ class CombinedConstraintsExperiment(experiment.Experiment):
             config.SCORE_FUNCTION)
 
     def extract_and_convert_all_constraints(self):
-        self._abc_setting_extractor.extract_and_convert()
-        for curr_dc_extractor in self._dc_db_extractors:
-            curr_dc_extractor.extract_and_convert()
-        for curr_tgd_extractor in self._tgd_db_extractors:
-            curr_tgd_extractor.extract_and_convert()
+        # The contextual constraints are extracted first, and if they are infeasible the ABC setting is not extracted.
+        for constraint_extractor in self._dc_db_extractors + self._tgd_db_extractors:
+            constraint_extractor.extract_data_from_db()
+        if config.CONSTRAINTS_FEASIBILITY_PRE_CHECK and not self._constraints_guarded:
+            # (Guarded constraints are all defined in the model, even if only some of them are active).
+            self._check_constraints_feasibility()
+            if self.infeasible_constraint is not None:
+                # Nothing else is extracted or converted.
+                self._abc_setting_extractor.extract_data_timer = 0
+                for extractor in [self._abc_setting_extractor] + self._dc_db_extractors + self._tgd_db_extractors:
+                    extractor.convert_to_mip_timer = 0
+                return
+        self._abc_setting_extractor.extract_data_from_db()
+        if config.PRESOLVE and not self._constraints_guarded:
+            # (Guarded constraints could be inactive, hence their implications are not propagated).
+            self._presolve()
+        self._abc_setting_extractor.convert_to_mip()
+        for constraint_extractor in self._dc_db_extractors + self._tgd_db_extractors:
+            constraint_extractor.convert_to_mip()
+        if len(self.presolve_fixed_candidates) > 0:
+            self._abc_convertor.fix_candidates(self.presolve_fixed_candidates)
+        if config.CANDIDATES_SYMMETRY_BREAKING and not self._constraints_guarded and not self._voters_extensible:
+            # (The candidates are interchangeable only with respect to all the constraints and the current voters).
+            self._break_candidates_symmetry()
+
+    def _collect_constraints(self) -> presolve.ConstraintsCollector:
+        # The extracted contextual constraints of all the extractors.
+        constraints_collector = presolve.ConstraintsCollector()
+        for constraint_extractor in self._dc_db_extractors + self._tgd_db_extractors:
+            constraint_extractor.define_constraint(constraints_collector)
+        return constraints_collector
+
+    def _break_candidates_symmetry(self) -> None:
+        # Add lexicographic ordering rows over each class of interchangeable candidates.
+        start = time.time()
+        constraints_collector = self._collect_constraints()
+        constraints = candidates_symmetry.get_constraints_set(
+            constraints_collector.dc_candidates_sets, constraints_collector.tgd_tuples_list,
+            constraints_collector.dc_cardinality_groups, constraints_collector.tgd_cardinality_groups)
+        # The fixed candidates are not interchangeable with the other candidates.
+        self.candidates_classes = candidates_symmetry.find_symmetric_candidates_classes(
+            self._abc_setting_extractor.get_candidates_ids_set() - self.presolve_fixed_candidates,
+            self._abc_setting_extractor.get_approval_profile(), constraints)
+        self._abc_convertor.define_candidates_symmetry_breaking(self.candidates_classes)
+        config.debug_print(MODULE_NAME, f"Found {len(self.candidates_classes)} classes of interchangeable "
+                                        f"candidates.\n")
+        self.symmetry_detection_time = time.time() - start
+
+    def _presolve(self) -> None:
+        # Propagate the candidates forced in or out by the contextual constraints, and reduce the constraints and the
+        # ABC setting accordingly.
+        start = time.time()
+        constraints_extractors = self._dc_db_extractors + self._tgd_db_extractors
+        constraints_collector = self._collect_constraints()
+        forced_candidates = presolve.propagate_constraints(
+            self._abc_setting_extractor.get_candidates_ids_set(), constraints_collector.dc_candidates_sets,
+            constraints_collector.tgd_tuples_list, constraints_collector.dc_cardinality_groups,
+            constraints_collector.tgd_cardinality_groups)
+        if forced_candidates is None:
+            # The constraints are infeasible, the model is constructed as is (and proven infeasible by the solver).
+            config.debug_print(MODULE_NAME, "The presolve found that the contextual constraints are infeasible.\n")
+        else:
+            forced_in, forced_out = forced_candidates
+            self.presolve_fixed_candidates = forced_in
+            self.presolve_removed_candidates = len(forced_out & self._abc_setting_extractor.get_candidates_ids_set())
+            self._abc_setting_extractor.presolve_abc_setting(forced_out)
+            self.presolve_removed_constraints = sum([constraint_extractor.presolve_constraint(forced_in, forced_out)
+                                                     for constraint_extractor in constraints_extractors])
+            config.debug_print(MODULE_NAME, f"The presolve fixed {len(forced_in)} candidates, and removed "
+                                            f"{self.presolve_removed_candidates} candidates, "
+                                            f"{self._abc_setting_extractor.presolve_removed_voters} voters and "
+                                            f"{self.presolve_removed_constraints} constraints.\n")
+        self.presolve_time = time.time() - start
+
+    def _get_constraints_names(self) -> list:
+        # The names of the contextual constraints (by their order in the experiment dcs and tgds lists).
+        return [f"DC {i + 1}" for i in range(len(self._dc_db_extractors))] + \
+            [f"TGD {i + 1}" for i in range(len(self._tgd_db_extractors))]
+
+    def _check_constraints_feasibility(self) -> None:
+        # Solve only the committee size and the contextual constraints (there are no voters, hence the model is tiny).
+        start = time.time()
+        self.infeasible_constraint = None
+        check_convertor = abc_to_mip_convertor.ABCToMIPConvertor(
+            mip_convertor.create_solver(config.FEASIBILITY_PRE_CHECK_SOLVER_NAME,
+                                        config.FEASIBILITY_PRE_CHECK_TIME_LIMIT))
+        check_convertor.define_abc_setting(self._abc_setting_extractor.get_candidates_ids_set(), {},
+                                           self._committee_size, config.SCORE_FUNCTION)
+        constraints_extractors = self._dc_db_extractors + self._tgd_db_extractors
+        for i, constraint_extractor in enumerate(constraints_extractors):
+            constraint_extractor.define_constraint(check_convertor, i)
+        check_convertor.solve()
+        if check_convertor.solver_status == config.SOLVER_FOUND_OPTIMAL_STATUS:
+            self.feasibility_check_result = 'feasible'
+        elif check_convertor.solver_status != config.SOLVER_PROVEN_INFEASIBLE_STATUS:
+            self.feasibility_check_result = 'inconclusive'
+            config.debug_print(MODULE_NAME, f"The feasibility pre-check is inconclusive (solver status "
+                                            f"{check_convertor.solver_status}).\n")
+        else:
+            # Find the constraint that makes the constraints infeasible, by adding the constraints one by one (the
+            # constraints are guarded, hence the same model is solved). A solve that is not proven infeasible (including
+            # an inconclusive one) moves on to the next constraint, so the reported constraints prefix is always proven
+            # infeasible.
+            self.feasibility_check_result = 'infeasible'
+            self.infeasible_constraint = "committee size"
+            for i, constraint_name in enumerate(self._get_constraints_names()):
+                check_convertor.set_active_constraints(range(i))
+                check_convertor.solve()
+                if check_convertor.solver_status == config.SOLVER_PROVEN_INFEASIBLE_STATUS:
+                    break
+                self.infeasible_constraint = constraint_name
+            config.debug_print(MODULE_NAME, f"The contextual constraints are proven infeasible, due to the "
+                                            f"{self.infeasible_constraint}.\n")
+        self.feasibility_check_time = time.time() - start
+
+    def can_add_voters(self) -> bool:
+        """Whether new voters can be added to the experiment model (see add_voters)."""
+        return self.infeasible_constraint is None and self._abc_convertor.can_add_voters()
+
+    def keep_voters_extensible(self) -> None:
+        """Keep the experiment model extensible with new voters (see add_voters), i.e. without the candidates symmetry
+        breaking, which holds only for the current voters (should be called before the first run of the experiment).
+        """
+        self._voters_extensible = True
+
+    def set_previous_committee(self, committee) -> None:
+        """Set the committee of a previous step of a sweep, used as a warm start of the next run.
+
+        :param committee: A list of the committee candidates ids (or None).
+        """
+        self._abc_convertor.previous_committee = committee
+
+    def set_max_committee_size(self, max_committee_size: int) -> None:
+        """Set the largest committee size the experiment model is defined for, so it can be later resized to any
+        committee size up to it (should be called before the first run of the experiment).
+
+        :param max_committee_size: The max committee size.
+        """
+        self._abc_convertor.max_committee_size = max_committee_size
+
+    def can_set_committee_size(self, committee_size: int) -> bool:
+        """Whether the experiment model can be resized to the given committee size (see set_committee_size)."""
+        return self._constraints_extracted and self.infeasible_constraint is None and \
+            self._abc_convertor.can_set_committee_size(committee_size)
+
+    def set_committee_size(self, committee_size: int) -> None:
+        """Set a new committee size to an experiment that already ran, by updating its model in place (nothing is
+        extracted or converted again). The next run is warm started from the resulted committee of the last run,
+        greedily extended to the new committee size.
+
+        :param committee_size: The new committee size.
+        """
+        self.set_previous_committee(self.resulted_committee)
+        self._reset_extractors_timers(self._dc_db_extractors + self._tgd_db_extractors)
+        self._committee_size = committee_size
+        self._abc_setting_extractor.convert_committee_size(committee_size)
+
+    def guard_constraints(self) -> None:
+        """Guard each DC and TGD of the experiment by its own activation literal, so the constraints can be later
+        switched on or off without rebuilding the model (should be called before the first run of the experiment).
+        The activation key of the i-th DC is ('dc', i), and of the i-th TGD is ('tgd', i).
+        """
+        self._constraints_guarded = True
+        for i, curr_dc_extractor in enumerate(self._dc_db_extractors):
+            curr_dc_extractor.activation_key = ('dc', i)
+        for i, curr_tgd_extractor in enumerate(self._tgd_db_extractors):
+            curr_tgd_extractor.activation_key = ('tgd', i)
+
+    def set_active_constraints(self, dcs_indices: list, tgds_indices: list) -> None:
+        """Set which of the (guarded) DCs and TGDs are enforced in the next run of an experiment that already ran
+        (nothing is extracted or converted again). The next run is warm started from the resulted committee of the last
+        run.
+
+        :param dcs_indices: The indices of the active DCs (in the experiment dcs list).
+        :param tgds_indices: The indices of the active TGDs (in the experiment tgds list).
+        """
+        self.set_previous_committee(self.resulted_committee)
+        self._reset_extractors_timers([self._abc_setting_extractor] + self._dc_db_extractors +
+                                      self._tgd_db_extractors)
+        self._abc_convertor.set_active_constraints([('dc', i) for i in dcs_indices] +
+                                                   [('tgd', i) for i in tgds_indices])
+
+    @staticmethod
+    def _reset_extractors_timers(extractors: list) -> None:
+        # The extracted data is kept in the model, hence it takes no extraction and conversion time.
+        for extractor in extractors:
+            extractor.extract_data_timer = 0
+            extractor.convert_to_mip_timer = 0
+            extractor.extraction_cache_hit = None
+
+    def add_voters(self, voters_size_limit: int) -> None:
+        """Extend the voters group of an experiment that already ran up to voters_size_limit voters, by adding only the
+        new voters to its model (the candidates and the contextual constraints are kept, and are not extracted again).
+        The next run is warm started from the resulted committee of the last run.
+
+        :param voters_size_limit: The new voters id's group size limit.
+        """
+        self.set_previous_committee(self.resulted_committee)
+        self._reset_extractors_timers(self._dc_db_extractors + self._tgd_db_extractors)
+        self._abc_setting_extractor.extract_and_convert_new_voters(voters_size_limit)
 
     def run_experiment(self):
-        spinner_col, bar_col = st.columns([1, 30])
-        with spinner_col:
-            with st.spinner(text=""):
-                with bar_col:
-                    # Extract problem data from the database and convert to MIP.
-                    extraction_and_conversion_progress_bar, _ = run_func_with_fake_progress_bar(
-                        delay=config.DB_EXTRACTION_PROGRESS_BAR_FAKE_DELAY + config.MIP_CONVERSION_PROGRESS_BAR_FAKE_DELAY,
-                        loading_message="Extracting relevant data from database and converting to MIP...",
-                        finish_message="**Finished DB Extraction and Conversion!**",
-                        func_to_run=self.extract_and_convert_all_constraints,
-                    )
-                    time.sleep(1)
-                    extraction_and_conversion_progress_bar.empty()
-
-        # Run the experiment.
-        solved_time = self.run_model()
+        if not self._constraints_extracted:
+            spinner_col, bar_col = st.columns([1, 30])
+            with spinner_col:
+                with st.spinner(text=""):
+                    with bar_col:
+                        # Extract problem data from the database and convert to MIP.
+                        extraction_and_conversion_progress_bar, _ = run_func_with_fake_progress_bar(
+                            delay=config.DB_EXTRACTION_PROGRESS_BAR_FAKE_DELAY +
+                            config.MIP_CONVERSION_PROGRESS_BAR_FAKE_DELAY,
+                            loading_message="Extracting relevant data from database and converting to MIP...",
+                            finish_message="**Finished DB Extraction and Conversion!**",
+                            func_to_run=self.extract_and_convert_all_constraints,
+                        )
+                        time.sleep(1)
+                        extraction_and_conversion_progress_bar.empty()
+            self._constraints_extracted = True
+
+        # Run the experiment (unless the contextual constraints are already proven infeasible).
+        if self.infeasible_constraint is None:
+            solved_time = self.run_model()
+        else:
+            solved_time = 0
+            self._abc_convertor.solver_status = config.SOLVER_PROVEN_INFEASIBLE_STATUS
 
         # Update the group size after the voters cleaning.
         self._voters_group_size = self._abc_convertor.voters_group_size
 
-        # Create a string of the resulted committee.
+        # Create a string of the resulted committee (and its score).
         committee_string = ""
-        if self._abc_convertor.solver_status == 0:
-            # If solved the problem successfully.
-            for key, value in self._abc_convertor.model_candidates_variables.items():
-                if value.solution_value() == 1:
-                    # If the candidate is chosen to the committee.
-                    committee_string += f"{key}, "
+        committee_score = '-'
+        self.resulted_committee = None
+        if self._abc_convertor.solver_status in [config.SOLVER_FOUND_OPTIMAL_STATUS,
+                                                 config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS] or \
+                (self._abc_convertor.solver_status == config.SOLVER_TIMEOUT_STATUS and
+                 len(self._abc_convertor.get_committee()) > 0):
+            # If solved the problem successfully (or found a feasible, not proven optimal, committee).
+            self.resulted_committee = self._abc_convertor.get_committee()
+            for key in self.resulted_committee:
+                committee_string += f"{key}, "
+            committee_score = self._abc_convertor.get_committee_score(self.resulted_committee)
         else:
             committee_string = '-'
 
@@ -154,6 +386,12 @@ class CombinedConstraintsExperiment(experiment.Experiment):
                                                      self._dc_db_extractors]) +
                                                 sum([x.extract_data_timer for x in
                                                      self._tgd_db_extractors]),
+                      'extraction_cache_hits': sum([x.extraction_cache_hit is True for x in
+                                                    [self._abc_setting_extractor] + self._dc_db_extractors +
+                                                    self._tgd_db_extractors]),
+                      'extraction_cache_misses': sum([x.extraction_cache_hit is False for x in
+                                                      [self._abc_setting_extractor] + self._dc_db_extractors +
+                                                      self._tgd_db_extractors]),
                       'mip_construction_time_abc(sec)': self._abc_setting_extractor.convert_to_mip_timer,
                       'mip_construction_time_dc(sec)': sum([x.convert_to_mip_timer for x in
                                                                            self._dc_db_extractors]),
@@ -187,10 +425,36 @@ class CombinedConstraintsExperiment(experiment.Experiment):
                                                   sum([x.convert_to_mip_timer for x in
                                                        self._tgd_db_extractors]) +
                                                   solved_time,
-                      'number_of_solver_variables': self._solver.NumVariables(),
-                      'number_of_solver_constraints': self._solver.NumConstraints(),
+                      'number_of_solver_variables': self._solver.NumVariables() if self._solver is not None else 0,
+                      'number_of_solver_constraints': self._solver.NumConstraints()
+                      if self._solver is not None else 0,
                       'solving_status': self._abc_convertor.solver_status,
-                      'resulted_committee': committee_string
+                      'infeasible_constraint': self.infeasible_constraint
+                      if self.infeasible_constraint is not None else '-',
+                      'feasibility_check_result': self.feasibility_check_result,
+                      'feasibility_check_time(sec)': self.feasibility_check_time,
+                      'presolve_fixed_candidates': len(self.presolve_fixed_candidates),
+                      'presolve_removed_candidates': self.presolve_removed_candidates,
+                      'presolve_removed_voters': self._abc_setting_extractor.presolve_removed_voters,
+                      'presolve_removed_constraints': self.presolve_removed_constraints,
+                      'presolve_time(sec)': self.presolve_time,
+                      'symmetric_candidates_classes': len(self.candidates_classes),
+                      'symmetric_candidates': sum([len(candidates_class) for candidates_class in
+                                                   self.candidates_classes]),
+                      'symmetry_detection_time(sec)': self.symmetry_detection_time,
+                      'dc_rows_before_contraction': self._abc_convertor.dc_rows_before_contraction,
+                      'dc_rows_after_contraction': self._abc_convertor.dc_rows_after_contraction,
+                      'dc_contraction_time(sec)': self._abc_convertor.dc_contraction_time,
+                      'solver_portfolio_winner': ' '.join(self._abc_convertor.portfolio_winner).strip()
+                      if self._abc_convertor.portfolio_winner is not None else '-',
+                      'resulted_committee': committee_string,
+                      'resulted_committee_score': committee_score,
+                      'warm_start_committee_score': self._abc_convertor.warm_start_score
+                      if self._abc_convertor.warm_start_score is not None else '-',
+                      'warm_start_time(sec)': self._abc_convertor.warm_start_time,
+                      'approximation_bound_gap': self._abc_convertor.bound_gap
+                      if isinstance(self._abc_convertor, abc_approximate_engine.ABCApproximateEngine) and
+                      self._abc_convertor.bound_gap is not None else '-'
                       }
 
         return pd.DataFrame([new_result])
@@ -198,8 +462,9 @@ class CombinedConstraintsExperiment(experiment.Experiment):
 
     def __del__(self):
         super().__del__()
-        # Clean the experiment directory by removing the copied db.
-        config.remove_db(self._database_name)
+        if self._copied_database:
+            # Clean the experiment directory by removing the copied db.
+            config.remove_db(self._database_name)
 
 
 # Functions------------------------------------------------------------------
@@ -236,6 +501,7 @@ def combined_constraints_experiment_runner_ticking_voters_size_limit(experiment_
     """
     experiments_results = pd.DataFrame()
     previous_number_of_voters = -1
+    current_experiment = None
     for voters_size_limit in range(voters_size_limit_starting_value, voters_size_limit_ending_value,
                                    voters_size_limit_ticking_value):
         config.debug_print(MODULE_NAME, f"candidates_starting_point={candidates_starting_point}\n"
@@ -243,19 +509,27 @@ def combined_constraints_experiment_runner_ticking_voters_size_limit(experiment_
                                         f"voters_starting_point={voters_starting_point}\n"
                                         f"voters_group_size_limit={voters_size_limit}\n"
                                         f"committee_size={committee_size}")
-        current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
-                                                           dcs, tgds,
-                                                           committee_size,
-                                                           voters_starting_point, candidates_starting_point,
-                                                           voters_size_limit, candidates_size_limit)
+        if config.INCREMENTAL_SWEEP and current_experiment is not None and current_experiment.can_add_voters():
+            # Keep the model of the previous step, and add only the new voters.
+            current_experiment.add_voters(voters_size_limit)
+        else:
+            current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
+                                                               dcs, tgds,
+                                                               committee_size,
+                                                               voters_starting_point, candidates_starting_point,
+                                                               voters_size_limit, candidates_size_limit)
+            if config.INCREMENTAL_SWEEP:
+                current_experiment.keep_voters_extensible()
         experiments_results = experiment.save_result(experiments_results, current_experiment.run_experiment())
-        if previous_number_of_voters == experiments_results['voters_group_size'].iloc[-1]:
+        if previous_number_of_voters == \
+                experiments_results['voters_group_size (non-empty approval profile)'].iloc[-1]:
             # We reached the total number of relevant voters to this candidates group.
             break
-        previous_number_of_voters = experiments_results['voters_group_size'].iloc[-1]
+        previous_number_of_voters = experiments_results['voters_group_size (non-empty approval profile)'].iloc[-1]
         experiment.experiment_save_excel(experiments_results, experiment_name, current_experiment.results_file_path)
         if experiments_results['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS:
-            # We reached a point of timeout.
+            # We reached a point of timeout (a feasible, not proven optimal, committee found without a timeout is a
+            # success).
             break
 
 
@@ -290,25 +564,116 @@ def combined_constraints_experiment_runner_ticking_committee_size(
     iterate over).
     """
     experiments_results = pd.DataFrame()
-    for committee_size in range(committee_size_starting_value, committee_size_ending_value,
-                                committee_size_ticking_value):
+    committee_sizes = range(committee_size_starting_value, committee_size_ending_value, committee_size_ticking_value)
+    current_experiment = None
+    # The extraction and construction time of the last experiment which was built from scratch.
+    full_construction_time = 0
+    for committee_size in committee_sizes:
         config.debug_print(MODULE_NAME, f"candidates_starting_point={candidates_starting_point}\n"
                                         f"candidates_group_size_limit={candidates_size_limit}\n"
                                         f"voters_starting_point={voters_starting_point}\n"
                                         f"voters_group_size_limit={voters_size_limit}\n"
                                         f"committee_size={committee_size}")
-        current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
-                                                           dcs, tgds,
-                                                           committee_size,
-                                                           voters_starting_point, candidates_starting_point,
-                                                           voters_size_limit, candidates_size_limit)
-        experiments_results = experiment.save_result(experiments_results, current_experiment.run_experiment())
+        reuse_model = config.INCREMENTAL_SWEEP and current_experiment is not None and \
+            current_experiment.can_set_committee_size(committee_size)
+        if reuse_model:
+            # Keep the model of the previous step, and update only the committee size.
+            current_experiment.set_committee_size(committee_size)
+        else:
+            current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
+                                                               dcs, tgds,
+                                                               committee_size,
+                                                               voters_starting_point, candidates_starting_point,
+                                                               voters_size_limit, candidates_size_limit)
+            if config.INCREMENTAL_SWEEP:
+                current_experiment.set_max_committee_size(max(committee_sizes))
+        result = current_experiment.run_experiment()
+        construction_time = result['total_extraction_and_construction_time(sec)'].iloc[0]
+        if not reuse_model:
+            full_construction_time = construction_time
+        result['saved_construction_time(sec)'] = full_construction_time - construction_time if reuse_model else 0
+        experiments_results = experiment.save_result(experiments_results, result)
         experiment.experiment_save_excel(experiments_results, experiment_name, current_experiment.results_file_path)
         if experiments_results['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS:
-            # We reached a point of timeout.
+            # We reached a point of timeout (a feasible, not proven optimal, committee found without a timeout is a
+            # success).
             break
 
 
+def combined_constraints_experiment_runner_constraints_subsets(
+        experiment_name: str, database_name: str,
+        dcs: list, tgds: list,
+        committee_size: int,
+        voters_starting_point: int,
+        voters_size_limit: int,
+        candidates_starting_point: int,
+        candidates_size_limit: int,
+        constraints_subsets: list):
+    """Runner for an ABC with context settings, for different subsets of the contextual constraints. The result of each
+    subset includes the price of its constraints, i.e. the relative loss of the committee score compared to the
+    committee score without constraints.
+
+    :param experiment_name: The experiment name.
+    :param database_name: The database name.
+    :param dcs: A list containing tuples of the DCs settings. Each tuple has the following structure -
+    (dc_dict: dict, committee_members_list: list, candidates_tables: list, comparison_atoms: list, constants: dict)
+    Further information about this structure can be found in the DC Extractor class.
+    :param tgds: A list containing tuples of the TGDs settings. Each tuple has the following structure -
+    (tgd_dict_start: dict, committee_members_list_start: list, tgd_dict_end: dict, committee_members_list_end: list,
+     candidates_tables_start: list, candidates_tables_end: list, different_variables: list)
+    Further information about this structure can be found in the TGD Extractor class.
+    :param committee_size: The committee size.
+    :param voters_starting_point: The voters starting point (id to start from ids' range).
+    :param voters_size_limit: The voters size limit (the ending point is determined by it).
+    :param candidates_starting_point: The candidates starting point (id to start from ids' range).
+    :param candidates_size_limit: The candidates size limit (the ending point is determined by it).
+    :param constraints_subsets: A list of tuples of the active DCs indices and the active TGDs indices (in the dcs and
+    tgds lists), for example [([], []), ([0], [0, 1])]. The subset without constraints is added first if missing.
+    :return: The experiments results.
+    """
+    constraints_subsets = [(list(dcs_indices), list(tgds_indices)) for dcs_indices, tgds_indices in constraints_subsets]
+    if ([], []) not in constraints_subsets:
+        constraints_subsets.insert(0, ([], []))
+    experiments_results = pd.DataFrame()
+    current_experiment = None
+    for dcs_indices, tgds_indices in constraints_subsets:
+        config.debug_print(MODULE_NAME, f"dcs_indices={dcs_indices}\n"
+                                        f"tgds_indices={tgds_indices}")
+        if config.INCREMENTAL_SWEEP and current_experiment is not None:
+            # Keep the model of the previous subset (with all the constraints guarded), and switch the constraints.
+            current_experiment.set_active_constraints(dcs_indices, tgds_indices)
+        elif config.INCREMENTAL_SWEEP:
+            current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
+                                                               dcs, tgds,
+                                                               committee_size,
+                                                               voters_starting_point, candidates_starting_point,
+                                                               voters_size_limit, candidates_size_limit)
+            current_experiment.guard_constraints()
+            current_experiment.set_active_constraints(dcs_indices, tgds_indices)
+        else:
+            current_experiment = CombinedConstraintsExperiment(experiment_name, database_name,
+                                                               [dcs[i] for i in dcs_indices],
+                                                               [tgds[i] for i in tgds_indices],
+                                                               committee_size,
+                                                               voters_starting_point, candidates_starting_point,
+                                                               voters_size_limit, candidates_size_limit)
+        result = current_experiment.run_experiment()
+        result['active_constraints'] = ', '.join([f"dc_{i}" for i in dcs_indices] +
+                                                 [f"tgd_{i}" for i in tgds_indices]) or '-'
+        experiments_results = experiment.save_result(experiments_results, result)
+        experiment.experiment_save_excel(experiments_results, experiment_name, current_experiment.results_file_path)
+
+    # The price of the constraints, compared to the committee score without constraints.
+    unconstrained_score = experiments_results['resulted_committee_score'].iloc[
+        constraints_subsets.index(([], []))]
+    experiments_results['price_of_constraints'] = [
+        (unconstrained_score - score) / unconstrained_score
+        if score != '-' and unconstrained_score not in ['-', 0] else '-'
+        for score in experiments_results['resulted_committee_score']]
+    experiment.experiment_save_excel(experiments_results, experiment_name, current_experiment.results_file_path)
+    return experiments_results
+
+
 def combined_constraints_experiment_district_runner(
         experiment_name: str, database_name: str,
         dcs: list, tgds: list,
@@ -330,6 +695,7 @@ def combined_constraints_experiment_district_runner(
     this district as key.
     """
     experiments_results = pd.DataFrame()
+    previous_committee = None
 
     for current_district_number in range(1, max_number_of_districts + 1):
         # The committee size is the sum of seats of each district.
@@ -360,10 +726,16 @@ def combined_constraints_experiment_district_runner(
                                                            committee_size,
                                                            voters_starting_point, candidates_starting_point,
                                                            voters_group_size, candidates_group_size)
+        if config.INCREMENTAL_SWEEP:
+            # The candidates and the committee size grow with the districts, hence the model is rebuilt, and only the
+            # previous district committee is reused (as the first members of the warm start committee).
+            current_experiment.set_previous_committee(previous_committee)
         experiments_results = experiment.save_result(experiments_results, current_experiment.run_experiment())
+        previous_committee = current_experiment.resulted_committee
         experiment.experiment_save_excel(experiments_results, experiment_name, current_experiment.results_file_path)
         if experiments_results['solving_status'].iloc[-1] == config.SOLVER_TIMEOUT_STATUS:
-            # We reached a point of timeout.
+            # We reached a point of timeout (a feasible, not proven optimal, committee found without a timeout is a
+            # success).
             break
 
 
@@ -8,6 +8,8 @@ import config
 from database import database_server_interface as db_interface
 import mip.mip_reduction.mip_convertor as mip_convertor
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.abc_to_cp_sat_convertor as abc_to_cp_sat_convertor
+import mip.mip_reduction.abc_approximate_engine as abc_approximate_engine
 from mip.mip_db_data_extractors.progress_bar_utils import run_func_with_fake_progress_bar
 
 MODULE_NAME = 'Experiment'
@@ -40,11 +42,27 @@ class Experiment:
         self._experiment_name = experiment_name
         self._database_name = database_name
         self.results_file_path = RESULTS_PATH
-        db_path = os.path.join(f"{self._database_name}")
-        self._db_engine = db_interface.Database(db_path)
-
+        self._copied_database = config.COPY_DATABASE
+        if self._copied_database:
+            # Copy the required db to the experiment folder.
+            config.copy_db(self._database_name)
+            db_path = os.path.join(f"{self._database_name}")
+            self._db_engine = db_interface.Database(db_path)
+        else:
+            # All the experiments share the main db file (read only, without copies).
+            db_path = os.path.join(config.SQLITE_DATABASE_FOLDER_PATH, self._database_name)
+            self._db_engine = db_interface.Database(db_path, read_only=True)
+
+        if config.SOLVER_NAME == config.APPROXIMATE_SOLVER_NAME:
+            # The approximate engine does not use a solver.
+            self._solver = None
+            self._abc_convertor = abc_approximate_engine.ABCApproximateEngine()
+            return
         self._solver = mip_convertor.create_solver(config.SOLVER_NAME, config.SOLVER_TIME_LIMIT)
-        self._abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(self._solver)
+        if config.SOLVER_NAME == config.NATIVE_CP_SAT_SOLVER_NAME:
+            self._abc_convertor = abc_to_cp_sat_convertor.ABCToCPSATConvertor(self._solver)
+        else:
+            self._abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(self._solver)
 
     def run_model(self) -> float:
         print("----------------------------------------------------------------------------")
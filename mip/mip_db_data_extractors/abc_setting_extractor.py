@@ -1,6 +1,10 @@
+import time
+import numpy as np
+
 import config
 from database import database_server_interface as db_interface
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.approval_profile as approval_profile
 import mip.mip_db_data_extractors.db_data_extractor as db_data_extractor
 
 MODULE_NAME = "ABC Setting Extractor"
@@ -36,73 +40,197 @@ class ABCSettingExtractor(db_data_extractor.DBDataExtractor):
         self._voters_size_limit = voters_size_limit
         self._candidates_starting_point = candidates_starting_point
         self._candidates_size_limit = candidates_size_limit
+        # The requested ids ranges (starting point and size limit), which key the extraction cache (the fields above
+        # are updated to the extracted ids ranges).
+        self._requested_candidates_range = [candidates_starting_point, candidates_size_limit]
+        self._requested_voters_range = [voters_starting_point, voters_size_limit]
         self._voters_ids_set = set()
-        self._candidates_ids_set = set()
-        self._approval_profile = dict()
+        self._approval_profile = approval_profile.ApprovalProfile.create({})
         self._committee_size = committee_size
         self._score_function = score_function
+        # Whether the ABC setting is reduced by the contextual constraints presolve, and the number of removed voters.
+        self._presolved = False
+        self.presolve_removed_voters = 0
 
     def _extract_data_from_db(self) -> None:
         # ----------------------------------------------
         # Extract the candidates group ids.
         sql_query = f"SELECT DISTINCT {config.CANDIDATES_COLUMN_NAME} FROM {config.CANDIDATES_TABLE_NAME} " \
-                    f"WHERE {config.CANDIDATES_COLUMN_NAME} >= {self._candidates_starting_point} " \
+                    f"WHERE {config.CANDIDATES_COLUMN_NAME} >= ? " \
                     f"ORDER BY {config.CANDIDATES_COLUMN_NAME} " \
-                    f"LIMIT {self._candidates_size_limit};"
-        candidates_id_columns = self._db_engine.run_query(sql_query)
+                    f"LIMIT ?;"
+        candidates_ids = self._db_engine.run_query_columns(
+            sql_query, (self._candidates_starting_point, self._candidates_size_limit))[config.CANDIDATES_COLUMN_NAME]
         # The resulted ids' set.
-        self._candidates_ids_set = set(candidates_id_columns[config.CANDIDATES_COLUMN_NAME])
+        self._candidates_ids_set = set(candidates_ids.tolist())
         # The smallest id in candidates ids' range.
-        self._candidates_starting_point = int(candidates_id_columns.min().iloc[0])
+        self._candidates_starting_point = int(candidates_ids.min())
         # The largest id in candidates ids' range.
-        self._candidates_ending_point = int(candidates_id_columns.max().iloc[0])
+        self._candidates_ending_point = int(candidates_ids.max())
         # The resulted number of candidates.
         self._candidates_size_limit = len(self._candidates_ids_set)
 
-        if self._committee_size > len(candidates_id_columns):
+        if self._committee_size > len(candidates_ids):
             config.debug_print(MODULE_NAME, "Note: Candidates group size is lower then committee size, \n"
                                             "due to missing candidates in the data.")
-        config.debug_print(MODULE_NAME, f"The candidates id columns are:\n{str(candidates_id_columns.head())}\n"
-                                        f"The number of candidates is {len(candidates_id_columns)}.")
+        config.debug_print(MODULE_NAME, f"The candidates ids are:\n{str(candidates_ids[:5])}\n"
+                                        f"The number of candidates is {len(candidates_ids)}.")
+        # ----------------------------------------------
+        voters_ids, self._approval_profile = self._extract_voters(self._voters_starting_point,
+                                                                  self._voters_size_limit)
+        self._voters_ids_set = set(voters_ids.tolist())
+        self._voters_starting_point = int(voters_ids.min())
+        self._voters_ending_point = int(voters_ids.max())
+        self._voters_size_limit = len(self._voters_ids_set)
+
+    def _extract_voters(self, voters_starting_point: int, voters_size_limit: int) -> tuple:
+        """Extract the voters ids group and their approval profile.
+
+        :param voters_starting_point: The voters starting point (id to start from ids' range).
+        :param voters_size_limit: The voters id's group size limit.
+        :return: The voters ids array, and the voters approval profile.
+        """
         # ----------------------------------------------
         # Extract voters ids group.
         # Extract only voters ids with a non-empty approval profile in regard to the candidates group.
         sql_query = f"SELECT DISTINCT {config.VOTERS_COLUMN_NAME} FROM {config.VOTING_TABLE_NAME} " \
-                    f"WHERE {config.VOTERS_COLUMN_NAME} >= {self._voters_starting_point} AND " \
-                    f"{config.APPROVAL_COLUMN_NAME} > {config.APPROVAL_THRESHOLD} " \
-                    f"AND {config.CANDIDATES_COLUMN_NAME} " \
-                    f"BETWEEN {self._candidates_starting_point} AND {self._candidates_ending_point} " \
+                    f"WHERE {config.VOTERS_COLUMN_NAME} >= ? AND " \
+                    f"{config.APPROVAL_COLUMN_NAME} > ? " \
+                    f"AND {config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ? " \
                     f"ORDER BY {config.VOTERS_COLUMN_NAME} " \
-                    f"LIMIT {self._voters_size_limit};"
-        voters_id_columns = self._db_engine.run_query(sql_query)
-        self._voters_ids_set = set(voters_id_columns[config.VOTERS_COLUMN_NAME])
-        self._voters_starting_point = int(voters_id_columns.min().iloc[0])
-        self._voters_ending_point = int(voters_id_columns.max().iloc[0])
-        self._voters_size_limit = len(self._voters_ids_set)
+                    f"LIMIT ?;"
+        voters_ids = self._db_engine.run_query_columns(
+            sql_query, (voters_starting_point, config.APPROVAL_THRESHOLD, self._candidates_starting_point,
+                        self._candidates_ending_point, voters_size_limit))[config.VOTERS_COLUMN_NAME]
 
-        config.debug_print(MODULE_NAME, f"The voters id columns are:\n{str(voters_id_columns.head())}\n"
-                                        f"The number of voters is {len(voters_id_columns)}.")
+        config.debug_print(MODULE_NAME, f"The voters ids are:\n{str(voters_ids[:5])}\n"
+                                        f"The number of voters is {len(voters_ids)}.")
+        if len(voters_ids) == 0:
+            return voters_ids, approval_profile.ApprovalProfile.create({})
         # ----------------------------------------------
         # Extract approval profile.
         sql_query = f"SELECT DISTINCT {config.VOTERS_COLUMN_NAME}, {config.CANDIDATES_COLUMN_NAME} " \
                     f"FROM {config.VOTING_TABLE_NAME} " \
-                    f"WHERE {config.APPROVAL_COLUMN_NAME} > {str(config.APPROVAL_THRESHOLD)} " \
-                    f"AND {config.VOTERS_COLUMN_NAME} " \
-                    f"BETWEEN {self._voters_starting_point} AND {self._voters_ending_point} " \
-                    f"AND {config.CANDIDATES_COLUMN_NAME} " \
-                    f"BETWEEN {self._candidates_starting_point} AND {self._candidates_ending_point};"
-
-        voter_rating_columns = self._db_engine.run_query(sql_query)
-        grouped_by_voter_id_column = voter_rating_columns.groupby(by=config.VOTERS_COLUMN_NAME)
-        self._approval_profile = {voter_id: set(candidates_ids_df[config.CANDIDATES_COLUMN_NAME]) for
-                                  voter_id, candidates_ids_df in
-                                  grouped_by_voter_id_column}
-        config.debug_print(MODULE_NAME, f"The length of the approval profile is: {str(len(self._approval_profile))}.")
+                    f"WHERE {config.APPROVAL_COLUMN_NAME} > ? " \
+                    f"AND {config.VOTERS_COLUMN_NAME} BETWEEN ? AND ? " \
+                    f"AND {config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ?;"
+        approval_columns = self._db_engine.run_query_columns(
+            sql_query, (config.APPROVAL_THRESHOLD, int(voters_ids.min()), int(voters_ids.max()),
+                        self._candidates_starting_point, self._candidates_ending_point))
+
+        # The approval profile is kept as a sparse voters x candidates matrix (no per voter objects).
+        voters_approval_profile = approval_profile.ApprovalProfile.from_pairs(
+            approval_columns[config.VOTERS_COLUMN_NAME], approval_columns[config.CANDIDATES_COLUMN_NAME])
+        config.debug_print(MODULE_NAME, f"The length of the approval profile is: {str(len(voters_approval_profile))}.")
         # ----------------------------------------------
         # The number of approval profile and the number of voters should always be equal, because we extract voters
         # with a non-empty approval profile.
-        if len(self._approval_profile.keys()) != len(self._voters_ids_set):
+        if len(voters_approval_profile.keys()) != len(voters_ids):
             raise Exception
+        return voters_ids, voters_approval_profile
+
+    def extract_and_convert_new_voters(self, voters_size_limit: int) -> None:
+        """Extend the voters group up to voters_size_limit voters (continuing the current voters ids range), and add
+        only the new voters to the MIP model (after the ABC setting is extracted and converted).
+
+        :param voters_size_limit: The new voters id's group size limit.
+        """
+        start = time.time()
+        voters_ids, new_approval_profile = self._extract_voters(self._voters_ending_point + 1,
+                                                                max(0, voters_size_limit - len(self._voters_ids_set)))
+        self._voters_ids_set.update(voters_ids.tolist())
+        if len(voters_ids) > 0:
+            self._voters_ending_point = int(voters_ids.max())
+        self._voters_size_limit = len(self._voters_ids_set)
+        self._requested_voters_range = [self._requested_voters_range[0], voters_size_limit]
+        if self._presolved:
+            new_approval_profile = self._remove_constant_voters(new_approval_profile)
+        self._approval_profile = self._approval_profile.concatenate(new_approval_profile)
+        self.extraction_cache_hit = None
+        end = time.time()
+        self.extract_data_timer = end - start
+
+        start = time.time()
+        if len(new_approval_profile) > 0:
+            self._abc_convertor.add_voters(new_approval_profile)
+        end = time.time()
+        self.convert_to_mip_timer = end - start
+
+    def get_approval_profile(self) -> approval_profile.ApprovalProfile:
+        """Get the extracted voters approval profile.
+
+        :return: The approval profile.
+        """
+        return self._approval_profile
+
+    def presolve_abc_setting(self, forced_out: set) -> None:
+        """Remove the candidates that cannot be in the committee (found by the contextual constraints presolve), and the
+        voters that approve none of the remaining candidates, before the ABC setting is converted (and lifted).
+
+        :param forced_out: The candidates that cannot be in the committee.
+        """
+        self._candidates_ids_set = self._candidates_ids_set - forced_out
+        self._presolved = True
+        self._approval_profile = self._remove_constant_voters(self._approval_profile)
+
+    def _remove_constant_voters(self, voters_approval_profile: approval_profile.ApprovalProfile) -> \
+            approval_profile.ApprovalProfile:
+        # A voter that approves none of the candidates contributes a constant score (score_function(0, profile size)),
+        # only the voters with a zero contribution are removed (the approved candidates of the remaining voters are
+        # kept, since the score depends on the approval profile size).
+        voters_profile_size = voters_approval_profile.get_voters_profile_size()
+        constant_voters = voters_approval_profile.get_committee_approval_count(self._candidates_ids_set) == 0
+        zero_score_profile_sizes = [profile_size for profile_size in
+                                    np.unique(voters_profile_size[constant_voters]).tolist()
+                                    if self._score_function(0, profile_size) == 0]
+        constant_voters &= np.isin(voters_profile_size, zero_score_profile_sizes)
+        self.presolve_removed_voters += int(constant_voters.sum())
+        return voters_approval_profile.select_voters(~constant_voters)
+
+    def convert_committee_size(self, committee_size: int) -> None:
+        """Set a new committee size to the MIP model (after the ABC setting is extracted and converted), nothing is
+        extracted again.
+
+        :param committee_size: The new committee size.
+        """
+        self._committee_size = committee_size
+        self.extraction_cache_hit = None
+        self.extract_data_timer = 0
+
+        start = time.time()
+        self._abc_convertor.set_committee_size(committee_size)
+        end = time.time()
+        self.convert_to_mip_timer = end - start
+
+    def _get_cache_definition(self):
+        return ['abc_setting']
+
+    def _get_cache_ranges(self) -> dict:
+        return {'candidates': self._requested_candidates_range, 'voters': self._requested_voters_range}
+
+    def _get_cache_arrays(self) -> dict:
+        return {'candidates_ids': np.array(sorted(self._candidates_ids_set)),
+                'voters_ids': self._approval_profile.voters_ids,
+                'profile_candidates_ids': self._approval_profile.candidates_ids,
+                'voters_pointers': self._approval_profile.voters_pointers,
+                'approved_candidates': self._approval_profile.approved_candidates}
+
+    def _set_cache_arrays(self, arrays: dict) -> None:
+        candidates_ids = arrays['candidates_ids']
+        self._candidates_ids_set = set(candidates_ids.tolist())
+        self._candidates_starting_point = int(candidates_ids.min())
+        self._candidates_ending_point = int(candidates_ids.max())
+        self._candidates_size_limit = len(self._candidates_ids_set)
+
+        # The voters are exactly the voters of the approval profile.
+        self._approval_profile = approval_profile.ApprovalProfile(
+            arrays['voters_ids'], arrays['profile_candidates_ids'], arrays['voters_pointers'],
+            arrays['approved_candidates'])
+        voters_ids = self._approval_profile.voters_ids
+        self._voters_ids_set = set(voters_ids.tolist())
+        self._voters_starting_point = int(voters_ids.min())
+        self._voters_ending_point = int(voters_ids.max())
+        self._voters_size_limit = len(self._voters_ids_set)
 
     def _convert_to_mip(self) -> None:
         self._abc_convertor.define_abc_setting(
@@ -1,9 +1,13 @@
+import operator
 import time
 
 import config
+import numpy as np
 import pandas as pd
 import database.database_server_interface as db_interface
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_db_data_extractors.extraction_cache as extraction_cache
+import mip.mip_db_data_extractors.join_query_planner as join_query_planner
 import streamlit as st
 
 from mip.mip_db_data_extractors.progress_bar_utils import run_func_with_fake_progress_bar
@@ -28,49 +32,81 @@ class DBDataExtractor:
         self._db_engine = database_engine
         self.convert_to_mip_timer = -1
         self.extract_data_timer = -1
+        # Whether the extracted data was loaded from the extraction cache (None if the extraction is not cached).
+        self.extraction_cache_hit = None
+        # The activation key guarding the converted constraints (None if they are always enforced), see the convertor
+        # set_active_constraints.
+        self.activation_key = None
+        # The query plans of the join queries (only if config.LOG_QUERY_PLAN).
+        self.join_query_plans = []
         self._candidates_starting_point = candidates_starting_point
 
         # Extract the candidates group ids. Starting from the id of candidates_starting_point, up to
         # candidates_size_limit ids.
         sql_query = f"SELECT DISTINCT {config.CANDIDATES_COLUMN_NAME} FROM {config.CANDIDATES_TABLE_NAME} " \
-                    f"WHERE {config.CANDIDATES_COLUMN_NAME} >= {self._candidates_starting_point} " \
+                    f"WHERE {config.CANDIDATES_COLUMN_NAME} >= ? " \
                     f"ORDER BY {config.CANDIDATES_COLUMN_NAME} " \
-                    f"LIMIT {candidates_size_limit};"
-        candidates_id_columns = self._db_engine.run_query(sql_query)
+                    f"LIMIT ?;"
+        candidates_ids = self._db_engine.run_query_columns(
+            sql_query, (self._candidates_starting_point, candidates_size_limit))[config.CANDIDATES_COLUMN_NAME]
 
         # The resulted ids' set.
-        self._candidates_ids_set = set(candidates_id_columns[config.CANDIDATES_COLUMN_NAME])
+        self._candidates_ids_set = set(candidates_ids.tolist())
         # The smallest id in candidates ids' range.
-        self._candidates_starting_point = int(candidates_id_columns.min().iloc[0])
+        self._candidates_starting_point = int(candidates_ids.min())
         # The largest id in candidates ids' range.
-        self._candidates_ending_point = int(candidates_id_columns.max().iloc[0])
+        self._candidates_ending_point = int(candidates_ids.max())
         # The resulted number of candidates.
         self._candidates_size_limit = len(self._candidates_ids_set)
 
-    def join_tables(self, candidate_tables: list, tables_dict: dict, constants: dict,
-                    comparison_atoms: list) -> pd.DataFrame:
-        """Extract from the DB a join between all the tables in the tables list.
-        An input tables list example:
-        tables_dict[('candidates', 't1')] = [('x', 'user_id'), ('y', 'lives_in')]
-        tables_dict[('cities', 't2')] = [('y', 'city')]
-        In this case 'candidates' is the db table name, 't1' is the new name for the query, 'user_id' is the table
-        column name, and 'x' is the new name for the query. The resulted join is between candidates and cities (when the
-        shared column is 'y').
-        For shared columns - join using natural inner join, if there are no shared columns - cross join.
+    def get_candidates_ids_set(self) -> set:
+        """Get the candidates ids set (of the candidates ids' range).
 
-        :param candidate_tables: All the tables containing config.CANDIDATES_COLUMN_NAME (in this table we add the
-        restriction about the candidates ids range).
-        :param constants: A constants variables dict, dict with the new variable name and his const value (for the
-        example above it could be constants['y']='Paris', enforcing the constant value to all tables with column 'y').
-        :param tables_dict: A tables as described in the brief.
-        :param comparison_atoms: A list of tuples of the form ('x','<','y') that enforce to comparison atom
-        i.e. '<'/'>'/'='/'!=' between two (new) column names.
-        :return: The resulted df of the join operation, with the new names (such as 'x').
+        :return: The candidates ids set.
         """
-        # Handle special case of an empty dict.
-        if len(tables_dict.items()) == 0:
-            return pd.DataFrame()
+        return self._candidates_ids_set
+
+    def _get_join_query(self, candidate_tables: list, tables_dict: dict, constants: dict, comparison_atoms: list,
+                        committee_members_list: list = None, selected_variables: list = None,
+                        distinct: bool = True) -> tuple:
+        # The SQL query of the join (see join_tables) and its parameters, selecting distinct rows if distinct is True.
+        if committee_members_list is not None and config.ORDER_INTERCHANGEABLE_COMMITTEE_MEMBERS:
+            comparison_atoms = list(comparison_atoms) + self.get_ordering_atoms(
+                tables_dict, committee_members_list, candidate_tables, comparison_atoms, constants)
+
+        if config.JOIN_QUERY_PLANNER:
+            query, parameters, range_join_tables = join_query_planner.plan_join_query(
+                tables_dict, candidate_tables,
+                {variable: self.sql_parameter(constant_value) for variable, constant_value in constants.items()},
+                comparison_atoms,
+                (self._candidates_starting_point, self._candidates_ending_point, self._candidates_size_limit),
+                {original_table_name: self._db_engine.get_table_statistics(original_table_name)
+                 for original_table_name, _ in tables_dict},
+                selected_variables, distinct)
+        else:
+            query, parameters = self._get_flat_join_query(candidate_tables, tables_dict, constants, comparison_atoms,
+                                                          distinct)
+            range_join_tables = []
+        config.debug_print(MODULE_NAME, "The extract data SQL phrase is: \n" + query +
+                           f"With the parameters: {parameters}")
+        return query, parameters, range_join_tables
+
+    def _create_range_join_tables(self, range_join_tables: list, query: str, parameters: list) -> None:
+        # Create the range join temporary tables of a join query (see join_query_planner.get_range_join_tables), and
+        # log the query plan.
+        for table_name, subquery, subquery_parameters, index_variables in range_join_tables:
+            self._db_engine.create_temporary_table(table_name, subquery, subquery_parameters, index_variables)
+        if config.LOG_QUERY_PLAN:
+            self.join_query_plans.append(self._db_engine.explain_query_plan(query, parameters))
+            config.debug_print(MODULE_NAME, "The extract data query plan is: \n" + self.join_query_plans[-1])
 
+    def _drop_range_join_tables(self, range_join_tables: list) -> None:
+        for table_name, _, _, _ in range_join_tables:
+            self._db_engine.drop_temporary_table(table_name)
+
+    def _get_flat_join_query(self, candidate_tables: list, tables_dict: dict, constants: dict, comparison_atoms: list,
+                             distinct: bool = True) -> tuple:
+        # The SQL query of the join as a single flat query of all the tables and all the variables (see join_tables).
         # Link between the new variable name to the new table name.
         # For instance variable_dict['x'] = [('t1', 'original_x_column_name'), ...].
         variables_dict = dict()
@@ -89,14 +125,15 @@ class DBDataExtractor:
         from_phrase += '\n'
 
         # Create SELECT phrase.
-        select_phrase = 'SELECT DISTINCT '
+        select_phrase = 'SELECT DISTINCT ' if distinct else 'SELECT '
         for new_variable_name, new_table_names in variables_dict.items():
             select_phrase += f"{new_table_names[0][0]}.{new_table_names[0][1]} AS {new_variable_name}, "
         # Remove ', ' from the string and add EOL.
         select_phrase = select_phrase[:len(select_phrase) - 2]
         select_phrase += '\n'
 
-        # Create WHERE phrase.
+        # Create WHERE phrase (the values are bound to the query parameters).
+        parameters = []
         where_phrase = 'WHERE '
         for new_variable_name, new_table_names in variables_dict.items():
             where_phrase = self.sql_concat_and(where_phrase)
@@ -109,18 +146,16 @@ class DBDataExtractor:
         # Add candidates ids' range constraint.
         for table_name in candidate_tables:
             where_phrase = self.sql_concat_and(where_phrase)
-            where_phrase += f"{table_name}.{config.CANDIDATES_COLUMN_NAME} " \
-                            f"BETWEEN {self._candidates_starting_point} AND {self._candidates_ending_point}"
+            where_phrase += f"{table_name}.{config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ?"
+            parameters.extend([self._candidates_starting_point, self._candidates_ending_point])
 
         # Add constants values constraint.
         for constant_name, constant_value in constants.items():
             if constant_name in variables_dict:
                 for new_table_name, original_variable_name in variables_dict[constant_name]:
-                    str_value = str(constant_value)
-                    if not str_value.isdigit():
-                        str_value = f"\"{str_value}\""
                     where_phrase = self.sql_concat_and(where_phrase)
-                    where_phrase += f"{new_table_name}.{original_variable_name}={str_value}"
+                    where_phrase += f"{new_table_name}.{original_variable_name}=?"
+                    parameters.append(self.sql_parameter(constant_value))
 
         # Add the different variable constraint.
         for comparison_atom in comparison_atoms:
@@ -134,21 +169,332 @@ class DBDataExtractor:
         if where_phrase.replace(" ", "").replace("\n", "") == "WHERE":
             where_phrase = ""
 
-        config.debug_print(MODULE_NAME,
-                           "The extract data SQL phrase is: \n" + select_phrase + from_phrase + where_phrase)
-        legal_assignments = self._db_engine.run_query(select_phrase + from_phrase + where_phrase)
+        return select_phrase + from_phrase + where_phrase, parameters
+
+    def join_tables(self, candidate_tables: list, tables_dict: dict, constants: dict,
+                    comparison_atoms: list, committee_members_list: list = None,
+                    selected_variables: list = None) -> pd.DataFrame:
+        """Extract from the DB a join between all the tables in the tables list.
+        An input tables list example:
+        tables_dict[('candidates', 't1')] = [('x', 'user_id'), ('y', 'lives_in')]
+        tables_dict[('cities', 't2')] = [('y', 'city')]
+        In this case 'candidates' is the db table name, 't1' is the new name for the query, 'user_id' is the table
+        column name, and 'x' is the new name for the query. The resulted join is between candidates and cities (when the
+        shared column is 'y').
+        For shared columns - join using natural inner join, if there are no shared columns - cross join.
+
+        :param candidate_tables: All the tables containing config.CANDIDATES_COLUMN_NAME (in this table we add the
+        restriction about the candidates ids range).
+        :param constants: A constants variables dict, dict with the new variable name and his const value (for the
+        example above it could be constants['y']='Paris', enforcing the constant value to all tables with column 'y').
+        :param tables_dict: A tables as described in the brief.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y') that enforce to comparison atom
+        i.e. '<'/'>'/'='/'!=' between two (new) column names.
+        :param committee_members_list: If given, the committee members variables, where only one ordering of the values
+        of the interchangeable committee members is extracted (see get_ordering_atoms).
+        :param selected_variables: If given, the (new) variables names of the result columns (otherwise all the
+        variables are selected).
+        :return: The resulted df of the join operation, with the new names (such as 'x').
+        """
+        # Handle special case of an empty dict.
+        if len(tables_dict.items()) == 0:
+            return pd.DataFrame()
+
+        query, parameters, range_join_tables = self._get_join_query(
+            candidate_tables, tables_dict, constants, comparison_atoms, committee_members_list, selected_variables)
+        try:
+            self._create_range_join_tables(range_join_tables, query, parameters)
+            legal_assignments = self._db_engine.run_query(query, parameters)
+        finally:
+            self._drop_range_join_tables(range_join_tables)
+        # The flat join query selects all the variables.
+        if selected_variables is not None and list(legal_assignments.columns) != list(selected_variables):
+            legal_assignments = legal_assignments[selected_variables].drop_duplicates(ignore_index=True)
 
         config.debug_print(MODULE_NAME,
                            "The legal assignments are: \n" + str(legal_assignments.head()))
         return legal_assignments
 
+    def join_tables_chunks(self, candidate_tables: list, tables_dict: dict, constants: dict, comparison_atoms: list,
+                           selected_variables: list, chunk_size: int, committee_members_list: list = None):
+        """Extract from the DB the join of join_tables in chunks of rows (hence the whole join is never held in
+        memory at once). The rows are not distinct (the chunks consumer should remove the duplicates).
+
+        :param candidate_tables: All the tables containing config.CANDIDATES_COLUMN_NAME.
+        :param tables_dict: A tables dict as described in join_tables.
+        :param constants: A constants variables dict.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y').
+        :param selected_variables: The (new) variables names of the chunks columns, with integer values.
+        :param chunk_size: The max number of rows in a chunk.
+        :param committee_members_list: If given, the committee members variables (as in join_tables).
+        :return: A generator of the chunks, each is an integer array with a column per selected variable.
+        """
+        if len(tables_dict.items()) == 0:
+            return
+        query, parameters, range_join_tables = self._get_join_query(
+            candidate_tables, tables_dict, constants, comparison_atoms, committee_members_list, selected_variables,
+            distinct=False)
+        try:
+            self._create_range_join_tables(range_join_tables, query, parameters)
+            for columns, rows in self._db_engine.run_query_chunks(query, parameters, chunk_size):
+                get_selected_values = operator.itemgetter(*[columns.index(variable)
+                                                            for variable in selected_variables])
+                yield np.array(list(map(get_selected_values, rows)), dtype=np.int64).reshape(len(rows),
+                                                                                              len(selected_variables))
+        finally:
+            self._drop_range_join_tables(range_join_tables)
+
+    @staticmethod
+    def get_cardinality_shape(tables_dict: dict, committee_members_list: list, candidates_tables: list,
+                              comparison_atoms: list, constants: dict):
+        """Detect whether the committee members part of a constraint is of the shape 'k different committee members
+        sharing the same attributes values', i.e. k copies of the same table, each with a single committee member
+        variable and the same shared variables, where the comparison atoms order all the committee members.
+        For example - tables_dict[('candidates', 't1')] = [('c1', 'candidate_id'), ('x', 'party')],
+        tables_dict[('candidates', 't2')] = [('c2', 'candidate_id'), ('x', 'party')] with the comparison atom
+        ('c1', '<', 'c2') is of this shape with k = 2 and the shared variable 'x'.
+
+        :param tables_dict: A tables dict (as in the join tables function).
+        :param committee_members_list: The committee members list.
+        :param candidates_tables: The tables (new) names that containing the candidate id column.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y').
+        :param constants: A constants variables dict.
+        :return: None if the constraint is not of this shape, otherwise a tuple of the table name, the committee members
+        column name, and a dict of the shared variables names to their column names.
+        """
+        committee_members_number = len(committee_members_list)
+        if committee_members_number == 0 or len(tables_dict) != committee_members_number or \
+                set(candidates_tables) != {new_table_name for _, new_table_name in tables_dict}:
+            return None
+        if len({original_table_name for original_table_name, _ in tables_dict}) != 1:
+            return None
+
+        table_committee_members = []
+        committee_members_columns = set()
+        shared_variables = None
+        for variables in tables_dict.values():
+            variables_dict = dict(variables)
+            if len(variables_dict) != len(variables):
+                return None
+            current_committee_members = [variable for variable in variables_dict if variable in committee_members_list]
+            if len(current_committee_members) != 1:
+                return None
+            table_committee_members.append(current_committee_members[0])
+            committee_members_columns.add(variables_dict.pop(current_committee_members[0]))
+            if shared_variables is None:
+                shared_variables = variables_dict
+            elif shared_variables != variables_dict:
+                return None
+        if set(table_committee_members) != set(committee_members_list) or len(committee_members_columns) != 1:
+            return None
+        if any([variable in committee_members_list for variable in constants]):
+            return None
+
+        # The comparison atoms should be '<' / '>' between committee members, that order all the committee members
+        # (hence the committee members are different).
+        smaller_than = {(atom[0], atom[2]) if atom[1] == '<' else (atom[2], atom[0]) for atom in comparison_atoms
+                        if atom[1] in ('<', '>')}
+        if len(smaller_than) != len(comparison_atoms) or \
+                any([variable not in committee_members_list for pair in smaller_than for variable in pair]):
+            return None
+        for middle_member in committee_members_list:
+            for first_member in committee_members_list:
+                for last_member in committee_members_list:
+                    if (first_member, middle_member) in smaller_than and (middle_member, last_member) in smaller_than:
+                        smaller_than.add((first_member, last_member))
+        if any([(member, member) in smaller_than for member in committee_members_list]) or \
+                len(smaller_than) != committee_members_number * (committee_members_number - 1) // 2:
+            return None
+
+        table_name = next(iter(tables_dict))[0]
+        return table_name, committee_members_columns.pop(), shared_variables
+
+    @staticmethod
+    def _get_constraint_body(tables_dict: dict, candidates_tables: list, comparison_atoms: list, constants: dict,
+                             transposition: dict) -> tuple:
+        # The constraint body (the tables atoms, the comparison atoms and the constants) with the variables swapped by
+        # the transposition (a dict of the two swapped variables), ignoring the tables new names and the atoms order.
+        def swap(variable):
+            return transposition.get(variable, variable)
+
+        tables_atoms = frozenset([(original_table_name, new_table_name in candidates_tables,
+                                   frozenset([(swap(variable), column_name) for variable, column_name in variables]))
+                                  for (original_table_name, new_table_name), variables in tables_dict.items()])
+        atoms = set()
+        for left_operand, operator_sign, right_operand in comparison_atoms:
+            left_operand, right_operand = swap(str(left_operand)), swap(str(right_operand))
+            if operator_sign in ('>', '>='):
+                left_operand, right_operand = right_operand, left_operand
+                operator_sign = operator_sign.replace('>', '<')
+            elif operator_sign in ('=', '!='):
+                left_operand, right_operand = sorted([left_operand, right_operand])
+            atoms.add((left_operand, operator_sign, right_operand))
+        constants_atoms = frozenset([(swap(variable), str(constant_value))
+                                     for variable, constant_value in constants.items()])
+        return tables_atoms, frozenset(atoms), constants_atoms
+
+    @staticmethod
+    def get_interchangeable_committee_members(tables_dict: dict, committee_members_list: list,
+                                              candidates_tables: list, comparison_atoms: list, constants: dict) -> list:
+        """Detect the classes of interchangeable committee members variables, i.e. variables such that swapping any two
+        of them maps the constraint body (the tables atoms, the comparison atoms and the constants) onto itself, hence
+        the join result is closed under permuting their values.
+        For example - tables_dict[('candidates', 't1')] = [('c1', 'candidate_id'), ('x', 'party')],
+        tables_dict[('candidates', 't2')] = [('c2', 'candidate_id'), ('x', 'party')] with the comparison atom
+        ('c1', '!=', 'c2') has the class ['c1', 'c2'].
+
+        :param tables_dict: A tables dict (as in the join tables function).
+        :param committee_members_list: The committee members list.
+        :param candidates_tables: The tables (new) names that containing the candidate id column.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y').
+        :param constants: A constants variables dict.
+        :return: A list of the classes (with at least two members), each is a list of committee members (in the
+        committee members list order).
+        """
+        constraint_body = DBDataExtractor._get_constraint_body(tables_dict, candidates_tables, comparison_atoms,
+                                                               constants, dict())
+        # Being interchangeable is an equivalence relation, hence each member is compared only to the first member of
+        # each class.
+        committee_members_classes = []
+        for committee_member in committee_members_list:
+            for committee_members_class in committee_members_classes:
+                transposition = {committee_member: committee_members_class[0],
+                                 committee_members_class[0]: committee_member}
+                if DBDataExtractor._get_constraint_body(tables_dict, candidates_tables, comparison_atoms, constants,
+                                                        transposition) == constraint_body:
+                    committee_members_class.append(committee_member)
+                    break
+            else:
+                committee_members_classes.append([committee_member])
+        return [committee_members_class for committee_members_class in committee_members_classes
+                if len(committee_members_class) > 1]
+
+    @staticmethod
+    def get_ordering_atoms(tables_dict: dict, committee_members_list: list, candidates_tables: list,
+                           comparison_atoms: list, constants: dict) -> list:
+        """Get the comparison atoms ordering the values of each class of interchangeable committee members (see
+        get_interchangeable_committee_members), hence the join result has a single ordering of each committee members
+        values (instead of every permutation of them).
+        The order is strict ('<') between members with a '!=' comparison atom, otherwise it is '<=' (keeping the
+        assignments of the same value to both members).
+
+        :param tables_dict: A tables dict (as in the join tables function).
+        :param committee_members_list: The committee members list.
+        :param candidates_tables: The tables (new) names that containing the candidate id column.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y').
+        :param constants: A constants variables dict.
+        :return: A list of the ordering comparison atoms.
+        """
+        different_members = {frozenset([str(atom[0]), str(atom[2])]) for atom in comparison_atoms if atom[1] == '!='}
+        ordering_atoms = []
+        for committee_members_class in DBDataExtractor.get_interchangeable_committee_members(
+                tables_dict, committee_members_list, candidates_tables, comparison_atoms, constants):
+            for committee_member, next_committee_member in zip(committee_members_class, committee_members_class[1:]):
+                operator_sign = '<' if {committee_member, next_committee_member} in different_members else '<='
+                ordering_atoms.append((committee_member, operator_sign, next_committee_member))
+        return ordering_atoms
+
+    def group_candidates(self, table_name: str, candidates_column_name: str, group_by_columns: list,
+                         constants_columns: dict, min_group_size: int = 1) -> dict:
+        """Extract from the DB (with a single GROUP BY query) the candidates group of each attributes value.
+
+        :param table_name: The db table name.
+        :param candidates_column_name: The candidates column name in the table.
+        :param group_by_columns: The attributes columns names.
+        :param constants_columns: A dict of columns names to their constant value.
+        :param min_group_size: Extract only the groups with at least this number of candidates.
+        :return: A dict with the attributes value (a tuple in the group by columns order) as key, and the candidates
+        group (list of ids) as value.
+        """
+        select_phrase = 'SELECT '
+        for i, column_name in enumerate(group_by_columns):
+            select_phrase += f"{column_name} AS group_column_{i}, "
+        select_phrase += f"GROUP_CONCAT(DISTINCT {candidates_column_name}) AS group_members\n"
+        from_phrase = f"FROM {table_name}\n"
+
+        where_phrase = f"WHERE {candidates_column_name} BETWEEN ? AND ?"
+        parameters = [self._candidates_starting_point, self._candidates_ending_point]
+        for column_name, constant_value in constants_columns.items():
+            where_phrase = self.sql_concat_and(where_phrase)
+            where_phrase += f"{column_name}=?"
+            parameters.append(self.sql_parameter(constant_value))
+        # A NULL attribute value is never equal to another value in the join the group replaces (NULL = NULL is not
+        # true), hence it is not a group.
+        for column_name in group_by_columns:
+            where_phrase = self.sql_concat_and(where_phrase)
+            where_phrase += f"{column_name} IS NOT NULL"
+        where_phrase += '\n'
+
+        group_by_phrase = ''
+        if len(group_by_columns) > 0:
+            group_by_phrase = f"GROUP BY {', '.join(group_by_columns)}\n"
+        group_by_phrase += f"HAVING COUNT(DISTINCT {candidates_column_name}) >= ?\n"
+        parameters.append(max(min_group_size, 1))
+
+        config.debug_print(MODULE_NAME, "The group candidates SQL phrase is: \n" + select_phrase + from_phrase +
+                           where_phrase + group_by_phrase + f"With the parameters: {parameters}")
+        groups_columns = self._db_engine.run_query_columns(
+            select_phrase + from_phrase + where_phrase + group_by_phrase, parameters)
+
+        groups_keys = zip(*[groups_columns[f"group_column_{i}"].tolist() for i in range(len(group_by_columns))])
+        return {group_key: [int(candidate_id) for candidate_id in str(group_members).split(',')]
+                for group_key, group_members in zip(groups_keys, groups_columns['group_members'].tolist())}
+
     def _extract_data_from_db(self) -> None:
         # Abstract function.
         pass
 
+    @staticmethod
+    def get_constraint_definition(tables_dict: dict, committee_members_list: list, candidates_tables: list,
+                                  comparison_atoms: list, constants: dict) -> list:
+        """Get a canonical (json serializable) definition of a constraint (or a constraint side), where the order of
+        the tables, the candidates tables and the comparison atoms is ignored.
+
+        :param tables_dict: The tables-variable dict of the constraint.
+        :param committee_members_list: The committee members list (their order is kept, it is the result columns order).
+        :param candidates_tables: The tables (new) names that containing the candidate id column.
+        :param comparison_atoms: A list of tuples of the form ('x','<','y').
+        :param constants: A constants variables dict.
+        :return: The constraint definition.
+        """
+        return [sorted([[list(table), [list(variable) for variable in variables]]
+                        for table, variables in tables_dict.items()], key=str),
+                list(committee_members_list),
+                sorted(candidates_tables),
+                sorted([list(comparison_atom) for comparison_atom in comparison_atoms], key=str),
+                {str(variable): str(constant_value) for variable, constant_value in constants.items()}]
+
+    def _get_cache_definition(self):
+        # The extraction definition of the extraction cache key (None if the extraction is not cached).
+        return None
+
+    def _get_cache_ranges(self) -> dict:
+        # The ids ranges of the extraction cache key.
+        return {'candidates': [self._candidates_starting_point, self._candidates_ending_point,
+                               self._candidates_size_limit]}
+
+    def _get_cache_arrays(self) -> dict:
+        # The extracted data, as a dict of arrays names to arrays (saved in the extraction cache).
+        return dict()
+
+    def _set_cache_arrays(self, arrays: dict) -> None:
+        # Set the extracted data from the extraction cache arrays.
+        pass
+
     def extract_data_from_db(self) -> None:
         start = time.time()
-        self._extract_data_from_db()
+        cache_key = None
+        if config.EXTRACTION_CACHE and self._get_cache_definition() is not None:
+            cache_key = extraction_cache.get_cache_key(self._db_engine.database_path, self._get_cache_definition(),
+                                                       self._get_cache_ranges())
+        cached_arrays = extraction_cache.load(cache_key) if cache_key is not None else None
+        if cached_arrays is not None:
+            self._set_cache_arrays(cached_arrays)
+        else:
+            self._extract_data_from_db()
+            if cache_key is not None:
+                extraction_cache.save(cache_key, self._get_cache_arrays())
+        self.extraction_cache_hit = None if cache_key is None else cached_arrays is not None
         end = time.time()
         self.extract_data_timer = end - start
 
@@ -162,6 +508,13 @@ class DBDataExtractor:
             input_str += " AND "
         return input_str
 
+    @staticmethod
+    def sql_parameter(constant_value):
+        # A digits only constant is compared as a number, otherwise as is.
+        if str(constant_value).isdigit():
+            return int(str(constant_value))
+        return constant_value
+
     @staticmethod
     def sql_remove_and(input_str: str) -> str:
         if len(input_str) >= 4:
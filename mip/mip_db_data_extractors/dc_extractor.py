@@ -1,9 +1,14 @@
 """A class for extracting the db data of an ABC contextual constraint - DC to a MIP constraint.
 """
+import numpy as np
+
 import config
 from database import database_server_interface as db_interface
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.dc_contraction as dc_contraction
+import mip.mip_reduction.presolve as presolve
 import mip.mip_db_data_extractors.db_data_extractor as db_data_extractor
+import mip.mip_db_data_extractors.extraction_cache as extraction_cache
 import frontend.utils as utils
 
 MODULE_NAME = "DC DB Data Extractor"
@@ -70,6 +75,8 @@ class DCExtractor(db_data_extractor.DBDataExtractor):
         self._committee_members_list = committee_members_list
         self._candidates_tables = candidates_tables
         self._dc_candidates_sets = None
+        # The candidates groups of a compiled DC (None if the DC is not compiled).
+        self._dc_cardinality_groups = None
 
     def _test_comparison_atoms(self) -> bool:
         """Test the validity of a the comparison atoms.
@@ -102,8 +109,36 @@ class DCExtractor(db_data_extractor.DBDataExtractor):
         if len(self._committee_members_list) == 0:
             raise DCNoCommitteeMemberRelationUsageError()
 
+        # Compile a DC of the form 'no k committee members share the same attributes values' into the candidates group
+        # of each attributes value (instead of a k-way self join).
+        if config.COMPILE_CARDINALITY_CONSTRAINTS:
+            cardinality_shape = self.get_cardinality_shape(self._dc_dict, self._committee_members_list,
+                                                           self._candidates_tables, self._comparison_atoms,
+                                                           self._constants)
+            if cardinality_shape is not None:
+                table_name, candidates_column_name, shared_variables = cardinality_shape
+                self._dc_cardinality_groups = list(self.group_candidates(
+                    table_name, candidates_column_name, list(shared_variables.values()),
+                    {shared_variables[variable]: constant_value for variable, constant_value in self._constants.items()
+                     if variable in shared_variables},
+                    len(self._committee_members_list)).values())
+                config.debug_print(MODULE_NAME, f"The DC is compiled into {len(self._dc_cardinality_groups)} "
+                                                f"candidates groups.")
+                return
+
+        # Deduplicate the DC tuples chunk by chunk, instead of loading the whole join result.
+        if config.DC_STREAMING_EXTRACTION:
+            self._dc_candidates_sets = dc_contraction.get_unique_rows_from_chunks(
+                self.join_tables_chunks(self._candidates_tables, self._dc_dict, self._constants,
+                                        self._comparison_atoms, self._committee_members_list,
+                                        config.DC_EXTRACTION_CHUNK_SIZE, self._committee_members_list),
+                len(self._committee_members_list))
+            config.debug_print(MODULE_NAME, f"The DC has {len(self._dc_candidates_sets)} distinct candidates sets.")
+            return
+
         legal_assignments = self.join_tables(self._candidates_tables, self._dc_dict, self._constants,
-                                             self._comparison_atoms)
+                                             self._comparison_atoms, self._committee_members_list,
+                                             self._committee_members_list)
 
         # Extract the committee members sets out of the resulted join.
         dc_candidates_df = legal_assignments[self._committee_members_list]
@@ -114,9 +149,54 @@ class DCExtractor(db_data_extractor.DBDataExtractor):
         # Save all DC groups in one set.
         self._dc_candidates_sets = dc_candidates_df.values
 
+    def _get_cache_definition(self):
+        return ['dc', self.get_constraint_definition(self._dc_dict, self._committee_members_list,
+                                                     self._candidates_tables, self._comparison_atoms, self._constants),
+                config.COMPILE_CARDINALITY_CONSTRAINTS, config.ORDER_INTERCHANGEABLE_COMMITTEE_MEMBERS]
+
+    def _get_cache_arrays(self) -> dict:
+        if self._dc_cardinality_groups is not None:
+            groups_pointers, groups_members = extraction_cache.to_compressed_rows(self._dc_cardinality_groups)
+            return {'cardinality_groups_pointers': groups_pointers, 'cardinality_groups_members': groups_members}
+        return {'dc_candidates_sets': np.asarray(self._dc_candidates_sets)}
+
+    def _set_cache_arrays(self, arrays: dict) -> None:
+        if 'cardinality_groups_pointers' in arrays:
+            self._dc_cardinality_groups = [group.tolist() for group in extraction_cache.from_compressed_rows(
+                arrays['cardinality_groups_pointers'], arrays['cardinality_groups_members'])]
+        else:
+            self._dc_candidates_sets = arrays['dc_candidates_sets']
+
+    def presolve_constraint(self, forced_in: set, forced_out: set) -> int:
+        """Reduce the extracted DC by the presolve forced candidates (see presolve.propagate_constraints).
+
+        :param forced_in: The candidates that must be in the committee.
+        :param forced_out: The candidates that cannot be in the committee.
+        :return: The number of removed DC sets (or groups).
+        """
+        if self._dc_cardinality_groups is not None:
+            constraints_number = len(self._dc_cardinality_groups)
+            self._dc_cardinality_groups = presolve.reduce_dc_cardinality_groups(
+                self._dc_cardinality_groups, len(self._committee_members_list) - 1, forced_out)
+            return constraints_number - len(self._dc_cardinality_groups)
+        constraints_number = len(self._dc_candidates_sets)
+        self._dc_candidates_sets = presolve.reduce_dc_candidates_sets(self._dc_candidates_sets, forced_out)
+        return constraints_number - len(self._dc_candidates_sets)
+
     def _convert_to_mip(self) -> None:
-        self._abc_convertor.define_dc(
-            self._dc_candidates_sets)
+        self.define_constraint(self._abc_convertor, self.activation_key)
+
+    def define_constraint(self, abc_convertor: abc_to_mip_convertor.ABCToMIPConvertor, activation_key=None) -> None:
+        """Add the extracted DC to the model of the given convertor (after its ABC setting is defined).
+
+        :param abc_convertor: An instance of an ABC to MIP convertor.
+        :param activation_key: If given, the DC is guarded by the activation literal of this key.
+        """
+        if self._dc_cardinality_groups is not None:
+            abc_convertor.define_dc_cardinality(self._dc_cardinality_groups, len(self._committee_members_list) - 1,
+                                                activation_key)
+        else:
+            abc_convertor.define_dc(self._dc_candidates_sets, activation_key)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,153 @@
+"""A content addressed on disk cache of the data extracted from the DB (the ABC setting and the DC/TGD tuples).
+An entry key is a hash of the db file fingerprint, the canonical extraction definition (e.g. the constraint), the ids
+ranges and the approval threshold. An entry is a folder of .npy files (loaded memory mapped), and the least recently
+used entries are evicted when the cache exceeds its size limit.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+
+import config
+
+MODULE_NAME = "Extraction Cache"
+
+# The version of the cache entries format (a change invalidates all the entries).
+CACHE_FORMAT_VERSION = 1
+# The size (in bytes) of each cache folder, computed once per process and then updated by the saved and evicted
+# entries (hence the folder is walked only when the size limit is exceeded).
+_cache_folders_sizes = dict()
+
+
+def get_db_fingerprint(database_path: str) -> list:
+    """Get a fingerprint of a db file (its name, size and modification time).
+
+    :param database_path: The db file path.
+    :return: The db fingerprint.
+    """
+    database_stat = os.stat(database_path)
+    return [os.path.basename(database_path), database_stat.st_size, database_stat.st_mtime_ns]
+
+
+def get_cache_key(database_path: str, definition, ranges: dict) -> str:
+    """Get the cache key of an extraction.
+
+    :param database_path: The db file path.
+    :param definition: The extraction definition (a json serializable object, e.g. the constraint tables dict items).
+    :param ranges: The candidates (and voters) ids ranges.
+    :return: The cache key.
+    """
+    key_content = json.dumps([CACHE_FORMAT_VERSION, get_db_fingerprint(database_path), definition, ranges,
+                              config.APPROVAL_THRESHOLD], sort_keys=True, default=str)
+    return hashlib.sha256(key_content.encode()).hexdigest()
+
+
+def load(cache_key: str):
+    """Load a cache entry.
+
+    :param cache_key: The cache key.
+    :return: A dict of the entry arrays names to their (memory mapped) arrays, or None for a cache miss.
+    """
+    entry_path = os.path.join(config.EXTRACTION_CACHE_FOLDER_PATH, cache_key)
+    try:
+        arrays = {file_name[:-len('.npy')]: np.load(os.path.join(entry_path, file_name), mmap_mode='r',
+                                                    allow_pickle=False)
+                  for file_name in os.listdir(entry_path) if file_name.endswith('.npy')}
+        # Mark the entry as recently used.
+        os.utime(entry_path)
+    except (OSError, ValueError):
+        return None
+    config.debug_print(MODULE_NAME, f"Cache hit of the entry {cache_key}.")
+    return arrays
+
+
+def save(cache_key: str, arrays: dict) -> None:
+    """Save a cache entry (an entry with object arrays is not saved), and evict the least recently used entries if the
+    cache exceeds its size limit.
+
+    :param cache_key: The cache key.
+    :param arrays: A dict of the entry arrays names to their arrays.
+    """
+    if any([np.asarray(array).dtype == object for array in arrays.values()]):
+        return
+    cache_folder_path = config.EXTRACTION_CACHE_FOLDER_PATH
+    os.makedirs(cache_folder_path, exist_ok=True)
+    # Write the entry to a temporary folder and rename it, so a concurrent reader never sees a partial entry.
+    temporary_path = os.path.join(cache_folder_path, f".{cache_key}.{uuid.uuid4().hex}")
+    os.makedirs(temporary_path)
+    try:
+        for array_name, array in arrays.items():
+            np.save(os.path.join(temporary_path, f"{array_name}.npy"), np.asarray(array), allow_pickle=False)
+        entry_size = _get_entry_size(temporary_path)
+        os.rename(temporary_path, os.path.join(cache_folder_path, cache_key))
+    except OSError:
+        # The entry was already saved (by a concurrent extraction), or could not be saved.
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        return
+
+    if cache_folder_path in _cache_folders_sizes:
+        _cache_folders_sizes[cache_folder_path] += entry_size
+    else:
+        _cache_folders_sizes[cache_folder_path] = sum([size for _, size, _ in _get_entries()])
+    if _cache_folders_sizes[cache_folder_path] > config.EXTRACTION_CACHE_SIZE_LIMIT:
+        evict()
+
+
+def _get_entry_size(entry_path: str) -> int:
+    return sum([os.path.getsize(os.path.join(entry_path, file_name)) for file_name in os.listdir(entry_path)])
+
+
+def _get_entries() -> list:
+    # The cache entries, as tuples of their last use time, size and path.
+    entries = []
+    for entry_name in os.listdir(config.EXTRACTION_CACHE_FOLDER_PATH):
+        entry_path = os.path.join(config.EXTRACTION_CACHE_FOLDER_PATH, entry_name)
+        if entry_name.startswith('.') or not os.path.isdir(entry_path):
+            continue
+        try:
+            entries.append((os.path.getmtime(entry_path), _get_entry_size(entry_path), entry_path))
+        except OSError:
+            continue
+    return entries
+
+
+def evict() -> None:
+    """Remove the least recently used entries, until the cache size is within config.EXTRACTION_CACHE_SIZE_LIMIT.
+    """
+    entries = _get_entries()
+    cache_size = sum([entry_size for _, entry_size, _ in entries])
+    for _, entry_size, entry_path in sorted(entries):
+        if cache_size <= config.EXTRACTION_CACHE_SIZE_LIMIT:
+            break
+        shutil.rmtree(entry_path, ignore_errors=True)
+        cache_size -= entry_size
+        config.debug_print(MODULE_NAME, f"Evicted the entry {os.path.basename(entry_path)}.")
+    _cache_folders_sizes[config.EXTRACTION_CACHE_FOLDER_PATH] = cache_size
+
+
+def to_compressed_rows(rows) -> tuple:
+    """Convert a list of variable length rows to a compressed rows format.
+
+    :param rows: An iterable of iterables.
+    :return: The rows pointers array, and the concatenated rows array (row i is values[pointers[i]:pointers[i + 1]]).
+    """
+    rows = [list(row) for row in rows]
+    pointers = np.concatenate(([0], np.cumsum([len(row) for row in rows], dtype=np.int64)))
+    values = np.array([value for row in rows for value in row])
+    return pointers, values
+
+
+def from_compressed_rows(pointers: np.ndarray, values: np.ndarray) -> list:
+    """Convert a compressed rows format to a list of rows (arrays).
+
+    :param pointers: The rows pointers array.
+    :param values: The concatenated rows array.
+    :return: The list of rows.
+    """
+    return [values[pointers[i]:pointers[i + 1]] for i in range(len(pointers) - 1)]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,244 @@
+"""A utility module for planning the SQL query of a constraint join (see DBDataExtractor.join_tables) - each table is
+filtered in its own subquery (by the candidates ids range, the constants and the comparison atoms of its own variables),
+only the variables the join result needs are projected, and the tables are joined in the order of their estimated
+cardinality (from the tables statistics), where an inequality between two tables is joined by index range probes.
+"""
+from itertools import count
+
+import config
+import frontend.utils as utils
+
+MODULE_NAME = "Join Query Planner"
+
+# The selectivity estimates of the filters without column statistics (an equality and any other comparison).
+DEFAULT_EQUALITY_SELECTIVITY = 0.1
+DEFAULT_COMPARISON_SELECTIVITY = 0.25
+# A counter for creating different range join temporary tables names.
+_RANGE_JOIN_TABLES_COUNTER = count()
+
+
+def _get_atom_variables(comparison_atom, variables: set) -> set:
+    # The variables of the comparison atom operands (the other operands are values).
+    return {str(operand) for operand in (comparison_atom[0], comparison_atom[2])
+            if utils.check_string_type(str(operand)) == 'name' and str(operand) in variables}
+
+
+def estimate_table_cardinality(table_statistics: tuple, equality_columns: list, comparison_atoms_number: int,
+                               candidates_number: int = None) -> float:
+    """Estimate the number of rows of a filtered table.
+
+    :param table_statistics: A tuple of the number of rows, and a dict of the average number of rows per column value
+    (see Database.get_table_statistics).
+    :param equality_columns: The columns with an equality filter (to a constant or to another column of the table).
+    :param comparison_atoms_number: The number of the other comparison filters.
+    :param candidates_number: If given, the number of candidates in the candidates ids range filter.
+    :return: The estimated number of rows.
+    """
+    rows_number, columns_rows_per_value = table_statistics
+    cardinality = float(rows_number)
+    for column_name in equality_columns:
+        if column_name in columns_rows_per_value and rows_number > 0:
+            cardinality *= min(1.0, columns_rows_per_value[column_name] / rows_number)
+        else:
+            cardinality *= DEFAULT_EQUALITY_SELECTIVITY
+    cardinality *= DEFAULT_COMPARISON_SELECTIVITY ** comparison_atoms_number
+    if candidates_number is not None and rows_number > 0:
+        # The candidates column distinct values, where a column without statistics is assumed to be unique.
+        candidates_values_number = rows_number / columns_rows_per_value.get(config.CANDIDATES_COLUMN_NAME, 1)
+        cardinality *= min(1.0, candidates_number / max(candidates_values_number, 1))
+    return cardinality
+
+
+def order_tables(tables_cardinalities: dict, tables_variables: dict) -> list:
+    """Order the tables for the join, starting from the smallest table, and then repeatedly the smallest table sharing a
+    variable with the joined tables (a table without shared variables is cross joined only when there is no other).
+
+    :param tables_cardinalities: A dict with the table (new) name as key, and its estimated number of rows as value.
+    :param tables_variables: A dict with the table (new) name as key, and its variables set as value.
+    :return: The tables (new) names in the join order.
+    """
+    remaining_tables = list(tables_cardinalities)
+    joined_tables, joined_variables = [], set()
+    while len(remaining_tables) > 0:
+        connected_tables = [table for table in remaining_tables if tables_variables[table] & joined_variables]
+        next_table = min(connected_tables if len(connected_tables) > 0 else remaining_tables,
+                         key=lambda table: tables_cardinalities[table])
+        remaining_tables.remove(next_table)
+        joined_tables.append(next_table)
+        joined_variables.update(tables_variables[next_table])
+    return joined_tables
+
+
+def get_range_join_tables(join_atoms: list, tables_order: list, tables_variables_columns: dict,
+                          variables_first_table: dict, tables_cardinalities: dict, subqueries: dict) -> dict:
+    """Get the range join tables of the inequality comparison atoms between the variables of two joined tables - the
+    later joined (inner) table subquery is materialized into an indexed temporary table (by its equality join variables
+    and then its inequality variable), hence each outer row probes the index for its range of inner rows (instead of a
+    nested loop over all of them), and the join takes O(n log n + output) time.
+    Note: A '!=' atom is kept as is (its output is almost all the pairs).
+
+    :param join_atoms: The comparison atoms of the join (between the variables of different tables).
+    :param tables_order: The tables (new) names in the join order.
+    :param tables_variables_columns: A dict with the table (new) name as key, and a dict of its variables to their
+    columns as value.
+    :param variables_first_table: A dict with the variable as key, and its first joined table (new) name as value.
+    :param tables_cardinalities: A dict with the table (new) name as key, and its estimated number of rows as value.
+    :param subqueries: A dict with the table (new) name as key, and a tuple of its subquery and its parameters as value.
+    :return: A dict with the inner table (new) name as key, and a tuple of the temporary table name, the subquery, its
+    parameters and the index variables as value.
+    """
+    range_join_tables = dict()
+    if not config.INEQUALITY_RANGE_JOINS:
+        return range_join_tables
+    tables_positions = {new_table_name: position for position, new_table_name in enumerate(tables_order)}
+    for comparison_atom in join_atoms:
+        atom_variables = [str(operand) for operand in (comparison_atom[0], comparison_atom[2])
+                          if utils.check_string_type(str(operand)) == 'name' and str(operand) in variables_first_table]
+        if comparison_atom[1] not in ('<', '>', '<=', '>=') or len(atom_variables) != 2 or \
+                variables_first_table[atom_variables[0]] == variables_first_table[atom_variables[1]]:
+            continue
+        inner_table_name = max([variables_first_table[variable] for variable in atom_variables],
+                               key=lambda new_table_name: tables_positions[new_table_name])
+        if inner_table_name in range_join_tables or \
+                tables_cardinalities[inner_table_name] < config.RANGE_JOIN_MIN_ROWS:
+            continue
+        inequality_variable = [variable for variable in atom_variables
+                               if variables_first_table[variable] == inner_table_name][0]
+        # The inner table variables which are equal to the variables of the tables joined before it.
+        index_variables = [variable for variable in tables_variables_columns[inner_table_name]
+                           if tables_positions[variables_first_table[variable]] < tables_positions[inner_table_name]]
+        range_join_tables[inner_table_name] = (f"{inner_table_name}_range_join_{next(_RANGE_JOIN_TABLES_COUNTER)}",
+                                               *subqueries[inner_table_name],
+                                               index_variables + [inequality_variable])
+    return range_join_tables
+
+
+def plan_join_query(tables_dict: dict, candidate_tables: list, constants: dict, comparison_atoms: list,
+                    candidates_range: tuple, tables_statistics: dict, selected_variables: list = None,
+                    distinct: bool = True) -> tuple:
+    """Plan the SQL query of a join (as in DBDataExtractor.join_tables).
+
+    :param tables_dict: A tables dict (as in the join tables function).
+    :param candidate_tables: The tables (new) names containing config.CANDIDATES_COLUMN_NAME (filtered by the
+    candidates ids range).
+    :param constants: A constants variables dict.
+    :param comparison_atoms: A list of tuples of the form ('x','<','y').
+    :param candidates_range: A tuple of the candidates starting point, ending point and the number of candidates.
+    :param tables_statistics: A dict with the table (original) name as key, and its statistics as value (see
+    Database.get_table_statistics).
+    :param selected_variables: The variables of the join result, all the variables if None.
+    :param distinct: Whether to select distinct rows.
+    :return: A tuple of the SQL query, its parameters, and the range join tables it uses (see get_range_join_tables),
+    which should be created as temporary tables before the query runs.
+    """
+    # The variables of each table, and the (first) column of each variable in it.
+    tables_variables_columns = dict()
+    tables_names = dict()
+    variables_tables = dict()
+    for original_table_name, new_table_name in tables_dict:
+        tables_names[new_table_name] = original_table_name
+        variables_columns = tables_variables_columns.setdefault(new_table_name, dict())
+        for variable, column_name in tables_dict[(original_table_name, new_table_name)]:
+            variables_columns.setdefault(variable, column_name)
+            if new_table_name not in variables_tables.setdefault(variable, []):
+                variables_tables[variable].append(new_table_name)
+    if selected_variables is None:
+        selected_variables = list(variables_tables)
+
+    # Push down the comparison atoms of a single table variables (or of values only) into the table subquery.
+    tables_atoms = {new_table_name: [] for new_table_name in tables_names}
+    join_atoms = []
+    for comparison_atom in comparison_atoms:
+        atom_variables = _get_atom_variables(comparison_atom, set(variables_tables))
+        atom_tables = [new_table_name for new_table_name, variables_columns in tables_variables_columns.items()
+                       if atom_variables <= variables_columns.keys()]
+        if len(atom_variables) > 0 and len(atom_tables) > 0:
+            tables_atoms[atom_tables[0]].append(comparison_atom)
+        else:
+            join_atoms.append(comparison_atom)
+
+    # The variables each subquery projects - the selected variables, the join variables and the join atoms variables.
+    needed_variables = set(selected_variables)
+    needed_variables.update([variable for variable, tables in variables_tables.items() if len(tables) > 1])
+    for comparison_atom in join_atoms:
+        needed_variables.update(_get_atom_variables(comparison_atom, set(variables_tables)))
+
+    # Create a subquery per table.
+    subqueries = dict()
+    tables_cardinalities = dict()
+    for (original_table_name, new_table_name), variables in tables_dict.items():
+        variables_columns = tables_variables_columns[new_table_name]
+        where_conditions, parameters, equality_columns = [], [], []
+        # A variable of two columns of the table is an equality between them.
+        for variable, column_name in variables:
+            if column_name != variables_columns[variable]:
+                where_conditions.append(f"{variables_columns[variable]} = {column_name}")
+                equality_columns.append(column_name)
+        candidates_number = None
+        if new_table_name in candidate_tables:
+            where_conditions.append(f"{config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ?")
+            parameters.extend(candidates_range[:2])
+            candidates_number = candidates_range[2]
+        for variable, constant_value in constants.items():
+            for current_variable, column_name in variables:
+                if current_variable == variable:
+                    where_conditions.append(f"{column_name}=?")
+                    parameters.append(constant_value)
+                    equality_columns.append(column_name)
+        for comparison_atom in tables_atoms[new_table_name]:
+            operands = [variables_columns.get(str(operand), str(operand))
+                        for operand in (comparison_atom[0], comparison_atom[2])]
+            where_conditions.append(f"{operands[0]}{comparison_atom[1]}{operands[1]}")
+
+        projected_variables = [variable for variable in variables_columns if variable in needed_variables]
+        # A table without projected variables is projected by a constant (it only filters the join).
+        select_phrase = ', '.join([f"{variables_columns[variable]} AS {variable}" for variable in projected_variables])
+        subquery = f"SELECT {select_phrase if len(select_phrase) > 0 else '1 AS _exists'} FROM {original_table_name}"
+        if len(where_conditions) > 0:
+            subquery += " WHERE " + " AND ".join(where_conditions)
+        subqueries[new_table_name] = (subquery, parameters)
+        tables_cardinalities[new_table_name] = estimate_table_cardinality(
+            tables_statistics[original_table_name], equality_columns,
+            len(tables_atoms[new_table_name]), candidates_number)
+
+    tables_order = order_tables(tables_cardinalities, {new_table_name: set(variables_columns)
+                                                       for new_table_name, variables_columns in
+                                                       tables_variables_columns.items()})
+    config.debug_print(MODULE_NAME, f"The estimated tables cardinalities are: {tables_cardinalities}, "
+                                    f"and the join order is: {tables_order}.")
+
+    # Each variable of a few tables is equal to its first joined table variable.
+    variables_first_table = dict()
+    where_conditions = []
+    for new_table_name in tables_order:
+        for variable in tables_variables_columns[new_table_name]:
+            if variable not in variables_first_table:
+                variables_first_table[variable] = new_table_name
+            elif variable in needed_variables:
+                where_conditions.append(f"{variables_first_table[variable]}.{variable} = {new_table_name}.{variable}")
+
+    range_join_tables = get_range_join_tables(join_atoms, tables_order, tables_variables_columns,
+                                              variables_first_table, tables_cardinalities, subqueries)
+    # Create the join (in the tables order, which CROSS JOIN keeps), where a range join table replaces its subquery.
+    from_tables, parameters = [], []
+    for new_table_name in tables_order:
+        if new_table_name in range_join_tables:
+            from_tables.append(f"{range_join_tables[new_table_name][0]} AS {new_table_name}")
+        else:
+            from_tables.append(f"({subqueries[new_table_name][0]}) AS {new_table_name}")
+            parameters.extend(subqueries[new_table_name][1])
+    from_phrase = 'FROM ' + '\nCROSS JOIN '.join(from_tables)
+    for comparison_atom in join_atoms:
+        operands = [f"{variables_first_table[str(operand)]}.{operand}" if str(operand) in variables_first_table and
+                    utils.check_string_type(str(operand)) == 'name' else str(operand)
+                    for operand in (comparison_atom[0], comparison_atom[2])]
+        where_conditions.append(f"{operands[0]}{comparison_atom[1]}{operands[1]}")
+
+    select_phrase = ('SELECT DISTINCT ' if distinct else 'SELECT ') + \
+        ', '.join([f"{variables_first_table[variable]}.{variable} AS {variable}" for variable in selected_variables])
+    where_phrase = '\nWHERE ' + ' AND '.join(where_conditions) if len(where_conditions) > 0 else ''
+    return select_phrase + '\n' + from_phrase + where_phrase + '\n', parameters, list(range_join_tables.values())
+
+
+if __name__ == '__main__':
+    pass
@@ -3,8 +3,11 @@
 import config
 from database import database_server_interface as db_interface
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.presolve as presolve
 import mip.mip_db_data_extractors.db_data_extractor as db_data_extractor
+import mip.mip_db_data_extractors.extraction_cache as extraction_cache
 
+import numpy as np
 import pandas as pd
 
 MODULE_NAME = "TGD DB Data Extractor"
@@ -92,6 +95,8 @@ class TGDExtractor(db_data_extractor.DBDataExtractor):
         self._comparison_atoms_end = comparison_atoms_end
 
         self._tgd_tuples_list = None
+        # The candidates groups of a compiled TGD (None if the TGD is not compiled).
+        self._tgd_cardinality_groups = None
 
     def _extract_data_from_db(self) -> None:
         """Extracts the TGD data from the DB, save the result within the class.
@@ -128,6 +133,18 @@ class TGDExtractor(db_data_extractor.DBDataExtractor):
                                             "there is no actual constraint on the committee.")
             self._tgd_tuples_list = []
             raise TGDNoCommitteeMemberRelationUsageError
+
+        # Compile a TGD of the form 'for each left hand side attributes value, there are at least k committee members
+        # with this attributes value' into the candidates group of each attributes value (instead of a k-way self join
+        # per left hand side assignment).
+        if config.COMPILE_CARDINALITY_CONSTRAINTS:
+            self._tgd_cardinality_groups = self._extract_cardinality_groups(legal_assignments_start)
+            if self._tgd_cardinality_groups is not None:
+                config.debug_print(MODULE_NAME, f"The TGD is compiled into {len(self._tgd_cardinality_groups)} "
+                                                f"candidates groups.")
+                self._tgd_tuples_list = []
+                return
+
         # If the left hand side is empty completely (both from relations and Com relation) than we treat it as 'true'.
         if (len(self._committee_members_list_start) == 0) and (len(self._tgd_dict_start) == 0):
             config.debug_print(MODULE_NAME, "Note: The TGD left hand side is empty, treat as if it is 'true'.")
@@ -137,6 +154,10 @@ class TGDExtractor(db_data_extractor.DBDataExtractor):
             current_element_committee_members = set()
             tgd_tuples_list = self._extract_data_from_db_aux(legal_assignments_end, tgd_tuples_list,
                                                              current_element_committee_members)
+        elif config.BATCH_TGD_EXTRACTION and \
+                not {new_table_name for _, new_table_name in self._tgd_dict_start} & \
+                {new_table_name for _, new_table_name in self._tgd_dict_end}:
+            tgd_tuples_list = self._extract_data_from_db_in_batch(legal_assignments_start)
         else:
             # Extract the committee members sets out of the resulted join.
             for _, row in legal_assignments_start.iterrows():
@@ -161,16 +182,179 @@ class TGDExtractor(db_data_extractor.DBDataExtractor):
         config.debug_print(MODULE_NAME, f"The tgd tuples list is {tgd_tuples_list}")
         self._tgd_tuples_list = tgd_tuples_list
 
+    def _extract_data_from_db_in_batch(self, legal_assignments_start: pd.DataFrame) -> list:
+        """Extract the TGD tuples with a single joined query of both sides of the TGD (instead of a query per left hand
+        side assignment), where the right hand side representatives are grouped per left hand side assignment.
+
+        :param legal_assignments_start: The legal assignments of the left hand side.
+        :return: The TGD tuples list, where the left hand side members and the representatives sets are arrays.
+        """
+        if len(legal_assignments_start) == 0:
+            return []
+        start_variables = list(legal_assignments_start.columns)
+        if set(start_variables) & self._constants_end.keys():
+            raise ValueError(
+                "The input tgd_constants_end and the assignment of the committee members at the left "
+                "hand side of the TGD (committee_members_list_start) are overlap.")
+
+        # Join both sides of the TGD, the left hand side variables are joined with the same right hand side variables.
+        legal_assignments = self.join_tables(self._candidates_tables_start + self._candidates_tables_end,
+                                             {**self._tgd_dict_start, **self._tgd_dict_end},
+                                             {**self._constants_start, **self._constants_end},
+                                             self._comparison_atoms_start + self._comparison_atoms_end)
+        # Match each joined row to its left hand side assignment (row number), and split the representatives per
+        # assignment.
+        legal_assignments_start = legal_assignments_start.reset_index(drop=True)
+        assignments_rows = legal_assignments_start.assign(start_assignment_row=range(len(legal_assignments_start)))
+        if len(legal_assignments) > 0:
+            legal_assignments = assignments_rows.merge(
+                legal_assignments[start_variables + self._committee_members_list_end].drop_duplicates(),
+                on=start_variables, how='inner')
+        else:
+            legal_assignments = assignments_rows.iloc[:0].assign(
+                **{variable: [] for variable in self._committee_members_list_end})
+        order = np.argsort(legal_assignments['start_assignment_row'].to_numpy(), kind='stable')
+        representatives_counts = np.bincount(legal_assignments['start_assignment_row'].to_numpy(dtype=np.int64),
+                                             minlength=len(legal_assignments_start))
+        representatives_sets = np.split(legal_assignments[self._committee_members_list_end].to_numpy()[order],
+                                        np.cumsum(representatives_counts)[:-1])
+        element_members = legal_assignments_start[self._committee_members_list_start].to_numpy()
+
+        tgd_tuples_list = []
+        for i in range(len(legal_assignments_start)):
+            if len(self._committee_members_list_end) == 0:
+                # The Com relation does not appear on the right hand side, there is a constraint only if there are no
+                # representatives (as in the single assignment case).
+                if representatives_counts[i] == 0:
+                    tgd_tuples_list.append((element_members[i], set()))
+            else:
+                tgd_tuples_list.append((element_members[i], representatives_sets[i]))
+        return tgd_tuples_list
+
+    def _extract_cardinality_groups(self, legal_assignments_start: pd.DataFrame):
+        """Extract the candidates groups of a TGD, if it is of the form 'for each left hand side attributes value, there
+        are at least k committee members with this attributes value' (i.e. there is no committee member in the left
+        hand side, and the right hand side is of the cardinality shape, where the shared variables are either joined
+        with the left hand side or constants).
+
+        :param legal_assignments_start: The legal assignments of the left hand side.
+        :return: None if the TGD is not of this form, otherwise the candidates group (could be empty) of each left hand
+        side attributes value.
+        """
+        if len(self._committee_members_list_start) > 0 or len(self._comparison_atoms_start) > 0:
+            return None
+        cardinality_shape = self.get_cardinality_shape(self._tgd_dict_end, self._committee_members_list_end,
+                                                       self._candidates_tables_end, self._comparison_atoms_end,
+                                                       self._constants_end)
+        if cardinality_shape is None:
+            return None
+        table_name, candidates_column_name, shared_variables = cardinality_shape
+
+        start_variables = {variable for variables in self._tgd_dict_start.values() for variable, _ in variables}
+        if start_variables & self._constants_end.keys() or \
+                any([variable not in start_variables and variable not in self._constants_end
+                     for variable in shared_variables]):
+            return None
+        key_variables = [variable for variable in shared_variables if variable in start_variables]
+
+        # The left hand side attributes values (a single empty value if the left hand side is 'true').
+        if len(self._tgd_dict_start) == 0:
+            keys = [()]
+        else:
+            keys = list(dict.fromkeys([tuple(row) for row in
+                                       legal_assignments_start[key_variables].itertuples(index=False)]))
+
+        candidates_groups = self.group_candidates(
+            table_name, candidates_column_name, [shared_variables[variable] for variable in key_variables],
+            {shared_variables[variable]: constant_value for variable, constant_value in self._constants_end.items()
+             if variable in shared_variables})
+        return [candidates_groups.get(key, []) for key in keys]
+
+    def _get_cache_definition(self):
+        return ['tgd',
+                self.get_constraint_definition(self._tgd_dict_start, self._committee_members_list_start,
+                                               self._candidates_tables_start, self._comparison_atoms_start,
+                                               self._constants_start),
+                self.get_constraint_definition(self._tgd_dict_end, self._committee_members_list_end,
+                                               self._candidates_tables_end, self._comparison_atoms_end,
+                                               self._constants_end),
+                config.COMPILE_CARDINALITY_CONSTRAINTS, config.BATCH_TGD_EXTRACTION]
+
+    def _get_cache_arrays(self) -> dict:
+        if self._tgd_cardinality_groups is not None:
+            groups_pointers, groups_members = extraction_cache.to_compressed_rows(self._tgd_cardinality_groups)
+            return {'cardinality_groups_pointers': groups_pointers, 'cardinality_groups_members': groups_members}
+        # The left hand side members are kept in compressed rows, and the representatives sets (rows of the right hand
+        # side committee members) of all the tuples are stacked, with a pointer per tuple.
+        representatives_size = len(self._committee_members_list_end)
+        members_pointers, members = extraction_cache.to_compressed_rows(
+            [element_members for element_members, _ in self._tgd_tuples_list])
+        representatives_sets = [np.asarray(tgd_representatives_sets).reshape(-1, representatives_size)
+                                for _, tgd_representatives_sets in self._tgd_tuples_list]
+        representatives_pointers = np.concatenate(
+            ([0], np.cumsum([len(sets) for sets in representatives_sets], dtype=np.int64)))
+        representatives_sets = [sets for sets in representatives_sets if len(sets) > 0]
+        representatives = np.concatenate(representatives_sets) if len(representatives_sets) > 0 else \
+            np.zeros((0, representatives_size), dtype=np.int64)
+        return {'members_pointers': members_pointers, 'members': members,
+                'representatives_pointers': representatives_pointers, 'representatives': representatives}
+
+    def _set_cache_arrays(self, arrays: dict) -> None:
+        if 'cardinality_groups_pointers' in arrays:
+            self._tgd_cardinality_groups = [group.tolist() for group in extraction_cache.from_compressed_rows(
+                arrays['cardinality_groups_pointers'], arrays['cardinality_groups_members'])]
+            self._tgd_tuples_list = []
+            return
+        representatives_pointers = arrays['representatives_pointers']
+        self._tgd_tuples_list = []
+        for i, element_members in enumerate(extraction_cache.from_compressed_rows(arrays['members_pointers'],
+                                                                                  arrays['members'])):
+            if len(self._committee_members_list_end) == 0:
+                # The Com relation does not appear on the right hand side (there are no representatives).
+                self._tgd_tuples_list.append((element_members, set()))
+            else:
+                self._tgd_tuples_list.append(
+                    (element_members,
+                     arrays['representatives'][representatives_pointers[i]:representatives_pointers[i + 1]]))
+
+    def presolve_constraint(self, forced_in: set, forced_out: set) -> int:
+        """Reduce the extracted TGD by the presolve forced candidates (see presolve.propagate_constraints).
+
+        :param forced_in: The candidates that must be in the committee.
+        :param forced_out: The candidates that cannot be in the committee.
+        :return: The number of removed TGD tuples (or groups).
+        """
+        if self._tgd_cardinality_groups is not None:
+            constraints_number = len(self._tgd_cardinality_groups)
+            self._tgd_cardinality_groups = presolve.reduce_tgd_cardinality_groups(
+                self._tgd_cardinality_groups, len(self._committee_members_list_end), forced_in, forced_out)
+            return constraints_number - len(self._tgd_cardinality_groups)
+        constraints_number = len(self._tgd_tuples_list)
+        self._tgd_tuples_list = presolve.reduce_tgd_tuples_list(self._tgd_tuples_list, forced_in, forced_out)
+        return constraints_number - len(self._tgd_tuples_list)
+
     def _convert_to_mip(self) -> None:
-        self._abc_convertor.define_tgd(self._tgd_tuples_list)
+        self.define_constraint(self._abc_convertor, self.activation_key)
+
+    def define_constraint(self, abc_convertor: abc_to_mip_convertor.ABCToMIPConvertor, activation_key=None) -> None:
+        """Add the extracted TGD to the model of the given convertor (after its ABC setting is defined).
+
+        :param abc_convertor: An instance of an ABC to MIP convertor.
+        :param activation_key: If given, the TGD is guarded by the activation literal of this key.
+        """
+        if self._tgd_cardinality_groups is not None:
+            abc_convertor.define_tgd_cardinality(self._tgd_cardinality_groups, len(self._committee_members_list_end),
+                                                 activation_key)
+        else:
+            abc_convertor.define_tgd(self._tgd_tuples_list, activation_key)
 
     def _extract_data_from_db_aux(self, legal_assignments_end, tgd_tuples_list, current_element_committee_members):
         if (len(self._committee_members_list_end) == 0) and (len(legal_assignments_end) > 0):
             # The Com relation does not appear on the right hand side, but there is representatives (in this case there
             # is no constraint on the committee).
             pass
-        # FIXME: In the following two cases, if len(legal_assignments_end) == 0 than the model will prove infeasible.
-        # FIXME: Therefore, we can optimize by deciding here, before finish extracting and sending to MIP solver.
+        # Note: In the following two cases, if len(legal_assignments_end) == 0 than the model will prove infeasible.
+        # This is decided by the constraints feasibility pre-check of the experiment, before extracting the voters.
         elif (len(self._committee_members_list_end) == 0) and (len(legal_assignments_end) == 0):
             # The Com relation does not appear on the right hand side, and there are no representatives (this will cause
             # the model to be infeasible).
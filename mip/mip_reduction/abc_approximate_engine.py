@@ -0,0 +1,421 @@
+import heapq
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import config
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.greedy_warm_start as greedy_warm_start
+import mip.mip_reduction.score_functions as score_functions
+
+MODULE_NAME = "ABC Approximate Engine"
+
+
+class ABCApproximateEngine(abc_to_mip_convertor.ABCToMIPConvertor):
+    """A class for finding a good (not necessarily optimal) winning committee fast, given the same inputs as the ABC to
+    MIP convertor (the ABC setting, the DC sets and the TGD tuples).
+    The committee is found by a lazy greedy marginal gain selection (with DC/TGD repair), followed by a swap based local
+    search under a time budget. For concave score functions an upper bound of the optimum (hence a bound gap) is
+    calculated as well.
+    """
+    def __init__(self, time_budget: float = None):
+        """Initializing the engine.
+        :param time_budget: The time budget (in seconds) of the search, if None the configured time budget is used.
+        """
+        super().__init__(None)
+        self._time_budget = config.APPROXIMATE_TIME_BUDGET if time_budget is None else time_budget
+        self._committee = set()
+        # The relative gap between the upper bound of the optimum and the resulted committee score (None if unknown).
+        self.bound_gap = None
+
+    def _define_abc_setting_model(self) -> None:
+        # There is no model, the candidates 'variables' are the candidates ids.
+        self.model_candidates_variables = {candidate_id: candidate_id for candidate_id in self._candidates_ids_set}
+
+    def _define_new_voters_model(self, voters_ids: list) -> None:
+        # There is no model, the search data (of all the voters) is prepared when solving.
+        pass
+
+    def can_set_committee_size(self, committee_size: int) -> bool:
+        # There is no model, any committee size can be set.
+        return True
+
+    def _set_model_committee_size(self) -> None:
+        # There is no model, the search data is prepared (by the committee size) when solving.
+        pass
+
+    def _get_variable_value(self, variable) -> float:
+        return float(variable in self._committee)
+
+    def print_all_model_variables(self) -> None:
+        config.debug_print(MODULE_NAME, f"The resulted committee is {sorted(self._committee)}.\n")
+
+    def can_add_voters(self) -> bool:
+        # There is no model (nor symmetry breaking constraints), the search data is prepared when solving.
+        return True
+
+    def _fix_candidate_variable(self, variable) -> None:
+        # There is no model, the fixed candidates are searched as TGDs with an empty left hand side.
+        pass
+
+    def _define_order_constraint(self, variable, next_variable) -> None:
+        # There is no model, the search is not restricted by the symmetry breaking.
+        pass
+
+    def _set_activation_literals_values(self, activation_literals_values: dict) -> None:
+        # There is no model (nor activation literals), only the active constraints are searched.
+        pass
+
+    def define_dc(self, dc_candidates_sets, activation_key=None):
+        """Add a given Denial Constraint.
+
+        :param dc_candidates_sets: A DC candidates groups, i.e. iterator with sets of denial candidates as value.
+        :param activation_key: If given, the DC is active only when its key is active (see set_active_constraints).
+        """
+        self._keep_constraints('_dc_candidates_sets', self._get_unique_dc_candidates_sets(dc_candidates_sets),
+                               activation_key)
+
+    def define_tgd(self, tgd_tuples_list: list, activation_key=None):
+        """Add a TGD.
+
+        :param tgd_tuples_list: A list of tuples - such that each tuple contain in the first place the
+        condition for the TGD (the 'left hand side' of the TGD), and in the second place there is set of sets (of
+        candidates), such that at least one set of candidate should be chosen (the 'right hand side' of the TGD).
+        :param activation_key: If given, the TGD is active only when its key is active (see set_active_constraints).
+        """
+        self._keep_constraints('_tgd_tuples_list', tgd_tuples_list, activation_key)
+
+    def define_dc_cardinality(self, candidates_groups: list, max_members: int, activation_key=None):
+        """Add a compiled DC.
+
+        :param candidates_groups: A list of candidates groups.
+        :param max_members: The max number of members of each group in the committee.
+        :param activation_key: If given, the DC is active only when its key is active (see set_active_constraints).
+        """
+        self._keep_constraints('_dc_cardinality_groups',
+                               [(candidates_group, max_members) for candidates_group in candidates_groups],
+                               activation_key)
+
+    def define_tgd_cardinality(self, candidates_groups: list, min_members: int, activation_key=None):
+        """Add a compiled TGD.
+
+        :param candidates_groups: A list of candidates groups.
+        :param min_members: The min number of members of each group in the committee.
+        :param activation_key: If given, the TGD is active only when its key is active (see set_active_constraints).
+        """
+        self._keep_constraints('_tgd_cardinality_groups',
+                               [(candidates_group, min_members) for candidates_group in candidates_groups],
+                               activation_key)
+
+    def solve(self) -> None:
+        """Find a committee, and saves the time it took, the status and if it solved indicator.
+        The status is optimal only if the bound gap is zero, and feasible but not proven optimal if a feasible committee
+        was found.
+        """
+        start_time = time.time()
+        deadline = start_time + self._time_budget
+        self._prepare_search_data()
+        committee = self._lazy_greedy()
+        committee = self._local_search(committee, deadline)
+        self._committee = {self._candidates_ids_list[candidate_index] for candidate_index in committee}
+
+        if self._count_violations(committee) == 0:
+            self._solved = True
+            if config.APPROXIMATE_BOUND_GAP and \
+                    score_functions.is_concave_score_function(self._voting_rule_score_function):
+                self.bound_gap = self._get_bound_gap(committee)
+            if self.bound_gap is not None and self.bound_gap <= 1e-9:
+                self.solver_status = config.SOLVER_FOUND_OPTIMAL_STATUS
+            else:
+                self.solver_status = config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS
+        else:
+            self._committee = set()
+            self.solver_status = config.SOLVER_ABNORMAL_ERROR_STATUS
+        self.solving_time = time.time() - start_time
+        config.debug_print(MODULE_NAME, f"The approximate committee is {sorted(self._committee)}, with status "
+                                        f"{self.solver_status} and bound gap {self.bound_gap}.\n")
+
+    def _prepare_search_data(self) -> None:
+        self._candidates_ids_list = list(self._candidates_ids_set)
+        self._candidates_indices = {candidate_id: i for i, candidate_id in enumerate(self._candidates_ids_list)}
+        self._number_of_candidates = len(self._candidates_ids_list)
+        self._entries_voters, self._entries_candidates = greedy_warm_start.get_approval_entries(
+            self._approval_profile, self._candidates_indices)
+        self._voters_gains = greedy_warm_start.get_voters_gains_table(
+            self._approval_profile, self._approval_profile.voters_weights, self._committee_size,
+            self._voting_rule_score_function)
+        # The approving voters of each candidate (the voters of candidate c are
+        # candidates_voters[candidates_pointers[c]:candidates_pointers[c + 1]]).
+        order = np.argsort(self._entries_candidates, kind='stable')
+        self._candidates_voters = self._entries_voters[order]
+        self._candidates_pointers = np.concatenate(
+            ([0], np.cumsum(np.bincount(self._entries_candidates, minlength=self._number_of_candidates))))
+        self._dc_sets, self._dc_sets_max_members, self._candidates_dc_sets = greedy_warm_start.get_candidates_dc_sets(
+            self._dc_candidates_sets, self._candidates_indices, self._dc_cardinality_groups)
+        self._tgd_groups = [([self._candidates_indices[candidate_id] for candidate_id in candidates_group
+                              if candidate_id in self._candidates_indices], min_members)
+                            for candidates_group, min_members in self._tgd_cardinality_groups]
+        self._prepare_violations_data()
+
+    def _prepare_violations_data(self) -> None:
+        # The TGD tuples as candidates indices (a tuple with a non-candidate element member is never violated, hence
+        # dropped, and a representatives set with a non-candidate member is never satisfied, hence dropped).
+        self._tgd_elements, self._tgd_representatives_sets, self._representatives_sets_tuples = [], [], []
+        for element_members, tgd_representatives_sets in self._tgd_tuples_list:
+            if not all([candidate_id in self._candidates_indices for candidate_id in element_members]):
+                continue
+            for representatives_set in tgd_representatives_sets:
+                if all([candidate_id in self._candidates_indices for candidate_id in representatives_set]):
+                    self._tgd_representatives_sets.append([self._candidates_indices[candidate_id]
+                                                           for candidate_id in representatives_set])
+                    self._representatives_sets_tuples.append(len(self._tgd_elements))
+            self._tgd_elements.append([self._candidates_indices[candidate_id] for candidate_id in element_members])
+        # Map each candidate to the DC sets, the TGD groups, the TGD elements and the TGD representatives sets
+        # containing it, so a swap updates only the members counts of the constraints of the swapped candidates.
+        self._candidates_constraints = (self._candidates_dc_sets, defaultdict(list), defaultdict(list),
+                                        defaultdict(list))
+        for candidates_constraints, members_lists in zip(
+                self._candidates_constraints[1:], [[tgd_group for tgd_group, _ in self._tgd_groups],
+                                                   self._tgd_elements, self._tgd_representatives_sets]):
+            for constraint_index, members in enumerate(members_lists):
+                for candidate_index in members:
+                    candidates_constraints[candidate_index].append(constraint_index)
+
+    def _get_candidate_voters(self, candidate_index: int) -> np.ndarray:
+        return self._candidates_voters[self._candidates_pointers[candidate_index]:
+                                       self._candidates_pointers[candidate_index + 1]]
+
+    def _get_candidate_gain(self, candidate_index: int, voters_approval_count: np.ndarray) -> float:
+        candidate_voters = self._get_candidate_voters(candidate_index)
+        return float(self._voters_gains[candidate_voters, voters_approval_count[candidate_voters]].sum())
+
+    def _get_candidates_gains(self, voters_approval_count: np.ndarray) -> np.ndarray:
+        return np.bincount(self._entries_candidates,
+                           weights=self._voters_gains[self._entries_voters,
+                                                      voters_approval_count[self._entries_voters]],
+                           minlength=self._number_of_candidates)
+
+    def _get_voters_approval_count(self, committee) -> np.ndarray:
+        voters_approval_count = np.zeros(len(self._approval_profile), dtype=np.int64)
+        for candidate_index in committee:
+            voters_approval_count[self._get_candidate_voters(candidate_index)] += 1
+        return voters_approval_count
+
+    def _is_dc_blocked(self, candidate_index: int, committee: set) -> bool:
+        # Whether adding the candidate exceeds the max number of members of a DC set.
+        return any([sum([member in committee for member in self._dc_sets[dc_index]]) >=
+                    self._dc_sets_max_members[dc_index]
+                    for dc_index in self._candidates_dc_sets.get(candidate_index, [])])
+
+    def _lazy_greedy(self) -> list:
+        # The marginal gains are non-increasing as the committee grows (for concave score functions), hence a stale
+        # gain is an upper bound, and a candidate whose recomputed gain is still the largest can be chosen.
+        voters_approval_count = np.zeros(len(self._approval_profile), dtype=np.int64)
+        candidates_gains = self._get_candidates_gains(voters_approval_count)
+        gains_heap = [(-gain, candidate_index) for candidate_index, gain in enumerate(candidates_gains.tolist())]
+        heapq.heapify(gains_heap)
+        gains_step = np.zeros(self._number_of_candidates, dtype=np.int64)
+
+        committee = []
+        committee_set = set()
+        for step in range(self._committee_size):
+            chosen_candidate_index = None
+            # If the remaining seats are needed for the unsatisfied TGDs, choose only candidates that satisfy them.
+            tgd_candidates = greedy_warm_start.get_unsatisfied_tgds_candidates(
+                {self._candidates_ids_list[candidate_index] for candidate_index in committee},
+                self._candidates_indices, self._tgd_tuples_list, self._committee_size - len(committee),
+                self._tgd_cardinality_groups)
+            if tgd_candidates is not None:
+                eligible_candidates = [candidate_index for candidate_index in tgd_candidates
+                                       if candidate_index not in committee_set and
+                                       not self._is_dc_blocked(candidate_index, committee_set)]
+                if len(eligible_candidates) > 0:
+                    chosen_candidate_index = max(eligible_candidates, key=lambda candidate_index:
+                                                 self._get_candidate_gain(candidate_index, voters_approval_count))
+            else:
+                while len(gains_heap) > 0:
+                    _, candidate_index = heapq.heappop(gains_heap)
+                    if candidate_index in committee_set or self._is_dc_blocked(candidate_index, committee_set):
+                        # A blocked candidate stays blocked as the committee grows.
+                        continue
+                    if gains_step[candidate_index] == step:
+                        chosen_candidate_index = candidate_index
+                        break
+                    gains_step[candidate_index] = step
+                    heapq.heappush(gains_heap, (-self._get_candidate_gain(candidate_index, voters_approval_count),
+                                                candidate_index))
+            if chosen_candidate_index is None:
+                break
+            committee.append(chosen_candidate_index)
+            committee_set.add(chosen_candidate_index)
+            voters_approval_count[self._get_candidate_voters(chosen_candidate_index)] += 1
+
+        # Fill the remaining seats (if any) regardless of the constraints, the local search repairs the violations.
+        if len(committee) < self._committee_size:
+            candidates_gains = self._get_candidates_gains(voters_approval_count)
+            candidates_gains[committee] = -np.inf
+            committee.extend(np.argsort(-candidates_gains, kind='stable')[
+                             :self._committee_size - len(committee)].tolist())
+        return committee
+
+    def _count_violations(self, committee) -> int:
+        # Count the committee members of each constraint (kept up to date by _apply_swap), and the violations.
+        committee = set(committee)
+        self._dc_members_count = np.array([sum([member in committee for member in dc_set])
+                                           for dc_set in self._dc_sets], dtype=np.int64)
+        self._tgd_groups_members_count = np.array([sum([member in committee for member in tgd_group])
+                                                   for tgd_group, _ in self._tgd_groups], dtype=np.int64)
+        self._tgd_elements_members_count = np.array([sum([member in committee for member in element_members])
+                                                     for element_members in self._tgd_elements], dtype=np.int64)
+        self._representatives_sets_members_count = np.array(
+            [sum([member in committee for member in representatives_set])
+             for representatives_set in self._tgd_representatives_sets], dtype=np.int64)
+        # The number of representatives sets fully in the committee, of each TGD tuple.
+        self._tgd_full_representatives_count = np.zeros(len(self._tgd_elements), dtype=np.int64)
+        for representatives_index, members_count in enumerate(self._representatives_sets_members_count.tolist()):
+            if members_count == len(self._tgd_representatives_sets[representatives_index]):
+                self._tgd_full_representatives_count[self._representatives_sets_tuples[representatives_index]] += 1
+
+        # The number of members beyond the max of each DC set, the number of missing members of each TGD group, and the
+        # TGD tuples whose element is in the committee without any of its representatives sets.
+        dc_violations = int(np.maximum(0, self._dc_members_count - np.array(self._dc_sets_max_members,
+                                                                            dtype=np.int64)).sum())
+        tgd_violations = int(np.maximum(0, np.array([min_members for _, min_members in self._tgd_groups],
+                                                    dtype=np.int64) - self._tgd_groups_members_count).sum())
+        tgd_violations += sum([self._is_tgd_tuple_violated(tuple_index, 0, 0)
+                               for tuple_index in range(len(self._tgd_elements))])
+        return dc_violations + tgd_violations
+
+    def _is_tgd_tuple_violated(self, tuple_index: int, element_delta: int, full_representatives_delta: int) -> bool:
+        return self._tgd_elements_members_count[tuple_index] + element_delta == len(self._tgd_elements[tuple_index]) \
+            and self._tgd_full_representatives_count[tuple_index] + full_representatives_delta == 0
+
+    def _get_swap_deltas(self, removed_index: int, added_index: int) -> list:
+        # The change of the members count of each constraint touched by the swap (for each kind of constraints).
+        constraints_deltas = [defaultdict(int) for _ in self._candidates_constraints]
+        for candidate_index, delta in [(removed_index, -1), (added_index, 1)]:
+            for constraints_delta, candidates_constraints in zip(constraints_deltas, self._candidates_constraints):
+                for constraint_index in candidates_constraints.get(candidate_index, []):
+                    constraints_delta[constraint_index] += delta
+        return constraints_deltas
+
+    def _get_full_representatives_deltas(self, representatives_deltas: dict) -> dict:
+        # The change of the number of full representatives sets of each TGD tuple.
+        full_representatives_deltas = defaultdict(int)
+        for representatives_index, delta in representatives_deltas.items():
+            size = len(self._tgd_representatives_sets[representatives_index])
+            members_count = self._representatives_sets_members_count[representatives_index]
+            full_representatives_deltas[self._representatives_sets_tuples[representatives_index]] += \
+                int(members_count + delta == size) - int(members_count == size)
+        return full_representatives_deltas
+
+    def _get_violations_delta(self, constraints_deltas: list) -> int:
+        # The change of the number of violations by a swap, counting only the constraints touched by the swap.
+        dc_deltas, tgd_groups_deltas, elements_deltas, representatives_deltas = constraints_deltas
+        violations_delta = 0
+        for dc_index, delta in dc_deltas.items():
+            members_count, max_members = self._dc_members_count[dc_index], self._dc_sets_max_members[dc_index]
+            violations_delta += max(0, members_count + delta - max_members) - max(0, members_count - max_members)
+        for group_index, delta in tgd_groups_deltas.items():
+            members_count, min_members = self._tgd_groups_members_count[group_index], self._tgd_groups[group_index][1]
+            violations_delta += max(0, min_members - members_count - delta) - max(0, min_members - members_count)
+        full_representatives_deltas = self._get_full_representatives_deltas(representatives_deltas)
+        for tuple_index in set(elements_deltas) | set(full_representatives_deltas):
+            violations_delta += \
+                int(self._is_tgd_tuple_violated(tuple_index, elements_deltas.get(tuple_index, 0),
+                                                full_representatives_deltas.get(tuple_index, 0))) - \
+                int(self._is_tgd_tuple_violated(tuple_index, 0, 0))
+        return violations_delta
+
+    def _apply_swap(self, constraints_deltas: list) -> None:
+        dc_deltas, tgd_groups_deltas, elements_deltas, representatives_deltas = constraints_deltas
+        for tuple_index, delta in self._get_full_representatives_deltas(representatives_deltas).items():
+            self._tgd_full_representatives_count[tuple_index] += delta
+        for members_count, deltas in [(self._dc_members_count, dc_deltas),
+                                      (self._tgd_groups_members_count, tgd_groups_deltas),
+                                      (self._tgd_elements_members_count, elements_deltas),
+                                      (self._representatives_sets_members_count, representatives_deltas)]:
+            for constraint_index, delta in deltas.items():
+                members_count[constraint_index] += delta
+
+    def _local_search(self, committee: list, deadline: float) -> list:
+        # Swap a committee member with a non-member, as long as it decreases the number of violated constraints, or it
+        # keeps the committee feasible and increases its score.
+        committee = list(committee)
+        violations = self._count_violations(committee)
+        voters_approval_count = self._get_voters_approval_count(committee)
+        improved = True
+        while improved and time.time() < deadline:
+            improved = False
+            for member_position, member_index in enumerate(committee):
+                # The gains of all the candidates, given the committee without the member.
+                member_voters = self._get_candidate_voters(member_index)
+                voters_approval_count[member_voters] -= 1
+                member_gain = float(self._voters_gains[member_voters, voters_approval_count[member_voters]].sum())
+                swaps_gains = self._get_candidates_gains(voters_approval_count) - member_gain
+                swaps_gains[committee] = -np.inf
+
+                swap_candidate_index = None
+                for candidate_index in np.argsort(-swaps_gains, kind='stable').tolist():
+                    if time.time() >= deadline or swaps_gains[candidate_index] == -np.inf:
+                        break
+                    if violations == 0 and swaps_gains[candidate_index] <= 1e-9:
+                        break
+                    constraints_deltas = self._get_swap_deltas(member_index, candidate_index)
+                    new_violations = violations + self._get_violations_delta(constraints_deltas)
+                    if new_violations < violations or (violations == 0 and new_violations == 0):
+                        swap_candidate_index = candidate_index
+                        violations = new_violations
+                        self._apply_swap(constraints_deltas)
+                        break
+
+                if swap_candidate_index is None:
+                    voters_approval_count[member_voters] += 1
+                    continue
+                committee[member_position] = swap_candidate_index
+                voters_approval_count[self._get_candidate_voters(swap_candidate_index)] += 1
+                improved = True
+                break
+        return committee
+
+    def _get_bound_gap(self, committee: list) -> float:
+        # For a submodular score f and any committee T of m swaps: f(T) <= f(S) + sum of the gains of T \ S given S -
+        # sum of the losses of S \ T given (S union T) without the member. A voter approves at most m more members in
+        # S union T, hence (by the concavity) the losses are at least the gains of the voters approval count - 1 + m.
+        # The gains are taken from a table up to twice the committee size (the size of S union T).
+        extended_voters_gains = greedy_warm_start.get_voters_gains_table(
+            self._approval_profile, self._approval_profile.voters_weights, 2 * self._committee_size,
+            self._voting_rule_score_function)
+        voters_approval_count = self._get_voters_approval_count(committee)
+        committee_mask = np.zeros(self._number_of_candidates, dtype=bool)
+        committee_mask[committee] = True
+        candidates_gains = np.bincount(self._entries_candidates,
+                                       weights=extended_voters_gains[self._entries_voters,
+                                                                     voters_approval_count[self._entries_voters]],
+                                       minlength=self._number_of_candidates)
+        candidates_gains = np.sort(candidates_gains[~committee_mask])[::-1]
+        members_entries = committee_mask[self._entries_candidates]
+        members_entries_voters = self._entries_voters[members_entries]
+        members_entries_candidates = self._entries_candidates[members_entries]
+
+        best_swaps_gain = 0.0
+        for number_of_swaps in range(1, min(len(candidates_gains), len(committee)) + 1):
+            members_losses = np.bincount(
+                members_entries_candidates,
+                weights=extended_voters_gains[members_entries_voters,
+                                              voters_approval_count[members_entries_voters] - 1 + number_of_swaps],
+                minlength=self._number_of_candidates)[committee_mask]
+            best_swaps_gain = max(best_swaps_gain, float(candidates_gains[:number_of_swaps].sum() -
+                                                         np.sort(members_losses)[:number_of_swaps].sum()))
+
+        committee_score = self.get_committee_score(
+            [self._candidates_ids_list[candidate_index] for candidate_index in committee])
+        upper_bound = committee_score + best_swaps_gain
+        if upper_bound <= 0:
+            return 0.0
+        return (upper_bound - committee_score) / upper_bound
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,327 @@
+import math
+from fractions import Fraction
+
+import config
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.cp_sat_solver as cp_sat_solver
+
+MODULE_NAME = "ABC to CP-SAT Convertor"
+
+
+class ABCToCPSATConvertor(abc_to_mip_convertor.ABCToMIPConvertor):
+    """A class for converting ABC problem of finding a winning committee,
+    given a voting rule score function and contextual constraints to a native CP-SAT problem.
+    The ABC setting data (including the lifted voters) is prepared as in the MIP convertor, while the model uses the
+    CP-SAT native constraints (at most one, bool or, enforcement literals and element table lookups), and integer
+    (exactly scaled) score values.
+    """
+    def __init__(self, solver: cp_sat_solver.CPSATSolver):
+        """Initializing the convertor.
+        :param solver: The input native CP-SAT solver.
+        """
+        super().__init__(solver)
+        self._cp_model = solver.model
+
+        # The factor the score values are multiplied by, in order to get an integer objective.
+        self.score_scaling_factor = 1
+
+    def _get_variable_value(self, variable) -> float:
+        return self._model.Value(variable)
+
+    def print_all_model_variables(self) -> None:
+        """Print all the model candidates variables (only if we are in DEBUG mode).
+        """
+        if config.DEBUG:
+            if self._solved:
+                for candidate_id, candidate_variable in self.model_candidates_variables.items():
+                    print(f"Var name is c_{candidate_id}, "
+                          f"and var value is {self._get_variable_value(candidate_variable)}")
+
+    def _set_solution_hint(self, candidates_values: dict) -> None:
+        self._cp_model.ClearHints()
+        for candidate_id, value in candidates_values.items():
+            self._cp_model.AddHint(self.model_candidates_variables[candidate_id], value)
+
+    def get_objective_value(self) -> float:
+        """Get the (unscaled) committee score (should be called only after solving).
+
+        :return: The committee score.
+        """
+        return self._model.ObjectiveValue() / self.score_scaling_factor
+
+    @staticmethod
+    def _variable_name(name: str) -> str:
+        return name if config.NAME_MODEL_VARIABLES else ""
+
+    def _set_score_scaling_factor(self, score_values) -> None:
+        # Use the lcm of the score values denominators (as a rational number), such that all the scaled score values
+        # are exact integers. If the lcm is too large, the scaled score values are rounded.
+        scaling_factor = 1
+        for score_value in score_values:
+            scaling_factor = math.lcm(scaling_factor,
+                                      Fraction(score_value).limit_denominator(config.CP_SAT_MAX_SCALING_FACTOR)
+                                      .denominator)
+            if scaling_factor > config.CP_SAT_MAX_SCALING_FACTOR:
+                config.debug_print(MODULE_NAME, f"The score values can not be scaled exactly, they are scaled by "
+                                                f"{config.CP_SAT_MAX_SCALING_FACTOR} and rounded.\n")
+                scaling_factor = config.CP_SAT_MAX_SCALING_FACTOR
+                break
+        self.score_scaling_factor = scaling_factor
+
+    def _scale_score_value(self, score_value) -> int:
+        return round(Fraction(score_value).limit_denominator(config.CP_SAT_MAX_SCALING_FACTOR) *
+                     self.score_scaling_factor)
+
+    def _get_voter_approved_variables(self, voter_id) -> list:
+        return [self.model_candidates_variables[candidate_id] for candidate_id in self._approval_profile[voter_id]
+                if candidate_id in self.model_candidates_variables]
+
+    def can_add_voters(self) -> bool:
+        # The score scaling factor depends on all the voters, hence the model is not extended with new voters.
+        return False
+
+    def can_set_committee_size(self, committee_size: int) -> bool:
+        # The voters element tables are defined by the committee size, hence the model is not resized.
+        return False
+
+    def _define_abc_setting_model(self) -> None:
+        # Create the committee variables, and the constraint about the number of candidates in the committee.
+        for candidate_id in self._candidates_ids_set:
+            self.model_candidates_variables[candidate_id] = \
+                self._cp_model.NewBoolVar(self._variable_name("c_" + str(candidate_id)))
+        self._cp_model.Add(sum(self.model_candidates_variables.values()) == self._committee_size)
+
+        if self._linear_score_formulation:
+            self._define_linear_abc_setting()
+        elif self._concave_score_formulation:
+            self._define_concave_abc_setting()
+        else:
+            self._define_element_abc_setting()
+
+    def _define_linear_abc_setting(self) -> None:
+        # Fold the approval profile into an integer score weight per candidate.
+        self._set_score_scaling_factor({self._voting_rule_score_function(1, len(approval_profile))
+                                        for approval_profile in self._approval_profile.values()})
+        candidates_scaled_weights = {candidate_id: 0 for candidate_id in self.model_candidates_variables}
+        for voter_id, approval_profile in self._approval_profile.items():
+            voter_scaled_gain = self._scale_score_value(self._voting_rule_score_function(1, len(approval_profile)))
+            for candidate_id in approval_profile:
+                if candidate_id in candidates_scaled_weights:
+                    candidates_scaled_weights[candidate_id] += voter_scaled_gain * self._lifted_voters_weights[voter_id]
+        self._candidates_score_weights = {candidate_id: scaled_weight / self.score_scaling_factor
+                                          for candidate_id, scaled_weight in candidates_scaled_weights.items()}
+        self._cp_model.Maximize(sum([candidate_variable * candidates_scaled_weights[candidate_id]
+                                     for candidate_id, candidate_variable in self.model_candidates_variables.items()]))
+
+    def _define_concave_abc_setting(self) -> None:
+        for voter_id in self._approval_profile.keys():
+            self._voters_marginal_gains[voter_id] = self._get_voter_marginal_gains(voter_id)
+        self._set_score_scaling_factor({gain for voter_marginal_gains in self._voters_marginal_gains.values()
+                                        for gain in voter_marginal_gains})
+
+        objective_terms = []
+        for voter_id, voter_marginal_gains in self._voters_marginal_gains.items():
+            if len(voter_marginal_gains) == 0:
+                continue
+            voter_slots_variables = [
+                self._cp_model.NewBoolVar(self._variable_name("v_" + str(voter_id) + "_slot_" + str(i)))
+                for i in range(len(voter_marginal_gains))]
+            self._model_voters_score_slots_variables[voter_id] = voter_slots_variables
+            voter_approved_variables = self._get_voter_approved_variables(voter_id)
+            if len(voter_slots_variables) == 1:
+                # A single slot (e.g. CC) is filled only if at least one approved candidate is in the committee.
+                self._cp_model.AddBoolOr(voter_approved_variables).OnlyEnforceIf(voter_slots_variables[0])
+            else:
+                # The number of filled slots is bounded by the number of approved candidates in the committee.
+                self._cp_model.Add(sum(voter_slots_variables) <= sum(voter_approved_variables))
+            objective_terms.extend([slot_variable * (self._scale_score_value(gain) *
+                                                     self._lifted_voters_weights[voter_id])
+                                    for slot_variable, gain in zip(voter_slots_variables, voter_marginal_gains)])
+        self._cp_model.Maximize(sum(objective_terms))
+
+    def _define_element_abc_setting(self) -> None:
+        # The voter can not approve more than the committee size, nor more than his approved candidates.
+        voters_max_approval = {voter_id: min(self._committee_size, len(self._get_voter_approved_variables(voter_id)))
+                               for voter_id in self._approval_profile.keys()}
+        self._set_score_scaling_factor({self._voting_rule_score_function(i, len(self._approval_profile[voter_id]))
+                                        for voter_id, max_approval in voters_max_approval.items()
+                                        for i in range(max_approval + 1)})
+
+        objective_terms = []
+        for voter_id, max_approval in voters_max_approval.items():
+            # The voter approval sum variable.
+            voter_approval_sum_variable = self._cp_model.NewIntVar(
+                0, max_approval, self._variable_name("v_" + str(voter_id) + "_approved_candidates_sum"))
+            self._cp_model.Add(voter_approval_sum_variable == sum(self._get_voter_approved_variables(voter_id)))
+            self._model_voters_approval_candidates_sum_variables[voter_id] = voter_approval_sum_variable
+
+            # The voter (scaled) score is a table lookup of the score function by the voter approval sum.
+            voter_scores_table = [self._scale_score_value(
+                self._voting_rule_score_function(i, len(self._approval_profile[voter_id])))
+                for i in range(max_approval + 1)]
+            voter_score_variable = self._cp_model.NewIntVar(min(voter_scores_table), max(voter_scores_table),
+                                                            self._variable_name("v_" + str(voter_id) + "_score"))
+            self._cp_model.AddElement(voter_approval_sum_variable, voter_scores_table, voter_score_variable)
+            objective_terms.append(voter_score_variable * self._lifted_voters_weights[voter_id])
+        self._cp_model.Maximize(sum(objective_terms))
+
+    def _fix_candidate_variable(self, variable) -> None:
+        self._cp_model.Add(variable == 1)
+
+    def _define_order_constraint(self, variable, next_variable) -> None:
+        self._cp_model.Add(variable >= next_variable)
+
+    def _set_activation_literals_values(self, activation_literals_values: dict) -> None:
+        # The model is solved under the assumptions of the activation literals values.
+        self._cp_model.ClearAssumptions()
+        self._cp_model.AddAssumptions([self._activation_literals[activation_key] if value else
+                                       self._activation_literals[activation_key].Not()
+                                       for activation_key, value in activation_literals_values.items()])
+
+    def _get_activation_literal(self, activation_key):
+        if activation_key is None:
+            return None
+        if activation_key not in self._activation_literals:
+            activation_literal = self._cp_model.NewBoolVar(self._variable_name('activation_' +
+                                                                               str(self._global_counter)))
+            self._global_counter += 1
+            self._activation_literals[activation_key] = activation_literal
+            self._cp_model.AddAssumption(activation_literal if self._is_active_key(activation_key)
+                                         else activation_literal.Not())
+        return self._activation_literals[activation_key]
+
+    @staticmethod
+    def _enforce_if(constraint, activation_literal) -> None:
+        # Enforce the constraint only if the activation literal is true (if there is one).
+        if activation_literal is not None:
+            constraint.OnlyEnforceIf(activation_literal)
+
+    def define_dc(self, dc_candidates_sets, activation_key=None):
+        """Add a given Denial Constraint to the CP-SAT model.
+
+        :param dc_candidates_sets: A DC candidates groups, i.e. iterator with sets of denial candidates as value.
+        For example - the list [{1,2}, {3,1}] denotes that candidates 1 and 2 cannot be together in the committee (and
+        the same applies for candidates 3 and 1).
+        :param activation_key: If given, the DC is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        dc_candidates_sets = self._get_unique_dc_candidates_sets(dc_candidates_sets)
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_dc_candidates_sets', dc_candidates_sets, activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+
+        # The dc length should be according to the original dc sets (and not the cliques).
+        dc_group_length = 0
+        if len(dc_candidates_sets) > 0:
+            dc_group_length = len(dc_candidates_sets[0])
+
+        # Optimizations - Contracting DC constraints via hypercliques.
+        new_dc_candidates_sets = self._contract_dc_candidates_sets(dc_candidates_sets)
+
+        for candidates_set in new_dc_candidates_sets:
+            candidates_variables = [self.model_candidates_variables[candidate_index] for candidate_index in
+                                    candidates_set if candidate_index in self.model_candidates_variables]
+            if dc_group_length == 2 and activation_literal is None:
+                # At most one of the clique candidates is in the committee.
+                self._cp_model.AddAtMostOne(candidates_variables)
+            elif len(candidates_variables) == dc_group_length:
+                # At least one of the candidates is not in the committee.
+                self._enforce_if(self._cp_model.AddBoolOr([candidate_variable.Not()
+                                                           for candidate_variable in candidates_variables]),
+                                 activation_literal)
+            else:
+                # (An at most one constraint can not be enforced by a literal, hence it is a linear one when guarded).
+                self._enforce_if(self._cp_model.Add(sum(candidates_variables) <= (dc_group_length - 1)),
+                                 activation_literal)
+
+    def define_tgd(self, tgd_tuples_list: list, activation_key=None):
+        """Convert a TGD input to CP-SAT constraints.
+
+        :param tgd_tuples_list: A list of tuples - such that each tuple contain in the first place the
+        condition for the TGD (i.e. set of candidate the if they are in the committee then the TGD should be enforced,
+        the so called 'left hand side' of the TGD), and in the second place there is set of sets (of candidates), such
+        that at least one set of candidate should be chosen (the 'right hand side' of the TGD).
+        Note: The first place in the tuple could be empty (i.e. the TGD should always be enforced).
+        :param activation_key: If given, the TGD is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_tgd_tuples_list', tgd_tuples_list, activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+        activation_literals = [] if activation_literal is None else [activation_literal]
+
+        for element_members, tgd_representatives_sets in tgd_tuples_list:
+            # If a member is not a candidate, it is never chosen (hence the TGD is never enforced).
+            if any([x not in self.model_candidates_variables for x in element_members]):
+                continue
+            element_members_variables = [self.model_candidates_variables[x] for x in element_members]
+
+            # A literal per possible representatives set (a set with a non-candidate member can not be chosen).
+            representatives_literals = []
+            for representatives_set in tgd_representatives_sets:
+                if any([x not in self.model_candidates_variables for x in representatives_set]):
+                    continue
+                representatives_variables = [self.model_candidates_variables[x] for x in representatives_set]
+                if len(representatives_variables) == 1:
+                    representatives_literals.append(representatives_variables[0])
+                    continue
+                current_b = self._cp_model.NewBoolVar(self._variable_name('tgd_b_' + str(self._global_counter)))
+                self._global_counter += 1
+                self._cp_model.AddBoolAnd(representatives_variables).OnlyEnforceIf(current_b)
+                representatives_literals.append(current_b)
+
+            # If all the element members are chosen, chose at least one representatives set.
+            self._cp_model.AddBoolOr(representatives_literals).OnlyEnforceIf(element_members_variables +
+                                                                             activation_literals)
+
+    def define_dc_cardinality(self, candidates_groups: list, max_members: int, activation_key=None):
+        """Add a compiled DC to the CP-SAT model.
+
+        :param candidates_groups: A list of candidates groups (the candidates with the same attribute value).
+        :param max_members: The max number of members of each group in the committee.
+        :param activation_key: If given, the DC is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_dc_cardinality_groups', [(candidates_group, max_members)
+                                                              for candidates_group in candidates_groups],
+                                   activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+        for candidates_group in candidates_groups:
+            candidates_variables = self._get_group_variables(candidates_group)
+            if max_members == 1 and activation_literal is None:
+                self._cp_model.AddAtMostOne(candidates_variables)
+            else:
+                self._enforce_if(self._cp_model.AddLinearConstraint(sum(candidates_variables), 0, max_members),
+                                 activation_literal)
+
+    def define_tgd_cardinality(self, candidates_groups: list, min_members: int, activation_key=None):
+        """Add a compiled TGD to the CP-SAT model.
+
+        :param candidates_groups: A list of candidates groups (the candidates with the same attribute value, could be
+        empty).
+        :param min_members: The min number of members of each group in the committee.
+        :param activation_key: If given, the TGD is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_tgd_cardinality_groups', [(candidates_group, min_members)
+                                                               for candidates_group in candidates_groups],
+                                   activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+        for candidates_group in candidates_groups:
+            candidates_variables = self._get_group_variables(candidates_group)
+            if min_members == 1:
+                self._enforce_if(self._cp_model.AddBoolOr(candidates_variables), activation_literal)
+            else:
+                self._enforce_if(self._cp_model.AddLinearConstraint(sum(candidates_variables), min_members,
+                                                                    len(candidates_variables)),
+                                 activation_literal)
+
+    def _get_group_variables(self, candidates_group) -> list:
+        return [self.model_candidates_variables[candidate_id] for candidate_id in candidates_group
+                if candidate_id in self.model_candidates_variables]
+
+
+if __name__ == '__main__':
+    pass
@@ -1,11 +1,21 @@
-from collections import Counter
+from itertools import chain
+import time
+import numpy as np
 import ortools.linear_solver.pywraplp as pywraplp
-import networkx as nx
 
 import config
+import mip.mip_reduction.approval_profile as approval_profile_module
+import mip.mip_reduction.candidates_symmetry as candidates_symmetry
+import mip.mip_reduction.dc_contraction as dc_contraction
+import mip.mip_reduction.greedy_warm_start as greedy_warm_start
 import mip.mip_reduction.mip_convertor as mip_convertor
+import mip.mip_reduction.mip_model_builder as mip_model_builder
+import mip.mip_reduction.score_functions as score_functions
 
 MODULE_NAME = "ABC to MIP Convertor"
+# The names of the contextual constraints lists which are kept for finding a greedy warm start.
+WARM_START_CONSTRAINTS_LISTS = ('_dc_candidates_sets', '_tgd_tuples_list', '_dc_cardinality_groups',
+                                '_tgd_cardinality_groups')
 
 
 class ABCToMIPConvertor(mip_convertor.MIPConvertor):
@@ -32,23 +42,69 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
         self.candidates_group_size = 0
         self.voters_group_size = 0
         self._candidates_ids_set = set()
-        self._approval_profile = {}
+        self._approval_profile = approval_profile_module.ApprovalProfile.create({})
         self._committee_size = 0
+        # The largest committee size the model is defined for (None if it is the committee size itself), the model can
+        # be resized to any committee size up to it (see set_committee_size).
+        self.max_committee_size = None
+        self._model_committee_size = 0
         self.lifted_voters_group_size = 0
         self._lifted_voters_weights = None
 
         # The voting rule.
         self._voting_rule_score_function = None
         self._max_score_function_value = 0
+        self._concave_score_formulation = False
+        self._linear_score_formulation = False
 
         # The model variables.
         self.model_candidates_variables = dict()
         self._model_voters_score_contribution_variables = dict()
         self._model_voters_approval_candidates_sum_variables = dict()
+        # Used only in the concave score formulation, a dict with the voter id as key and the list of his score slots
+        # variables (ordered by a decreasing marginal gain) as value.
+        self._model_voters_score_slots_variables = dict()
+        self._voters_marginal_gains = dict()
+        # Used only in the linear score formulation, a dict with the candidate id as key and his (weighted) score as
+        # value.
+        self._candidates_score_weights = dict()
+
+        # The index of the model constraint about the number of candidates in the committee.
+        self._committee_size_constraint_index = None
 
         # A counter for creating a different model variable names.
         self._global_counter = 0
 
+        # The contextual constraints (kept for finding a greedy warm start).
+        self._dc_candidates_sets = []
+        self._tgd_tuples_list = []
+        # The compiled contextual constraints, lists of tuples of a candidates group and the max (for a DC) or the min
+        # (for a TGD) number of its members in the committee.
+        self._dc_cardinality_groups = []
+        self._tgd_cardinality_groups = []
+        # The constraints activation literals, a dict with the activation key of a group of contextual constraints as
+        # key and the literal (enforcing the group constraints when it is true) as value.
+        self._activation_literals = dict()
+        # The activation keys of the active constraints groups (None if all the constraints groups are active).
+        self._active_keys = None
+        # The kept contextual constraints of each activation key (None for the constraints which are always enforced),
+        # a dict with the activation key as key and a dict of the constraints lists (by the list name) as value.
+        self._keyed_constraints = dict()
+        # The greedy warm start committee (None if not found) and its score.
+        self.warm_start_committee = None
+        self.warm_start_score = None
+        self.warm_start_time = 0
+        # A committee of a previous step of a sweep (chosen first by the greedy warm start), None if there is none.
+        self.previous_committee = None
+        # The classes of interchangeable candidates (sorted lists of candidates ids), restricted to their first members
+        # by the symmetry breaking constraints (see define_candidates_symmetry_breaking).
+        self.candidates_classes = []
+        # The number of the DC constraints rows before and after the hypercliques contraction, and the contraction time
+        # (sec), accumulated over the defined DCs.
+        self.dc_rows_before_contraction = 0
+        self.dc_rows_after_contraction = 0
+        self.dc_contraction_time = 0
+
     def get_model_state(self) -> str:
         """Creates a representation for the model current state.
 
@@ -57,7 +113,7 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
         solution = f""
         count = 0
         for key, value in self.model_candidates_variables.items():
-            solution += f"Candidate id: {key}, Candidate value: {value.solution_value()}.\n"
+            solution += f"Candidate id: {key}, Candidate value: {self._get_variable_value(value)}.\n"
             count += 1
             if count > 50:
                 break
@@ -68,40 +124,118 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
             if count > 50:
                 break
         count = 0
-        for key, value in self._model_voters_approval_candidates_sum_variables.items():
-            solution += f"Voter id: {key}, Voter approval sum: {value.solution_value()}.\n"
+        for voter_id in self._approval_profile.keys():
+            solution += f"Voter id: {voter_id}, Voter approval sum: {self._get_voter_approval_sum_value(voter_id)}.\n"
             count += 1
             if count > 50:
                 break
         count = 0
-        for key, value in self._model_voters_score_contribution_variables.items():
-            solution += f"Voter id: {key}, Voter contribution: {value.solution_value()}.\n"
+        for voter_id in self._approval_profile.keys():
+            solution += f"Voter id: {voter_id}, Voter contribution: {self._get_voter_contribution_value(voter_id)}.\n"
             count += 1
             if count > 50:
                 break
         return solution
 
+    def solve(self) -> None:
+        """Solve the MIP problem (starting from a greedy warm start, if enabled).
+        """
+        if config.GREEDY_WARM_START:
+            self._set_greedy_warm_start()
+        super().solve()
+
+    def _set_greedy_warm_start(self) -> None:
+        # Hint the solver with a feasible greedy committee (and with the committee of the previous sweep step).
+        start_time = time.time()
+        initial_committees = [[]]
+        if self.previous_committee is not None:
+            initial_committees.append(self.previous_committee)
+        self.warm_start_committee, self.warm_start_score = None, None
+        for initial_committee in initial_committees:
+            committee = greedy_warm_start.find_greedy_committee(
+                self._candidates_ids_set, self._approval_profile, self._approval_profile.voters_weights,
+                self._committee_size, self._voting_rule_score_function, self._dc_candidates_sets,
+                self._tgd_tuples_list, self._dc_cardinality_groups, self._tgd_cardinality_groups, initial_committee)
+            if committee is None:
+                continue
+            committee_score = self.get_committee_score(committee)
+            if self.warm_start_committee is None or committee_score > self.warm_start_score:
+                self.warm_start_committee, self.warm_start_score = committee, committee_score
+        if self.warm_start_committee is not None:
+            # The hint should satisfy the symmetry breaking constraints (an equivalent committee of the same score).
+            self.warm_start_committee = candidates_symmetry.get_canonical_committee(self.warm_start_committee,
+                                                                                    self.candidates_classes)
+            warm_start_committee_set = set(self.warm_start_committee)
+            self._set_solution_hint({candidate_id: int(candidate_id in warm_start_committee_set)
+                                     for candidate_id in self.model_candidates_variables})
+        self.warm_start_time = time.time() - start_time
+        config.debug_print(MODULE_NAME, f"The greedy warm start committee is {self.warm_start_committee}, "
+                                        f"with score {self.warm_start_score}.\n")
+
+    def _set_solution_hint(self, candidates_values: dict) -> None:
+        self._model.SetHint([self.model_candidates_variables[candidate_id] for candidate_id in candidates_values],
+                            list(candidates_values.values()))
+
+    def get_committee_score(self, committee) -> float:
+        """Calculate the score of a given committee, according to the ABC setting.
+
+        :param committee: An iterable of the committee candidates ids.
+        :return: The committee score.
+        """
+        return greedy_warm_start.get_committee_score(committee, self._approval_profile,
+                                                     self._approval_profile.voters_weights,
+                                                     self._voting_rule_score_function)
+
+    def get_committee(self) -> list:
+        """Get the resulted committee (should be called only after solving).
+
+        :return: A list of the chosen candidates ids.
+        """
+        return [candidate_id for candidate_id, candidate_variable in self.model_candidates_variables.items()
+                if self._get_variable_value(candidate_variable) > 0.5]
+
+    def _get_variable_value(self, variable) -> float:
+        return variable.solution_value()
+
+    def _get_voter_approval_sum_value(self, voter_id) -> float:
+        if voter_id in self._model_voters_approval_candidates_sum_variables:
+            return self._get_variable_value(self._model_voters_approval_candidates_sum_variables[voter_id])
+        # There is no approval sum variable (in the concave score formulation), calculate it from the committee.
+        return float(sum([self._get_variable_value(self.model_candidates_variables[candidate_id])
+                          for candidate_id in self._approval_profile[voter_id]
+                          if candidate_id in self.model_candidates_variables]))
+
+    def _get_voter_contribution_value(self, voter_id) -> float:
+        if voter_id in self._model_voters_score_contribution_variables:
+            return self._get_variable_value(self._model_voters_score_contribution_variables[voter_id])
+        # There is no score contribution variable (in the concave score formulation), calculate it from the committee.
+        return float(self._voting_rule_score_function(round(self._get_voter_approval_sum_value(voter_id)),
+                                                      len(self._approval_profile[voter_id])))
+
     def define_abc_setting(self,
                            candidates_ids_set: set,
-                           approval_profile: dict,
+                           approval_profile,
                            committee_size: int, score_function) -> None:
         """Set and convert to MIP the ABC problem setting, including the voting rule score function.
         :param candidates_ids_set:       A set of candidates id's.
-        :param approval_profile:         A dict, where the key is the voter id,
+        :param approval_profile:         An approval profile, or a dict where the key is the voter id,
                                          and the value is the group of candidates id's this voter approves.
         :param committee_size:           The committee size.
         :param score_function:           An ABC score function.
         """
         # Set the ABC data.
         self._candidates_ids_set = candidates_ids_set
-        self._approval_profile = approval_profile
+        self._approval_profile = approval_profile_module.ApprovalProfile.create(approval_profile)
         self._committee_size = committee_size
+        # The model variables bounds and the voters score equations are defined for the largest committee size (and
+        # hold for any smaller committee size).
+        self._model_committee_size = max(committee_size, self.max_committee_size or 0)
 
         # Set the candidate group size to be the original size of the ABC input.
         self.candidates_group_size = len(self._candidates_ids_set)
 
         # Set the voters group size to be only voters with a none-empty approval profile.
-        self.voters_group_size = len(set(self._approval_profile.keys()))
+        self.voters_group_size = len(self._approval_profile)
         # By default, the lifted group size (before operating lifted optimization) is equal to the original voters
         # group size.
         self.lifted_voters_group_size = self.voters_group_size
@@ -117,85 +251,166 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
 
         # Find the max value of the score function.
         # Assuming (reasonably) that a smaller approval profile, means larger score given the max approval.
-        self._max_score_function_value = self._voting_rule_score_function(self._committee_size, 1)
+        self._max_score_function_value = self._voting_rule_score_function(self._model_committee_size, 1)
 
         # Union all voters with the same approval profile in order to 'lifted inference' those voters
         # and represent them as one weighted voter.
         # This implementation is described in the section:
         # Optimizations - Grouping similar voters.
         if config.LIFTED_INFERENCE:
-            # Make the approval profiles hash-ables.
-            for i, j in self._approval_profile.items():
-                self._approval_profile[i] = frozenset(j)
-
-            # Use Counter to count occurrences of each approval profile.
-            # The resulted object is collections.Counter, where similar to dict we have the approval profile as key and
-            # the count of the approval profile as value.
-            approval_profiles_count = Counter(self._approval_profile.values())
-
-            # Create the 'lifted' approval profile. The voter ids' are completely new.
-            self._approval_profile = dict()
-            for voter_id, approval_profile in enumerate(approval_profiles_count):
-                # Note that when iterating like that over collections.Counter we get the approval profile, not count.
-                self._approval_profile[voter_id] = approval_profile
+            # The voters are grouped by a fingerprint of their approval profile row, and the 'lifted' voters ids' are
+            # completely new. For each lifted voter, the weight is the count of his unique approval profile.
+            self._approval_profile = self._approval_profile.lift()
 
             # Update the lifted voters group size accordingly.
             self.lifted_voters_group_size = len(self._approval_profile)
             config.debug_print(MODULE_NAME, f"The number of lifted voters is {self.lifted_voters_group_size}\n")
 
-            # Define lifted voters weights.
-            # For each lifted voter, the weight is the count of his unique approval profile.
-            self._lifted_voters_weights = {voter_id: approval_profiles_count[self._approval_profile[voter_id]]
-                                           for voter_id in self._approval_profile}
+        # The voters weights (defaults weights, or the lifted voters weights).
+        self._lifted_voters_weights = self._approval_profile.get_voters_weights_dict()
+
+        # Choose the score formulation: voter-free for linear score functions, concave slots for concave ones.
+        self._linear_score_formulation = config.LINEAR_SCORE_FORMULATION and \
+            score_functions.is_linear_score_function(self._voting_rule_score_function)
+        self._concave_score_formulation = config.CONCAVE_SCORE_FORMULATION and \
+            score_functions.is_concave_score_function(self._voting_rule_score_function)
+        self._define_abc_setting_model()
+
+    def can_add_voters(self) -> bool:
+        """Whether new voters can be added to the defined ABC setting model (see add_voters)."""
+        # The candidates classes are interchangeable only with respect to the current voters.
+        return len(self.candidates_classes) == 0
+
+    def add_voters(self, approval_profile) -> None:
+        """Add new voters to the ABC setting (after it is defined), by adding only the new voters variables, constraints
+        and objective terms to the existing model (the candidates, the committee size and the contextual constraints are
+        kept as is).
+        :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the
+                                 group of candidates id's this voter approves (of the new voters only).
+        """
+        new_approval_profile = approval_profile_module.ApprovalProfile.create(approval_profile)
+        self.voters_group_size += len(new_approval_profile)
+        if config.LIFTED_INFERENCE:
+            # The new voters are lifted among themselves (a new lifted voter is not united with a previous lifted voter
+            # of the same approval profile), and their ids continue the previous lifted voters ids.
+            new_approval_profile = new_approval_profile.lift()
+            new_approval_profile.voters_ids = new_approval_profile.voters_ids + len(self._approval_profile)
+        self._approval_profile = self._approval_profile.concatenate(new_approval_profile)
+        self.lifted_voters_group_size = len(self._approval_profile)
+        self._lifted_voters_weights.update(new_approval_profile.get_voters_weights_dict())
+        config.debug_print(MODULE_NAME, f"Added {len(new_approval_profile)} voters, the number of (lifted) voters is "
+                                        f"{self.lifted_voters_group_size}.\n")
+        self._define_new_voters_model(new_approval_profile.keys())
+
+    def _define_new_voters_model(self, voters_ids: list) -> None:
+        # Add the new voters to the model, and their (weighted) contribution to the objective.
+        objective = self._model.Objective()
+        if self._linear_score_formulation:
+            self._add_linear_candidates_score_weights(voters_ids)
+            for candidate_id, weight in self._candidates_score_weights.items():
+                objective.SetCoefficient(self.model_candidates_variables[candidate_id], weight)
+        elif self._concave_score_formulation:
+            self._define_concave_voters_variables(voters_ids)
+            self._define_concave_voters_constraints(voters_ids)
+            for voter_id in voters_ids:
+                for slot_variable, gain in zip(self._model_voters_score_slots_variables[voter_id],
+                                               self._voters_marginal_gains[voter_id]):
+                    objective.SetCoefficient(slot_variable, gain * self._lifted_voters_weights[voter_id])
         else:
-            # Define defaults weights.
-            self._lifted_voters_weights = {voter_id: 1 for voter_id in self._approval_profile.keys()}
+            self._define_voters_variables(voters_ids)
+            self._define_voters_constraints(voters_ids)
+            for voter_id in voters_ids:
+                objective.SetCoefficient(self._model_voters_score_contribution_variables[voter_id],
+                                         self._lifted_voters_weights[voter_id])
+
+    def can_set_committee_size(self, committee_size: int) -> bool:
+        """Whether the defined ABC setting model can be resized to the given committee size (see set_committee_size)."""
+        return committee_size <= self._model_committee_size
+
+    def set_committee_size(self, committee_size: int) -> None:
+        """Set the committee size of the ABC setting (after it is defined), by updating the committee size constraint in
+        place (the rest of the model is kept as is).
+        :param committee_size: The new committee size (at most the max committee size the model is defined for).
+        """
+        self._committee_size = committee_size
+        config.debug_print(MODULE_NAME, f"Committee size = {self._committee_size}.\n")
+        self._set_model_committee_size()
+
+    def _set_model_committee_size(self) -> None:
+        # Only the committee size constraint is updated, the voters variables bounds (and the big-M coefficients) of the
+        # largest committee size are valid for any smaller committee size. Note that tightening the variables bounds in
+        # place is not used, since the solver may change the type of an integer variable with bounds [0, 1] to binary.
+        self._model.constraint(self._committee_size_constraint_index).SetBounds(self._committee_size,
+                                                                                self._committee_size)
+
+    def _define_abc_setting_model(self) -> None:
+        # Construct the model of the ABC setting (the candidates, the voters and the objective), according to the
+        # formulation.
+        if config.BULK_MODEL_CONSTRUCTION:
+            self._define_abc_setting_in_bulk()
+        elif self._linear_score_formulation:
+            self._define_linear_abc_setting_variables()
+            self._define_linear_abc_setting_constraints()
+            self._define_linear_abc_setting_objective()
+        elif self._concave_score_formulation:
+            self._define_concave_abc_setting_variables()
+            self._define_concave_abc_setting_constraints()
+            self._define_concave_abc_setting_objective()
+        else:
+            self._define_abc_setting_variables()
+            self._define_abc_setting_constraints()
+            self._define_abc_setting_objective()
 
-        self._define_abc_setting_variables()
-        self._define_abc_setting_constraints()
-        self._define_abc_setting_objective()
+    def _define_committee_size_constraint(self) -> None:
+        # Add the constraint about the number of candidates in the committee.
+        self._committee_size_constraint_index = self._model.NumConstraints()
+        self._model.Add(sum(self.model_candidates_variables.values()) == self._committee_size)
 
     def _define_abc_setting_variables(self) -> None:
         # Create the committee MIP variables.
         for candidate_id in self._candidates_ids_set:
             self.model_candidates_variables[candidate_id] = self._model.BoolVar("c_" + str(candidate_id))
 
+        self._define_voters_variables(self._approval_profile.keys())
+
+    def _define_voters_variables(self, voters_ids: list) -> None:
         # Create the voters approval candidates sum variables.
-        for voter_id in self._approval_profile.keys():
+        for voter_id in voters_ids:
             self._model_voters_approval_candidates_sum_variables[voter_id] = \
-                self._model.IntVar(0, self._committee_size, "v_" + str(voter_id) + "_approved_candidates_sum")
+                self._model.IntVar(0, self._model_committee_size, "v_" + str(voter_id) + "_approved_candidates_sum")
 
         # Create the voters score contribution MIP variables.
-        for voter_id in self._approval_profile.keys():
+        for voter_id in voters_ids:
             self._model_voters_score_contribution_variables[voter_id] = \
                 self._model.NumVar(0, self._max_score_function_value, "v_" + str(voter_id) + "_score")
 
     def _define_abc_setting_constraints(self) -> None:
-        # Add the constraint about the number of candidates in the committee.
-        self._model.Add(sum(self.model_candidates_variables.values()) == self._committee_size)
+        self._define_committee_size_constraint()
+        self._define_voters_constraints(self._approval_profile.keys())
 
+    def _define_voters_constraints(self, voters_ids: list) -> None:
         # Add constraints for voters approval candidates sum vars to be equal to the sum of their approved candidates.
-        for voter_id in self._approval_profile.keys():
+        for voter_id in voters_ids:
             self._model.Add(self._model_voters_approval_candidates_sum_variables[voter_id] ==
                             sum([self.model_candidates_variables[candidate_id] for candidate_id in
                                  self._approval_profile[voter_id] if candidate_id in self.model_candidates_variables]))
 
         # Add the constraint about the voter score contribution.
-        for voter_id in self._approval_profile.keys():
-            max_candidate_approval = self._committee_size
+        for voter_id in voters_ids:
+            max_candidate_approval = self._model_committee_size
             # This implementation is described in the section:
             # Optimizations - Pruning infeasible scores.
             if config.MINIMIZE_VOTER_CONTRIBUTION_EQUATIONS:
-                max_candidate_approval = min(self._committee_size, len(self._approval_profile[voter_id]))
+                max_candidate_approval = min(self._model_committee_size, len(self._approval_profile[voter_id]))
             for i in range(0, max_candidate_approval + 1):
                 # Define the abs value replacement y_plus + y_minus = abs(i-voter_approval_sum).
                 b = self._model.BoolVar('v_b_' + str(voter_id) + "_" + str(i))
-                y_plus = self._model.IntVar(0, self._committee_size + 1,
+                y_plus = self._model.IntVar(0, self._model_committee_size + 1,
                                             'v_y_plus_' + str(voter_id) + "_" + str(i))
-                y_minus = self._model.IntVar(0, self._committee_size + 1,
+                y_minus = self._model.IntVar(0, self._model_committee_size + 1,
                                              'v_y_minus_' + str(voter_id) + "_" + str(i))
-                self._model.Add(y_minus <= ((1 - b) * (self._committee_size + 1)))
-                self._model.Add(y_plus <= (b * (self._committee_size + 1)))
+                self._model.Add(y_minus <= ((1 - b) * (self._model_committee_size + 1)))
+                self._model.Add(y_plus <= (b * (self._model_committee_size + 1)))
                 self._model.Add((y_plus - y_minus) ==
                                 (i - self._model_voters_approval_candidates_sum_variables[voter_id]))
                 # Add the constraint
@@ -210,34 +425,391 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
                                   for voter_id, score in
                                   self._model_voters_score_contribution_variables.items()]))
 
-    def define_dc(self, dc_candidates_sets):
+    def _get_voter_marginal_gains(self, voter_id) -> list:
+        # The voter can not approve more than the committee size, nor more than his approved candidates.
+        max_candidate_approval = min(self._model_committee_size,
+                                     len([candidate_id for candidate_id in self._approval_profile[voter_id]
+                                          if candidate_id in self.model_candidates_variables]))
+        voter_marginal_gains = score_functions.marginal_gains(self._voting_rule_score_function,
+                                                              max_candidate_approval,
+                                                              len(self._approval_profile[voter_id]))
+        # Slots with no gain can not contribute to the score (and due to concavity, all the following slots as well).
+        return [gain for gain in voter_marginal_gains if gain > 0]
+
+    def _define_concave_abc_setting_variables(self) -> None:
+        # Create the committee MIP variables.
+        for candidate_id in self._candidates_ids_set:
+            self.model_candidates_variables[candidate_id] = self._model.BoolVar("c_" + str(candidate_id))
+
+        self._define_concave_voters_variables(self._approval_profile.keys())
+
+    def _define_concave_voters_variables(self, voters_ids: list) -> None:
+        # Create the voters score slots variables, a slot per each non-zero marginal gain (for CC this is a single
+        # coverage variable).
+        for voter_id in voters_ids:
+            self._voters_marginal_gains[voter_id] = self._get_voter_marginal_gains(voter_id)
+            self._model_voters_score_slots_variables[voter_id] = \
+                [self._model.NumVar(0, 1, "v_" + str(voter_id) + "_slot_" + str(i))
+                 for i in range(len(self._voters_marginal_gains[voter_id]))]
+
+    def _define_concave_abc_setting_constraints(self) -> None:
+        self._define_committee_size_constraint()
+        self._define_concave_voters_constraints(self._approval_profile.keys())
+
+    def _define_concave_voters_constraints(self, voters_ids: list) -> None:
+        # The number of filled slots is bounded by the number of approved candidates in the committee.
+        # Since the marginal gains are decreasing, an optimal solution fills the slots by their order, hence the voter
+        # contribution equals to score_function(voter_approval_sum).
+        for voter_id in voters_ids:
+            voter_slots_variables = self._model_voters_score_slots_variables[voter_id]
+            if len(voter_slots_variables) == 0:
+                continue
+            self._model.Add(sum(voter_slots_variables) <=
+                            sum([self.model_candidates_variables[candidate_id] for candidate_id in
+                                 self._approval_profile[voter_id] if candidate_id in self.model_candidates_variables]))
+
+    def _define_concave_abc_setting_objective(self) -> None:
+        # The objective is to maximize the sum of all (weighted) voters filled slots gains.
+        self._model.Maximize(sum([slot_variable * gain * self._lifted_voters_weights[voter_id]
+                                  for voter_id, voter_slots_variables in
+                                  self._model_voters_score_slots_variables.items()
+                                  for slot_variable, gain in
+                                  zip(voter_slots_variables, self._voters_marginal_gains[voter_id])]))
+
+    def _define_linear_abc_setting_variables(self) -> None:
+        # Create the committee MIP variables (this is the only variables of the ABC setting in this formulation).
+        for candidate_id in self._candidates_ids_set:
+            self.model_candidates_variables[candidate_id] = self._model.BoolVar("c_" + str(candidate_id))
+
+        # Fold the approval profile into a score weight per candidate, such that the committee score is the sum of its
+        # members weights (e.g. for AV it is the candidate approvals count).
+        self._candidates_score_weights = {candidate_id: 0 for candidate_id in self._candidates_ids_set}
+        self._add_linear_candidates_score_weights(self._approval_profile.keys())
+
+    def _add_linear_candidates_score_weights(self, voters_ids: list) -> None:
+        for voter_id in voters_ids:
+            voter_approval_profile = self._approval_profile[voter_id]
+            voter_gain = self._voting_rule_score_function(1, len(voter_approval_profile)) * \
+                         self._lifted_voters_weights[voter_id]
+            for candidate_id in voter_approval_profile:
+                if candidate_id in self._candidates_score_weights:
+                    self._candidates_score_weights[candidate_id] += voter_gain
+
+    def _define_linear_abc_setting_constraints(self) -> None:
+        self._define_committee_size_constraint()
+
+    def _define_linear_abc_setting_objective(self) -> None:
+        # The objective is to maximize the sum of the committee members score weights.
+        self._model.Maximize(sum([self.model_candidates_variables[candidate_id] * weight
+                                  for candidate_id, weight in self._candidates_score_weights.items()]))
+
+    def _define_abc_setting_in_bulk(self) -> None:
+        # Map the candidates ids to dense indices, and take the approval profile entries of the candidates (in a
+        # compressed rows format over the (lifted) voters indices, where the voter approved candidates indices are
+        # approved_candidates[voters_pointers[voter_index]:voters_pointers[voter_index + 1]]).
+        candidates_ids_list = list(self._candidates_ids_set)
+        candidates_indices = {candidate_id: i for i, candidate_id in enumerate(candidates_ids_list)}
+        voters_ids_list = self._approval_profile.keys()
+        # The voter index of each approved candidate entry (the entries are ordered by the voter index).
+        approved_candidates_voters, approved_candidates = self._approval_profile.get_approval_entries(
+            candidates_indices)
+        voters_approved_count = np.bincount(approved_candidates_voters, minlength=len(voters_ids_list))
+        voters_pointers = np.concatenate(([0], np.cumsum(voters_approved_count)))
+        voters_profile_size = self._approval_profile.get_voters_profile_size()
+        voters_weights = self._approval_profile.get_voters_weights_array()
+
+        model_builder = mip_model_builder.MIPModelBuilder(config.NAME_MODEL_VARIABLES)
+
+        if self._linear_score_formulation:
+            # Fold the approval profile into a score weight per candidate.
+            voters_gain = np.array([self._voting_rule_score_function(1, profile_size)
+                                    for profile_size in voters_profile_size.tolist()], dtype=np.float64)
+            candidates_weights = np.bincount(approved_candidates,
+                                             weights=(voters_gain * voters_weights)[approved_candidates_voters],
+                                             minlength=len(candidates_ids_list))
+            self._candidates_score_weights = dict(zip(candidates_ids_list, candidates_weights.tolist()))
+            candidates_variables = model_builder.add_variables(
+                np.zeros(len(candidates_ids_list)), 1, True, candidates_weights,
+                names=lambda i: "c_" + str(candidates_ids_list[i]))
+        else:
+            candidates_variables = model_builder.add_variables(
+                np.zeros(len(candidates_ids_list)), 1, True,
+                names=lambda i: "c_" + str(candidates_ids_list[i]))
+
+        # Add the constraint about the number of candidates in the committee (the first constraint of the builder, which
+        # is loaded after the solver existing constraints).
+        self._committee_size_constraint_index = self._model.NumConstraints()
+        model_builder.add_constraints(np.zeros(len(candidates_variables)), candidates_variables, 1,
+                                      [self._committee_size], self._committee_size)
+
+        voters_variables = None
+        if self._concave_score_formulation and not self._linear_score_formulation:
+            voters_variables = self._define_concave_abc_setting_in_bulk(
+                model_builder, voters_ids_list, voters_approved_count, voters_profile_size, voters_weights,
+                voters_pointers, approved_candidates, candidates_variables)
+        elif not self._linear_score_formulation:
+            voters_variables = self._define_general_abc_setting_in_bulk(
+                model_builder, voters_ids_list, voters_approved_count, voters_profile_size, voters_weights,
+                approved_candidates, approved_candidates_voters, candidates_variables)
+
+        # Load the model to the solver, and keep the solver variables (only the variables which are used later on are
+        # fetched from the solver).
+        variables_offset = model_builder.load(self._model)
+        for candidate_id, candidate_variable in zip(candidates_ids_list, candidates_variables.tolist()):
+            self.model_candidates_variables[candidate_id] = self._model.variable(variables_offset + candidate_variable)
+        self._get_bulk_voters_variables(variables_offset, voters_ids_list, voters_variables)
+
+    def _define_concave_abc_setting_in_bulk(self, model_builder: mip_model_builder.MIPModelBuilder,
+                                            voters_ids_list: list, voters_approved_count: np.ndarray,
+                                            voters_profile_size: np.ndarray, voters_weights: np.ndarray,
+                                            voters_pointers: np.ndarray, approved_candidates: np.ndarray,
+                                            candidates_variables: np.ndarray) -> tuple:
+        # The marginal gains depend only on the max approval number and the approval profile size (hence cached).
+        marginal_gains_cache = dict()
+        for voter_id, approved_count, profile_size in zip(voters_ids_list, voters_approved_count.tolist(),
+                                                          voters_profile_size.tolist()):
+            key = (min(self._model_committee_size, approved_count), profile_size)
+            if key not in marginal_gains_cache:
+                marginal_gains_cache[key] = [gain for gain in score_functions.marginal_gains(
+                    self._voting_rule_score_function, key[0], key[1]) if gain > 0]
+            self._voters_marginal_gains[voter_id] = marginal_gains_cache[key]
+        voters_slots_count = np.fromiter((len(self._voters_marginal_gains[voter_id]) for voter_id in voters_ids_list),
+                                         dtype=np.int64, count=len(voters_ids_list))
+        slots_gains = np.fromiter(chain.from_iterable(self._voters_marginal_gains[voter_id]
+                                                      for voter_id in voters_ids_list),
+                                  dtype=np.float64, count=int(voters_slots_count.sum()))
+        slots_voters = np.repeat(np.arange(len(voters_ids_list)), voters_slots_count)
+
+        # Create the voters score slots variables, weighted by the marginal gain and the voter weight.
+        slots_pointers = np.concatenate(([0], np.cumsum(voters_slots_count)))
+        slots_variables = model_builder.add_variables(
+            np.zeros(len(slots_gains)), 1, False, slots_gains * voters_weights[slots_voters],
+            names=lambda i: "v_" + str(voters_ids_list[slots_voters[i]]) + "_slot_" +
+                            str(i - slots_pointers[slots_voters[i]]))
+
+        # The number of filled slots is bounded by the number of approved candidates in the committee (a row per voter
+        # with at least one slot).
+        voters_with_slots = voters_slots_count > 0
+        voters_rows = np.cumsum(voters_with_slots) - 1
+        approved_entries_voters = np.repeat(np.arange(len(voters_ids_list)), voters_approved_count)
+        approved_entries_mask = voters_with_slots[approved_entries_voters]
+        rows = np.concatenate((voters_rows[slots_voters], voters_rows[approved_entries_voters[approved_entries_mask]]))
+        columns = np.concatenate((slots_variables, candidates_variables[approved_candidates[approved_entries_mask]]))
+        coefficients = np.concatenate((np.ones(len(slots_variables)), -np.ones(int(approved_entries_mask.sum()))))
+        model_builder.add_constraints(rows, columns, coefficients,
+                                      np.full(int(voters_with_slots.sum()), -np.inf), 0)
+        return slots_variables, slots_pointers
+
+    def _define_general_abc_setting_in_bulk(self, model_builder: mip_model_builder.MIPModelBuilder,
+                                            voters_ids_list: list, voters_approved_count: np.ndarray,
+                                            voters_profile_size: np.ndarray, voters_weights: np.ndarray,
+                                            approved_candidates: np.ndarray, approved_candidates_voters: np.ndarray,
+                                            candidates_variables: np.ndarray) -> tuple:
+        number_of_voters = len(voters_ids_list)
+        big_m = self._model_committee_size + 1
+
+        # Create the voters approval candidates sum variables, and the voters score contribution variables.
+        sum_variables = model_builder.add_variables(
+            np.zeros(number_of_voters), self._model_committee_size, True,
+            names=lambda i: "v_" + str(voters_ids_list[i]) + "_approved_candidates_sum")
+        score_variables = model_builder.add_variables(
+            np.zeros(number_of_voters), self._max_score_function_value, False, voters_weights,
+            names=lambda i: "v_" + str(voters_ids_list[i]) + "_score")
+
+        # Add constraints for voters approval candidates sum vars to be equal to the sum of their approved candidates.
+        model_builder.add_constraints(
+            np.concatenate((np.arange(number_of_voters), approved_candidates_voters)),
+            np.concatenate((sum_variables, candidates_variables[approved_candidates])),
+            np.concatenate((np.ones(number_of_voters), -np.ones(len(approved_candidates)))),
+            np.zeros(number_of_voters), 0)
+
+        # A pair (voter, i) per each possible approval number i of the voter.
+        if config.MINIMIZE_VOTER_CONTRIBUTION_EQUATIONS:
+            voters_max_approval = np.minimum(self._model_committee_size, voters_profile_size)
+        else:
+            voters_max_approval = np.full(number_of_voters, self._model_committee_size)
+        pairs_count = voters_max_approval + 1
+        pairs_voters = np.repeat(np.arange(number_of_voters), pairs_count)
+        pairs_i = np.arange(len(pairs_voters)) - np.repeat(np.cumsum(pairs_count) - pairs_count, pairs_count)
+        number_of_pairs = len(pairs_voters)
+        score_cache = dict()
+        pairs_score = np.empty(number_of_pairs, dtype=np.float64)
+        for p, (i, profile_size) in enumerate(zip(pairs_i.tolist(), voters_profile_size[pairs_voters].tolist())):
+            if (i, profile_size) not in score_cache:
+                score_cache[(i, profile_size)] = self._voting_rule_score_function(i, profile_size)
+            pairs_score[p] = score_cache[(i, profile_size)]
+
+        # Define the abs value replacement y_plus + y_minus = abs(i-voter_approval_sum).
+        b = model_builder.add_variables(
+            np.zeros(number_of_pairs), 1, True,
+            names=lambda p: 'v_b_' + str(voters_ids_list[pairs_voters[p]]) + "_" + str(pairs_i[p]))
+        y_plus = model_builder.add_variables(
+            np.zeros(number_of_pairs), big_m, True,
+            names=lambda p: 'v_y_plus_' + str(voters_ids_list[pairs_voters[p]]) + "_" + str(pairs_i[p]))
+        y_minus = model_builder.add_variables(
+            np.zeros(number_of_pairs), big_m, True,
+            names=lambda p: 'v_y_minus_' + str(voters_ids_list[pairs_voters[p]]) + "_" + str(pairs_i[p]))
+        pairs_rows = np.arange(number_of_pairs)
+        # y_minus <= (1 - b) * (committee_size + 1).
+        model_builder.add_constraints(np.concatenate((pairs_rows, pairs_rows)), np.concatenate((y_minus, b)),
+                                      np.concatenate((np.ones(number_of_pairs), np.full(number_of_pairs, big_m))),
+                                      np.full(number_of_pairs, -np.inf), big_m)
+        # y_plus <= b * (committee_size + 1).
+        model_builder.add_constraints(np.concatenate((pairs_rows, pairs_rows)), np.concatenate((y_plus, b)),
+                                      np.concatenate((np.ones(number_of_pairs), np.full(number_of_pairs, -big_m))),
+                                      np.full(number_of_pairs, -np.inf), 0)
+        # y_plus - y_minus + voter_approval_sum = i.
+        model_builder.add_constraints(np.concatenate((pairs_rows, pairs_rows, pairs_rows)),
+                                      np.concatenate((y_plus, y_minus, sum_variables[pairs_voters])),
+                                      np.concatenate((np.ones(number_of_pairs), -np.ones(number_of_pairs),
+                                                      np.ones(number_of_pairs))),
+                                      pairs_i, pairs_i)
+        # voter_contribution - (y_plus + y_minus) * (max_score_function_value + 1) <= score_function(i).
+        model_builder.add_constraints(np.concatenate((pairs_rows, pairs_rows, pairs_rows)),
+                                      np.concatenate((score_variables[pairs_voters], y_plus, y_minus)),
+                                      np.concatenate((np.ones(number_of_pairs),
+                                                      np.full(2 * number_of_pairs,
+                                                              -(self._max_score_function_value + 1)))),
+                                      np.full(number_of_pairs, -np.inf), pairs_score)
+        return sum_variables, score_variables
+
+    def _get_bulk_voters_variables(self, variables_offset: int, voters_ids_list: list, voters_variables) -> None:
+        # Keep the solver voters variables (by the voters ids), according to the formulation.
+        if voters_variables is None:
+            return
+        if self._concave_score_formulation:
+            slots_variables, slots_pointers = voters_variables[0].tolist(), voters_variables[1].tolist()
+            for i, voter_id in enumerate(voters_ids_list):
+                self._model_voters_score_slots_variables[voter_id] = \
+                    [self._model.variable(variables_offset + j)
+                     for j in slots_variables[slots_pointers[i]:slots_pointers[i + 1]]]
+        else:
+            sum_variables, score_variables = voters_variables[0].tolist(), voters_variables[1].tolist()
+            for i, voter_id in enumerate(voters_ids_list):
+                self._model_voters_approval_candidates_sum_variables[voter_id] = \
+                    self._model.variable(variables_offset + sum_variables[i])
+                self._model_voters_score_contribution_variables[voter_id] = \
+                    self._model.variable(variables_offset + score_variables[i])
+
+    def fix_candidates(self, candidates_ids) -> None:
+        """Fix the given candidates to be in the committee (after the ABC setting is defined), e.g. the candidates that
+        the contextual constraints presolve found must be in the committee.
+
+        :param candidates_ids: An iterable of the candidates ids.
+        """
+        candidates_ids = [candidate_id for candidate_id in candidates_ids
+                          if candidate_id in self.model_candidates_variables]
+        # The fixed candidates are kept as TGDs with an empty left hand side (for finding a greedy warm start).
+        self._keep_constraints('_tgd_tuples_list', [(set(), [{candidate_id}]) for candidate_id in candidates_ids],
+                               None)
+        for candidate_id in candidates_ids:
+            self._fix_candidate_variable(self.model_candidates_variables[candidate_id])
+
+    def _fix_candidate_variable(self, variable) -> None:
+        variable.SetLb(1)
+
+    def define_candidates_symmetry_breaking(self, candidates_classes: list) -> None:
+        """Restrict the committee to the first members of each class of interchangeable candidates (after the ABC
+        setting and the contextual constraints are defined), by the lexicographic constraints x_c1 >= x_c2 >= ... of the
+        (sorted) class members c1 < c2 < ...
+
+        :param candidates_classes: A list of the classes of interchangeable candidates (lists of candidates ids).
+        """
+        self.candidates_classes = [sorted(candidates_class) for candidates_class in candidates_classes
+                                   if len(candidates_class) > 1 and
+                                   set(candidates_class) <= self.model_candidates_variables.keys()]
+        for candidates_class in self.candidates_classes:
+            for candidate_id, next_candidate_id in zip(candidates_class, candidates_class[1:]):
+                self._define_order_constraint(self.model_candidates_variables[candidate_id],
+                                              self.model_candidates_variables[next_candidate_id])
+
+    def _define_order_constraint(self, variable, next_variable) -> None:
+        self._model.Add(variable >= next_variable)
+
+    def set_active_constraints(self, active_keys) -> None:
+        """Set which of the guarded contextual constraints groups are enforced in the next solve (the constraints
+        without an activation key are always enforced). The model is kept as is, only the activation literals are fixed.
+
+        :param active_keys: An iterable of the activation keys of the active constraints groups (None for all).
+        """
+        self._active_keys = None if active_keys is None else set(active_keys)
+        self._set_activation_literals_values({activation_key: self._is_active_key(activation_key)
+                                              for activation_key in self._activation_literals})
+        # The greedy warm start considers only the active constraints.
+        for constraints_list_name in WARM_START_CONSTRAINTS_LISTS:
+            setattr(self, constraints_list_name,
+                    [constraint for activation_key, constraints_lists in self._keyed_constraints.items()
+                     if self._is_active_key(activation_key)
+                     for constraint in constraints_lists.get(constraints_list_name, [])])
+
+    def _is_active_key(self, activation_key) -> bool:
+        return activation_key is None or self._active_keys is None or activation_key in self._active_keys
+
+    def _set_activation_literals_values(self, activation_literals_values: dict) -> None:
+        # Fix each activation literal to its value (there are no assumptions in the MIP solver interface).
+        for activation_key, value in activation_literals_values.items():
+            self._activation_literals[activation_key].SetBounds(int(value), int(value))
+
+    def _get_activation_literal(self, activation_key):
+        # The activation literal of the constraints group (created on its first use), None if it is not guarded.
+        if activation_key is None:
+            return None
+        if activation_key not in self._activation_literals:
+            value = int(self._is_active_key(activation_key))
+            self._activation_literals[activation_key] = \
+                self._model.IntVar(value, value, 'activation_' + str(self._global_counter))
+            self._global_counter += 1
+        return self._activation_literals[activation_key]
+
+    def _keep_constraints(self, constraints_list_name: str, constraints: list, activation_key) -> None:
+        # Keep the contextual constraints (for finding a greedy warm start), by their activation key.
+        keyed_constraints = self._keyed_constraints.setdefault(activation_key, dict())
+        keyed_constraints.setdefault(constraints_list_name, []).extend(constraints)
+        if self._is_active_key(activation_key):
+            getattr(self, constraints_list_name).extend(constraints)
+
+    @staticmethod
+    def _get_unique_dc_candidates_sets(dc_candidates_sets):
+        # Remove duplicates, an integer array of DC tuples (rows) by a vectorized rows sort (see
+        # dc_contraction.get_unique_rows), otherwise by converting to a set and back to a list.
+        if isinstance(dc_candidates_sets, np.ndarray) and dc_candidates_sets.ndim == 2 and \
+                dc_candidates_sets.dtype.kind in 'iu' and len(dc_candidates_sets) > 0:
+            dc_rows = dc_contraction.get_unique_rows(dc_candidates_sets)
+            if not dc_contraction.has_repeated_members(dc_rows):
+                return dc_rows
+        return list(set(map(frozenset, dc_candidates_sets)))
+
+    def _contract_dc_candidates_sets(self, dc_candidates_sets: list) -> list:
+        # The DC candidates sets rows, contracted into hypercliques (when there are DC sets of at least two members).
+        if not config.MINIMIZE_DC_CONSTRAINTS_EQUATIONS or len(dc_candidates_sets) == 0 or \
+                len(dc_candidates_sets[0]) < 2:
+            return dc_candidates_sets
+        start_time = time.time()
+        new_dc_candidates_sets = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets)
+        self.dc_contraction_time += time.time() - start_time
+        self.dc_rows_before_contraction += len(dc_candidates_sets)
+        self.dc_rows_after_contraction += len(new_dc_candidates_sets)
+        return new_dc_candidates_sets
+
+    def define_dc(self, dc_candidates_sets, activation_key=None):
         """Add a given Denial Constraint to the MIP model.
 
         :param dc_candidates_sets: A DC candidates groups, i.e. iterator with sets of denial candidates as value.
         For example - the list [{1,2}, {3,1}] denotes that candidates 1 and 2 cannot be together in the committee (and
         the same applies for candidates 3 and 1).
+        :param activation_key: If given, the DC is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
         """
-        # Remove duplicates by converting to a set and back to a list
-        dc_candidates_sets = list(set(map(frozenset, dc_candidates_sets)))
+        dc_candidates_sets = self._get_unique_dc_candidates_sets(dc_candidates_sets)
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_dc_candidates_sets', dc_candidates_sets, activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
 
         # This implementation is described in the section:
         # Mixed Integer Programming Implementation - Incorporating DC.
         # And the optimization is described in the section:
         # Optimizations - Contracting DC constraints via hypercliques.
-        if config.MINIMIZE_DC_CONSTRAINTS_EQUATIONS and len(dc_candidates_sets) > 0 and len(dc_candidates_sets[0]) > 1:
-            # Create an empty graph.
-            dc_pairs_graph = nx.Graph()
-
-            # Add edges to the graph.
-            for dc_candidates_set in dc_candidates_sets:
-                dc_pairs_graph.add_edges_from(
-                    [(c1, c2) for c1 in dc_candidates_set for c2 in dc_candidates_set if c1 != c2])
-
-            # Find all cliques.
-            # Each clique is a list of all dc candidates in the clique.
-            new_dc_candidates_sets = list(nx.find_cliques(dc_pairs_graph))
-        else:
-            new_dc_candidates_sets = dc_candidates_sets
+        new_dc_candidates_sets = self._contract_dc_candidates_sets(dc_candidates_sets)
 
         # Construct the MIP constraints.
         # The dc length should be according to the original dc sets (and not the new one).
@@ -245,12 +817,16 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
         if len(dc_candidates_sets) > 0:
             dc_group_length = len(dc_candidates_sets[0])
         for candidates_set in new_dc_candidates_sets:
-            self._model.Add(
-                sum([self.model_candidates_variables[candidate_index] for candidate_index in candidates_set
-                     if candidate_index in self.model_candidates_variables])
-                <= (dc_group_length - 1))
-
-    def define_tgd(self, tgd_tuples_list: list):
+            candidates_variables = [self.model_candidates_variables[candidate_index] for candidate_index in
+                                    candidates_set if candidate_index in self.model_candidates_variables]
+            if activation_literal is None:
+                self._model.Add(sum(candidates_variables) <= (dc_group_length - 1))
+            else:
+                # The constraint is relaxed by big_m (the max possible violation) when the literal is false.
+                big_m = max(0, len(candidates_variables) - (dc_group_length - 1))
+                self._model.Add(sum(candidates_variables) + big_m * activation_literal <= (dc_group_length - 1) + big_m)
+
+    def define_tgd(self, tgd_tuples_list: list, activation_key=None):
         """Convert a TGD input to MIP constraints.
 
         :param tgd_tuples_list: A list of tuples - such that each tuple contain in the first place the
@@ -260,7 +836,13 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
         For example - [({1,2}, {{2,4},{3,5}}),...] in this example due to the first tuple, if candidates 1 and 2 are in
         the chosen committee, then 2 and 4 *or* 3 and 5 must be as well.
         Note: The first place in the tuple could be empty (i.e. the TGD should always be enforced).
+        :param activation_key: If given, the TGD is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
         """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_tgd_tuples_list', tgd_tuples_list, activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+
         # This implementation is described in the section:
         # Mixed Integer Programming Implementation - Incorporating TGD.
         for element_members, tgd_representatives_sets in tgd_tuples_list:
@@ -284,7 +866,69 @@ class ABCToMIPConvertor(mip_convertor.MIPConvertor):
                     >= (current_b * len(representatives_set)))
 
             # If b chosen, chose at least one representatives_set.
-            self._model.Add(sum([x for x in b_representatives_list]) >= b)
+            if activation_literal is None:
+                self._model.Add(sum([x for x in b_representatives_list]) >= b)
+            else:
+                self._model.Add(sum([x for x in b_representatives_list]) >= b + activation_literal - 1)
+
+    def define_dc_cardinality(self, candidates_groups: list, max_members: int, activation_key=None):
+        """Add a compiled DC to the MIP model, i.e. a DC of the form 'no max_members + 1 committee members share the
+        same attribute value', given as the candidates group of each attribute value.
+
+        :param candidates_groups: A list of candidates groups (the candidates with the same attribute value).
+        :param max_members: The max number of members of each group in the committee.
+        :param activation_key: If given, the DC is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_dc_cardinality_groups', [(candidates_group, max_members)
+                                                              for candidates_group in candidates_groups],
+                                   activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+        for candidates_group in candidates_groups:
+            self._define_cardinality_constraint(candidates_group, -self._model.infinity(), max_members,
+                                                activation_literal)
+
+    def define_tgd_cardinality(self, candidates_groups: list, min_members: int, activation_key=None):
+        """Add a compiled TGD to the MIP model, i.e. a TGD of the form 'for each attribute value there are at least
+        min_members committee members with this attribute value', given as the candidates group of each attribute value.
+
+        :param candidates_groups: A list of candidates groups (the candidates with the same attribute value, could be
+        empty).
+        :param min_members: The min number of members of each group in the committee.
+        :param activation_key: If given, the TGD is guarded by the activation literal of this key (see
+        set_active_constraints), otherwise it is always enforced.
+        """
+        if config.GREEDY_WARM_START:
+            self._keep_constraints('_tgd_cardinality_groups', [(candidates_group, min_members)
+                                                               for candidates_group in candidates_groups],
+                                   activation_key)
+        activation_literal = self._get_activation_literal(activation_key)
+        for candidates_group in candidates_groups:
+            self._define_cardinality_constraint(candidates_group, min_members, self._model.infinity(),
+                                                activation_literal)
+
+    def _define_cardinality_constraint(self, candidates_group, lower_bound, upper_bound,
+                                       activation_literal=None) -> None:
+        # A single row (that could be empty) bounding the number of the group members in the committee.
+        constraint = self._model.Constraint(lower_bound, upper_bound)
+        group_size = 0
+        for candidate_id in candidates_group:
+            if candidate_id in self.model_candidates_variables:
+                constraint.SetCoefficient(self.model_candidates_variables[candidate_id], 1)
+                group_size += 1
+        if activation_literal is None:
+            return
+        # The bound is enforced only when the literal is true (otherwise the row is relaxed to a trivial one).
+        if lower_bound > -self._model.infinity():
+            # group_members - lower_bound * literal >= 0.
+            constraint.SetLb(0)
+            constraint.SetCoefficient(activation_literal, -lower_bound)
+        else:
+            # group_members + big_m * literal <= upper_bound + big_m.
+            big_m = max(0, group_size - upper_bound)
+            constraint.SetUb(upper_bound + big_m)
+            constraint.SetCoefficient(activation_literal, big_m)
 
 
 if __name__ == '__main__':
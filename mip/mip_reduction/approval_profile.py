@@ -0,0 +1,258 @@
+"""A compact approval profile, a sparse voters x candidates approval matrix in a compressed rows (CSR) format over dense
+voters and candidates indices, used instead of a dict of (per voter) candidates sets.
+"""
+from itertools import chain
+import numpy as np
+
+MODULE_NAME = "Approval Profile"
+
+# The seed of the random candidates hashes used for the voters approval profiles fingerprints (fixed, for a
+# deterministic lifting).
+FINGERPRINT_SEED = 0
+
+
+class ApprovalProfile:
+    def __init__(self, voters_ids, candidates_ids, voters_pointers, approved_candidates, voters_weights=None):
+        """An approval profile in a compressed rows format, where the approved candidates (columns) indices of the voter
+        (row) index v are approved_candidates[voters_pointers[v]:voters_pointers[v + 1]], sorted by the candidate index.
+
+        :param voters_ids: An array of the voter id of each row.
+        :param candidates_ids: An array of the candidate id of each column.
+        :param voters_pointers: An array of the rows start pointers (its length is the number of voters + 1).
+        :param approved_candidates: An array of the approved candidates (columns) indices.
+        :param voters_weights: An array of the voters weights (the default weight is 1).
+        """
+        self.voters_ids = np.asarray(voters_ids)
+        self.candidates_ids = np.asarray(candidates_ids)
+        self.voters_pointers = np.asarray(voters_pointers, dtype=np.int64)
+        self.approved_candidates = np.asarray(approved_candidates, dtype=np.int32)
+        if voters_weights is None:
+            voters_weights = np.ones(len(self.voters_ids), dtype=np.int64)
+        self.voters_weights = np.asarray(voters_weights)
+
+        # A dict from the voter id to its row (created on demand, only for the per voter access).
+        self._voters_rows = None
+
+    @classmethod
+    def create(cls, approval_profile):
+        """Create an approval profile from a dict, where the key is the voter id and the value is the group of
+        candidates id's this voter approves (an approval profile is returned as is).
+
+        :param approval_profile: An approval profile dict (or an approval profile).
+        :return: The approval profile.
+        """
+        if isinstance(approval_profile, ApprovalProfile):
+            return approval_profile
+        voters_profile_size = np.fromiter(map(len, approval_profile.values()), dtype=np.int64,
+                                          count=len(approval_profile))
+        entries_voters = np.repeat(np.arange(len(approval_profile)), voters_profile_size)
+        entries_candidates_ids = np.array(list(chain.from_iterable(approval_profile.values())))
+        return cls._from_entries(np.array(list(approval_profile.keys())), entries_voters, entries_candidates_ids)
+
+    @classmethod
+    def from_pairs(cls, entries_voters_ids, entries_candidates_ids):
+        """Create an approval profile from (voter id, approved candidate id) pairs (e.g. the rows of the voting table).
+
+        :param entries_voters_ids: An array of the voter id of each pair.
+        :param entries_candidates_ids: An array of the candidate id of each pair.
+        :return: The approval profile (the voters are ordered by their id).
+        """
+        voters_ids, entries_voters = np.unique(np.asarray(entries_voters_ids), return_inverse=True)
+        return cls._from_entries(voters_ids, entries_voters, np.asarray(entries_candidates_ids))
+
+    @classmethod
+    def _from_entries(cls, voters_ids, entries_voters, entries_candidates_ids):
+        if len(entries_candidates_ids) == 0:
+            return cls(voters_ids, np.array([], dtype=np.int64), np.zeros(len(voters_ids) + 1, dtype=np.int64),
+                       np.array([], dtype=np.int32))
+        candidates_ids, entries_candidates = np.unique(entries_candidates_ids, return_inverse=True)
+        # Remove duplicated entries, and sort the entries by the voter index and then by the candidate index.
+        entries = np.unique(entries_voters.astype(np.int64) * len(candidates_ids) + entries_candidates)
+        entries_voters = entries // len(candidates_ids)
+        voters_pointers = np.concatenate(([0], np.cumsum(np.bincount(entries_voters, minlength=len(voters_ids)))))
+        return cls(voters_ids, candidates_ids, voters_pointers, entries % len(candidates_ids))
+
+    def concatenate(self, other):
+        """Concatenate the voters of another approval profile after the voters of this approval profile (the voters ids
+        of the two profiles should be different).
+
+        :param other: An approval profile.
+        :return: The concatenated approval profile.
+        """
+        if len(other) == 0:
+            return self
+        if len(self) == 0:
+            return other
+        candidates_ids = np.union1d(self.candidates_ids, other.candidates_ids)
+        # Map the candidates indices of both profiles to the indices of the united candidates.
+        approved_candidates = np.concatenate(
+            (np.searchsorted(candidates_ids, self.candidates_ids)[self.approved_candidates],
+             np.searchsorted(candidates_ids, other.candidates_ids)[other.approved_candidates]))
+        voters_pointers = np.concatenate((self.voters_pointers, other.voters_pointers[1:] + self.voters_pointers[-1]))
+        return ApprovalProfile(np.concatenate((self.voters_ids, other.voters_ids)), candidates_ids, voters_pointers,
+                               approved_candidates, np.concatenate((self.voters_weights, other.voters_weights)))
+
+    def select_voters(self, voters_mask):
+        """Select some of the voters (rows) of the approval profile.
+
+        :param voters_mask: A boolean array of the selected voters (in the voters rows order).
+        :return: The approval profile of the selected voters (in the same order, with the same candidates columns).
+        """
+        voters_mask = np.asarray(voters_mask, dtype=bool)
+        voters_pointers = np.concatenate(([0], np.cumsum(self.get_voters_profile_size()[voters_mask])))
+        return ApprovalProfile(self.voters_ids[voters_mask], self.candidates_ids, voters_pointers,
+                               self.approved_candidates[voters_mask[self.get_entries_voters()]],
+                               self.voters_weights[voters_mask])
+
+    def __len__(self) -> int:
+        return len(self.voters_ids)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, voter_id) -> frozenset:
+        if self._voters_rows is None:
+            self._voters_rows = {voter_id: row for row, voter_id in enumerate(self.voters_ids.tolist())}
+        return self._get_row_candidates(self._voters_rows[voter_id])
+
+    def keys(self) -> list:
+        return self.voters_ids.tolist()
+
+    def values(self):
+        return (self._get_row_candidates(row) for row in range(len(self)))
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def to_dict(self) -> dict:
+        """Convert the approval profile to a dict, where the key is the voter id and the value is the set of candidates
+        id's this voter approves.
+        """
+        return {voter_id: set(voter_approval_profile) for voter_id, voter_approval_profile in self.items()}
+
+    def _get_row_candidates(self, row: int) -> frozenset:
+        return frozenset(self.candidates_ids[self.approved_candidates[self.voters_pointers[row]:
+                                                                      self.voters_pointers[row + 1]]].tolist())
+
+    def get_voters_profile_size(self) -> np.ndarray:
+        """Get the approval profile size of each voter (row)."""
+        return np.diff(self.voters_pointers)
+
+    def get_entries_voters(self) -> np.ndarray:
+        """Get the voter (row) index of each approved candidate entry."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), self.get_voters_profile_size())
+
+    def get_voters_weights_dict(self) -> dict:
+        """Get a dict, where the key is the voter id and the value is the voter weight."""
+        return dict(zip(self.keys(), self.voters_weights.tolist()))
+
+    def get_voters_weights_array(self, voters_weights=None) -> np.ndarray:
+        """Get the voters weights as an array (in the voters rows order).
+
+        :param voters_weights: A dict from the voter id to its weight, an array of the weights, or None for the
+        approval profile weights.
+        :return: The voters weights array.
+        """
+        if voters_weights is None:
+            voters_weights = self.voters_weights
+        elif isinstance(voters_weights, dict):
+            voters_weights = np.fromiter((voters_weights[voter_id] for voter_id in self.keys()), dtype=np.float64,
+                                         count=len(self))
+        return np.asarray(voters_weights, dtype=np.float64)
+
+    def get_approval_entries(self, candidates_indices: dict) -> tuple:
+        """Get the approval profile entries of the given candidates, as (voter index, candidate index) pairs.
+
+        :param candidates_indices: A dict from the candidate id to its index (the entries of other candidates are
+        dropped).
+        :return: The entries voters indices array, and the entries candidates indices array.
+        """
+        columns_candidates = np.fromiter((candidates_indices.get(candidate_id, -1)
+                                          for candidate_id in self.candidates_ids.tolist()),
+                                         dtype=np.int64, count=len(self.candidates_ids))
+        entries_candidates = columns_candidates[self.approved_candidates]
+        candidates_entries = entries_candidates >= 0
+        return self.get_entries_voters()[candidates_entries].astype(np.int64), entries_candidates[candidates_entries]
+
+    def get_committee_approval_count(self, committee) -> np.ndarray:
+        """Get the number of approved committee members of each voter (row).
+
+        :param committee: An iterable of the committee candidates ids.
+        :return: The voters approval count array.
+        """
+        committee_columns = np.isin(self.candidates_ids, np.array(list(committee)))
+        return np.bincount(self.get_entries_voters()[committee_columns[self.approved_candidates]],
+                           minlength=len(self))
+
+    def lift(self):
+        """Union all the voters with the same approval profile into one weighted voter (a 'lifted' voter). The voters
+        are grouped by a fingerprint of their (sorted) approval profile row, and the lifted voters are ordered by their
+        first appearance, with new ids 0, 1, ...
+
+        :return: The lifted approval profile, where the voter weight is the sum of the weights of its voters.
+        """
+        # This implementation is described in the section:
+        # Optimizations - Grouping similar voters.
+        voters_profile_size = self.get_voters_profile_size()
+        voters_groups, groups_first_voters = self._group_voters_by_fingerprint(voters_profile_size)
+        if not self._is_exact_grouping(voters_groups, groups_first_voters, voters_profile_size):
+            # A fingerprints collision (extremely unlikely), group the voters by their exact approval profile.
+            voters_groups, groups_first_voters = self._group_voters_exactly()
+
+        groups_weights = np.zeros(len(groups_first_voters), dtype=self.voters_weights.dtype)
+        np.add.at(groups_weights, voters_groups, self.voters_weights)
+
+        # The lifted voters rows are their first voter rows.
+        groups_profile_size = voters_profile_size[groups_first_voters]
+        groups_pointers = np.concatenate(([0], np.cumsum(groups_profile_size)))
+        groups_entries = np.repeat(self.voters_pointers[groups_first_voters] - groups_pointers[:-1],
+                                   groups_profile_size) + np.arange(groups_pointers[-1])
+        return ApprovalProfile(np.arange(len(groups_first_voters)), self.candidates_ids, groups_pointers,
+                               self.approved_candidates[groups_entries], groups_weights)
+
+    def _group_voters_by_fingerprint(self, voters_profile_size: np.ndarray) -> tuple:
+        # The fingerprint of a row is its size and two sums of random 64 bits candidates hashes (the sums are modulo
+        # 2^64, and are computed as differences of the entries prefix sums).
+        candidates_hashes = np.random.default_rng(FINGERPRINT_SEED).integers(
+            0, np.iinfo(np.int64).max, size=(2, len(self.candidates_ids)), dtype=np.int64).astype(np.uint64)
+        fingerprints = [voters_profile_size.astype(np.uint64)]
+        with np.errstate(over='ignore'):
+            for hashes in candidates_hashes:
+                entries_prefix_sums = np.concatenate((np.zeros(1, dtype=np.uint64),
+                                                      np.cumsum(hashes[self.approved_candidates], dtype=np.uint64)))
+                fingerprints.append(entries_prefix_sums[self.voters_pointers[1:]] -
+                                    entries_prefix_sums[self.voters_pointers[:-1]])
+        _, first_voters, voters_groups = np.unique(np.stack(fingerprints, axis=1), axis=0, return_index=True,
+                                                   return_inverse=True)
+        return self._order_groups(voters_groups.reshape(-1), first_voters)
+
+    def _group_voters_exactly(self) -> tuple:
+        approval_profiles_groups = dict()
+        voters_groups = np.fromiter((approval_profiles_groups.setdefault(voter_approval_profile,
+                                                                         len(approval_profiles_groups))
+                                     for voter_approval_profile in self.values()), dtype=np.int64, count=len(self))
+        _, first_voters = np.unique(voters_groups, return_index=True)
+        return voters_groups, first_voters
+
+    @staticmethod
+    def _order_groups(voters_groups: np.ndarray, groups_first_voters: np.ndarray) -> tuple:
+        # Renumber the groups by the order of their first voter.
+        groups_order = np.argsort(groups_first_voters, kind='stable')
+        groups_new_index = np.empty(len(groups_order), dtype=np.int64)
+        groups_new_index[groups_order] = np.arange(len(groups_order))
+        return groups_new_index[voters_groups], groups_first_voters[groups_order]
+
+    def _is_exact_grouping(self, voters_groups: np.ndarray, groups_first_voters: np.ndarray,
+                           voters_profile_size: np.ndarray) -> bool:
+        # Compare each voter row to the row of its group first voter (the rows are sorted, and of the same size).
+        voters_first_voter = groups_first_voters[voters_groups]
+        if np.any(voters_profile_size[voters_first_voter] != voters_profile_size):
+            return False
+        entries_voters = self.get_entries_voters()
+        first_voter_entries = self.voters_pointers[voters_first_voter][entries_voters] + \
+            np.arange(len(self.approved_candidates)) - self.voters_pointers[entries_voters]
+        return bool(np.all(self.approved_candidates[first_voter_entries] == self.approved_candidates))
+
+
+if __name__ == '__main__':
+    pass
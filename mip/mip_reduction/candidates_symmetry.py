@@ -0,0 +1,135 @@
+"""A utility module for detecting classes of interchangeable (symmetric) candidates - candidates with the same approving
+voters, such that swapping any two of them maps the contextual constraints onto themselves. Any committee has an
+equivalent committee (of the same score) with the first members of each class, hence the committee can be restricted to
+it (a lexicographic symmetry breaking).
+"""
+from collections import Counter
+import numpy as np
+
+from mip.mip_reduction.approval_profile import ApprovalProfile
+from mip.mip_reduction.presolve import to_rows
+
+MODULE_NAME = "Candidates Symmetry"
+
+
+def get_constraints_set(dc_candidates_sets: list = (), tgd_tuples_list: list = (), dc_cardinality_groups: list = (),
+                        tgd_cardinality_groups: list = ()) -> set:
+    """Get the contextual constraints as a set of hashable constraints, each is a tuple of the constraint kind, its
+    candidates sets (frozen) and its bound (for the compiled constraints).
+    :param dc_candidates_sets: A list of DC candidates sets (candidates that cannot be all together in the committee).
+    :param tgd_tuples_list: A list of TGD tuples (the left hand side candidates set, the right hand side candidates
+    sets), as in the ABC to MIP convertor.
+    :param dc_cardinality_groups: A list of tuples of a candidates group and the max number of its members in the
+    committee (a compiled DC).
+    :param tgd_cardinality_groups: A list of tuples of a candidates group and the min number of its members in the
+    committee (a compiled TGD).
+    :return: The constraints set.
+    """
+    constraints = {('dc', frozenset(dc_candidates_set)) for dc_candidates_set in to_rows(dc_candidates_sets)}
+    constraints.update([('tgd', frozenset(element_members),
+                         frozenset(map(frozenset, to_rows(tgd_representatives_sets))))
+                        for element_members, tgd_representatives_sets in tgd_tuples_list])
+    constraints.update([('dc_group', frozenset(candidates_group), max_members)
+                        for candidates_group, max_members in dc_cardinality_groups])
+    constraints.update([('tgd_group', frozenset(candidates_group), min_members)
+                        for candidates_group, min_members in tgd_cardinality_groups])
+    return constraints
+
+
+def _get_constraint_members(constraint) -> set:
+    if constraint[0] == 'tgd':
+        return constraint[1].union(*constraint[2])
+    return set(constraint[1])
+
+
+def _swap_constraint(constraint, transposition: dict):
+    # The constraint with the candidates swapped by the transposition (a dict of the two swapped candidates).
+    def swap_members(members):
+        return frozenset([transposition.get(member, member) for member in members])
+    if constraint[0] == 'tgd':
+        return constraint[0], swap_members(constraint[1]), frozenset(map(swap_members, constraint[2]))
+    return (constraint[0], swap_members(constraint[1])) + constraint[2:]
+
+
+def _is_symmetric_pair(candidate_id, other_candidate_id, constraints: set, candidates_constraints: dict) -> bool:
+    # Whether swapping the two candidates maps the constraints onto themselves (only the constraints with any of them
+    # could change).
+    transposition = {candidate_id: other_candidate_id, other_candidate_id: candidate_id}
+    return all([_swap_constraint(constraint, transposition) in constraints
+                for constraint in candidates_constraints.get(candidate_id, []) +
+                candidates_constraints.get(other_candidate_id, [])])
+
+
+def _get_candidates_voters_keys(candidates_ids_set: set, approval_profile: ApprovalProfile) -> dict:
+    # A key of the approving voters (rows) of each candidate.
+    order = np.argsort(approval_profile.approved_candidates, kind='stable')
+    candidates_voters = approval_profile.get_entries_voters()[order]
+    candidates_pointers = np.concatenate(([0], np.cumsum(np.bincount(approval_profile.approved_candidates,
+                                                                     minlength=len(approval_profile.candidates_ids)))))
+    candidates_voters_keys = {candidate_id: b'' for candidate_id in candidates_ids_set}
+    for candidate_index, candidate_id in enumerate(approval_profile.candidates_ids.tolist()):
+        if candidate_id in candidates_voters_keys:
+            candidates_voters_keys[candidate_id] = candidates_voters[
+                candidates_pointers[candidate_index]:candidates_pointers[candidate_index + 1]].tobytes()
+    return candidates_voters_keys
+
+
+def find_symmetric_candidates_classes(candidates_ids_set: set, approval_profile, constraints: set) -> list:
+    """Find the classes of interchangeable candidates, i.e. candidates with the same approving voters, such that
+    swapping any two candidates of a class maps the constraints onto themselves (hence any permutation of a class does).
+    :param candidates_ids_set: The candidates ids set.
+    :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the group of
+    candidates id's this voter approves.
+    :param constraints: The contextual constraints set (see get_constraints_set).
+    :return: A list of the classes (with at least two candidates), each is a sorted list of candidates ids.
+    """
+    approval_profile = ApprovalProfile.create(approval_profile)
+    candidates_constraints = dict()
+    for constraint in constraints:
+        for member in _get_constraint_members(constraint):
+            candidates_constraints.setdefault(member, []).append(constraint)
+
+    # Only candidates with the same approving voters and the same number of constraints of each kind can be symmetric.
+    candidates_voters_keys = _get_candidates_voters_keys(candidates_ids_set, approval_profile)
+    candidates_groups = dict()
+    for candidate_id in sorted(candidates_ids_set):
+        constraints_kinds = sorted(Counter([constraint[0] for constraint in
+                                            candidates_constraints.get(candidate_id, [])]).items())
+        candidates_groups.setdefault((candidates_voters_keys[candidate_id], tuple(constraints_kinds)),
+                                     []).append(candidate_id)
+
+    # Being symmetric is an equivalence relation (a transposition conjugated by a transposition is a transposition),
+    # hence each candidate is compared only to the first candidate of each class.
+    candidates_classes = []
+    for remaining_candidates in candidates_groups.values():
+        while len(remaining_candidates) > 1:
+            first_candidate_id = remaining_candidates[0]
+            candidates_class, other_candidates = [first_candidate_id], []
+            for candidate_id in remaining_candidates[1:]:
+                if _is_symmetric_pair(first_candidate_id, candidate_id, constraints, candidates_constraints):
+                    candidates_class.append(candidate_id)
+                else:
+                    other_candidates.append(candidate_id)
+            if len(candidates_class) > 1:
+                candidates_classes.append(candidates_class)
+            remaining_candidates = other_candidates
+    return candidates_classes
+
+
+def get_canonical_committee(committee, candidates_classes: list) -> list:
+    """Get the equivalent committee with the first members of each class (the members of a class in the committee are
+    replaced by the same number of the first members of the class).
+    :param committee: An iterable of the committee candidates ids.
+    :param candidates_classes: A list of the classes of interchangeable candidates (sorted lists of candidates ids).
+    :return: The canonical committee.
+    """
+    committee = set(committee)
+    for candidates_class in candidates_classes:
+        class_members_number = len(committee.intersection(candidates_class))
+        committee.difference_update(candidates_class)
+        committee.update(candidates_class[:class_members_number])
+    return sorted(committee)
+
+
+if __name__ == '__main__':
+    pass
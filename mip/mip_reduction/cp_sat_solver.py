@@ -0,0 +1,58 @@
+import ortools.linear_solver.pywraplp as pywraplp
+from ortools.sat.python import cp_model
+
+import config
+
+MODULE_NAME = "CP-SAT Solver"
+
+# Map the CP-SAT statuses to the (pywraplp) solver statuses used across the project.
+CP_SAT_STATUS_TO_SOLVER_STATUS = {cp_model.OPTIMAL: pywraplp.Solver.OPTIMAL,
+                                  cp_model.FEASIBLE: pywraplp.Solver.FEASIBLE,
+                                  cp_model.INFEASIBLE: pywraplp.Solver.INFEASIBLE,
+                                  cp_model.MODEL_INVALID: pywraplp.Solver.MODEL_INVALID,
+                                  cp_model.UNKNOWN: pywraplp.Solver.NOT_SOLVED}
+
+
+class CPSATSolver:
+    def __init__(self, num_workers: int = None):
+        """A native CP-SAT model and solver, exposing the parts of the pywraplp solver interface that are used by the
+        convertors and the experiments (solving, statuses, time limit and the model size).
+
+        :param num_workers: The number of parallel workers (0 means using all the available cores), if None the
+        configured number is used.
+        """
+        if num_workers is None:
+            num_workers = config.CP_SAT_NUM_WORKERS
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+        self.solver.parameters.num_workers = num_workers
+
+    def set_time_limit(self, time_limit: int) -> None:
+        """Set the solver time limit.
+
+        :param time_limit: The solver time limit in milliseconds.
+        """
+        self.solver.parameters.max_time_in_seconds = time_limit / 1000
+
+    def Solve(self) -> int:
+        """Solve the model.
+
+        :return: The solver status (as a pywraplp solver status).
+        """
+        return CP_SAT_STATUS_TO_SOLVER_STATUS[self.solver.Solve(self.model)]
+
+    def Value(self, variable) -> float:
+        return float(self.solver.Value(variable))
+
+    def ObjectiveValue(self) -> float:
+        return self.solver.ObjectiveValue()
+
+    def NumVariables(self) -> int:
+        return len(self.model.Proto().variables)
+
+    def NumConstraints(self) -> int:
+        return len(self.model.Proto().constraints)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,148 @@
+"""A utility module for contracting the DC constraints rows - a greedy cover of the DC tuples (of the same arity k) by
+hypercliques, i.e. candidates sets such that every k-subset of them is a DC tuple (hence at most k-1 of their members
+can be in the committee). For pairs (k = 2) these are the cliques of the conflict graph, and each clique replaces the
+rows of all its pairs by a single row.
+"""
+from itertools import combinations
+import time
+import numpy as np
+
+import config
+
+MODULE_NAME = "DC Contraction"
+
+
+def get_unique_rows(dc_rows: np.ndarray) -> np.ndarray:
+    """Get the distinct DC sets of an array of DC tuples (rows), each canonicalized by sorting its members.
+    :param dc_rows: An array of the DC tuples (rows).
+    :return: The lexicographically sorted array of the distinct sorted rows.
+    """
+    return np.unique(np.sort(dc_rows, axis=1), axis=0)
+
+
+def get_unique_rows_from_chunks(dc_rows_chunks, columns_number: int) -> np.ndarray:
+    """Get the distinct DC sets of the DC tuples chunks (see get_unique_rows), such that only the distinct rows and the
+    last chunks are held in memory at once.
+    :param dc_rows_chunks: An iterable of the DC tuples arrays (chunks).
+    :param columns_number: The number of the DC tuples members.
+    :return: The lexicographically sorted array of the distinct sorted rows.
+    """
+    unique_rows = np.empty((0, columns_number), dtype=np.int64)
+    pending_chunks, pending_rows_number = [], 0
+    for dc_rows_chunk in dc_rows_chunks:
+        pending_chunks.append(get_unique_rows(dc_rows_chunk))
+        pending_rows_number += len(pending_chunks[-1])
+        # The pending chunks are merged once they are as large as the distinct rows (hence each row is merged an
+        # amortized constant number of times).
+        if pending_rows_number >= len(unique_rows):
+            unique_rows = np.unique(np.concatenate([unique_rows] + pending_chunks), axis=0)
+            pending_chunks, pending_rows_number = [], 0
+    return np.unique(np.concatenate([unique_rows] + pending_chunks), axis=0)
+
+
+def has_repeated_members(dc_rows: np.ndarray) -> bool:
+    """Whether any of the sorted DC tuples (rows) has a repeated member (hence it is a DC set of a smaller arity)."""
+    return bool((dc_rows[:, 1:] == dc_rows[:, :-1]).any())
+
+
+def get_adjacency(dc_tuples: np.ndarray, nodes_number: int) -> tuple:
+    """Get the sparse (CSR) adjacency of the pairs graph of the DC tuples, i.e. two candidates are adjacent if they are
+    both members of some DC tuple.
+    :param dc_tuples: An array of the DC tuples (rows) of dense candidates indices.
+    :param nodes_number: The number of dense candidates indices.
+    :return: A tuple of the pointers array (the neighbors of node i are in neighbors[pointers[i]:pointers[i + 1]]), and
+    the sorted neighbors array.
+    """
+    edges = [(dc_tuples[:, i], dc_tuples[:, j]) for i, j in combinations(range(dc_tuples.shape[1]), 2)]
+    sources = np.concatenate([source for source, target in edges] + [target for source, target in edges])
+    targets = np.concatenate([target for source, target in edges] + [source for source, target in edges])
+    # Each edge is encoded as a single integer (sorted by source and then by target), removing the duplicates and the
+    # self loops (of a DC tuple with duplicated members).
+    encoded_edges = np.unique(sources.astype(np.int64) * nodes_number + targets)
+    encoded_edges = encoded_edges[encoded_edges // nodes_number != encoded_edges % nodes_number]
+    neighbors = encoded_edges % nodes_number
+    pointers = np.concatenate(([0], np.cumsum(np.bincount(encoded_edges // nodes_number, minlength=nodes_number))))
+    return pointers, neighbors
+
+
+def contract_dc_candidates_sets(dc_candidates_sets, time_budget: float = None, max_clique_size: int = None) -> list:
+    """Contract the DC candidates sets of the same arity k into hypercliques, such that each DC set is contained in
+    some hyperclique, and every k-subset of each hyperclique is a DC set (hence at most k-1 members of each hyperclique
+    can be in the committee).
+    Each hyperclique is grown greedily from an uncovered DC set, by the common neighbors (in the pairs graph) of its
+    members with the highest degree, such that each added member forms a DC set with every k-1 members of it.
+    When the time budget is over, the remaining uncovered DC sets are kept as they are.
+    :param dc_candidates_sets: An iterable of DC candidates sets (of the same arity), or an array of DC tuples (rows).
+    :param time_budget: The max contraction time (sec), the default is config.DC_CONTRACTION_TIME_BUDGET.
+    :param max_clique_size: The max size of a hyperclique, the default is config.DC_CONTRACTION_MAX_CLIQUE_SIZE.
+    :return: A list of the hypercliques (each is a sorted list of candidates ids).
+    """
+    if time_budget is None:
+        time_budget = config.DC_CONTRACTION_TIME_BUDGET
+    if max_clique_size is None:
+        max_clique_size = config.DC_CONTRACTION_MAX_CLIQUE_SIZE
+    if len(dc_candidates_sets) == 0:
+        return []
+    # An array of DC tuples is only sorted (by rows), unless it has a DC tuple with repeated members.
+    if isinstance(dc_candidates_sets, np.ndarray) and not has_repeated_members(np.sort(dc_candidates_sets, axis=1)):
+        arity = dc_candidates_sets.shape[1]
+        other_dc_candidates_sets = []
+        dc_rows = np.sort(dc_candidates_sets, axis=1)
+    else:
+        dc_candidates_sets = [sorted(set(dc_candidates_set)) for dc_candidates_set in dc_candidates_sets]
+        arity = len(dc_candidates_sets[0])
+        # A DC set with duplicated members (of a smaller arity) is kept as it is.
+        other_dc_candidates_sets = [dc_candidates_set for dc_candidates_set in dc_candidates_sets
+                                    if len(dc_candidates_set) != arity]
+        dc_rows = np.array([dc_candidates_set for dc_candidates_set in dc_candidates_sets
+                            if len(dc_candidates_set) == arity]).reshape(-1, arity)
+    if arity < 2:
+        return dc_rows.tolist() + other_dc_candidates_sets
+
+    # The candidates ids are sorted, hence each DC tuple of dense indices is sorted as well.
+    candidates_ids, dc_tuples = np.unique(dc_rows, return_inverse=True)
+    dc_tuples = dc_tuples.reshape(len(dc_rows), arity)
+    pointers, neighbors = get_adjacency(dc_tuples, len(candidates_ids))
+    degrees = np.diff(pointers)
+    dc_tuples_set = set(map(tuple, dc_tuples.tolist()))
+
+    start_time = time.time()
+    covered_dc_tuples = set()
+    cliques = []
+    # Start from the DC tuples with the highest degree members, which are the most likely to be in large cliques.
+    for dc_index in np.argsort(-degrees[dc_tuples].min(axis=1), kind='stable').tolist():
+        dc_tuple = tuple(dc_tuples[dc_index].tolist())
+        if dc_tuple in covered_dc_tuples:
+            continue
+        if time.time() - start_time > time_budget:
+            cliques.append(list(dc_tuple))
+            continue
+
+        clique = list(dc_tuple)
+        common_neighbors = neighbors[pointers[clique[0]]:pointers[clique[0] + 1]]
+        for node in clique[1:]:
+            common_neighbors = np.intersect1d(common_neighbors, neighbors[pointers[node]:pointers[node + 1]],
+                                              assume_unique=True)
+        # A rejected candidate can never be added later (the clique only grows), hence each one is checked once.
+        common_neighbors = common_neighbors[np.argsort(-degrees[common_neighbors], kind='stable')].tolist()
+        while len(common_neighbors) > 0 and len(clique) < max_clique_size:
+            node = common_neighbors.pop(0)
+            # For pairs a common neighbor is always a clique member, otherwise every new k-subset (with the node) is
+            # checked to be a DC tuple.
+            if arity > 2 and not all([tuple(sorted(members + (node,))) in dc_tuples_set
+                                      for members in combinations(clique, arity - 1)]):
+                continue
+            clique.append(node)
+            node_neighbors = neighbors[pointers[node]:pointers[node + 1]]
+            common_neighbors = [other_node for other_node, is_neighbor in
+                                zip(common_neighbors, np.isin(common_neighbors, node_neighbors).tolist())
+                                if is_neighbor]
+        clique.sort()
+        covered_dc_tuples.update(combinations(clique, arity))
+        cliques.append(clique)
+
+    return [candidates_ids[clique].tolist() for clique in cliques] + other_dc_candidates_sets
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,253 @@
+"""A utility module for finding a feasible committee fast (a constraint aware sequential Thiele greedy), used as a warm
+start (solution hint) of the solver.
+"""
+from collections import defaultdict
+import numpy as np
+
+from mip.mip_reduction.approval_profile import ApprovalProfile
+
+MODULE_NAME = "Greedy Warm Start"
+
+
+def get_committee_score(committee, approval_profile: dict, voters_weights: dict, score_function) -> float:
+    """Calculate the score of a committee.
+    :param committee: An iterable of the committee candidates ids.
+    :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the group of
+    candidates id's this voter approves.
+    :param voters_weights: A dict, where the key is the voter id, and the value is the voter weight (or an array of the
+    weights, in the approval profile voters order).
+    :param score_function: An ABC score function.
+    :return: The committee score.
+    """
+    approval_profile = ApprovalProfile.create(approval_profile)
+    voters_approval_count = approval_profile.get_committee_approval_count(committee)
+    # The score function is evaluated once per distinct (approval count, approval profile size) pair.
+    score_arguments, voters_score_arguments = np.unique(
+        np.stack([voters_approval_count, approval_profile.get_voters_profile_size()]), axis=1, return_inverse=True)
+    arguments_scores = np.array([score_function(approval_count, profile_size) for approval_count, profile_size in
+                                 score_arguments.T.tolist()], dtype=np.float64)
+    return float(np.dot(arguments_scores[voters_score_arguments.reshape(-1)],
+                        approval_profile.get_voters_weights_array(voters_weights)))
+
+
+def is_feasible_committee(committee, committee_size: int, dc_candidates_sets: list, tgd_tuples_list: list,
+                          dc_cardinality_groups: list = (), tgd_cardinality_groups: list = ()) -> bool:
+    """Test whether a committee satisfies the committee size, the DCs and the TGDs.
+    :param committee: An iterable of the committee candidates ids.
+    :param committee_size: The committee size.
+    :param dc_candidates_sets: A list of DC candidates sets (candidates that cannot be all together in the committee).
+    :param tgd_tuples_list: A list of TGD tuples (the left hand side candidates set, the right hand side candidates
+    sets), as in the ABC to MIP convertor.
+    :param dc_cardinality_groups: A list of tuples of a candidates group and the max number of its members in the
+    committee (a compiled DC).
+    :param tgd_cardinality_groups: A list of tuples of a candidates group and the min number of its members in the
+    committee (a compiled TGD).
+    :return: True if the committee is feasible, false otherwise.
+    """
+    committee = set(committee)
+    if len(committee) != committee_size:
+        return False
+    if any([set(dc_candidates_set) <= committee for dc_candidates_set in dc_candidates_sets]):
+        return False
+    if any([len(committee & set(candidates_group)) > max_members
+            for candidates_group, max_members in dc_cardinality_groups]):
+        return False
+    if any([len(committee & set(candidates_group)) < min_members
+            for candidates_group, min_members in tgd_cardinality_groups]):
+        return False
+    return all([not set(element_members) <= committee or
+                any([set(representatives_set) <= committee for representatives_set in tgd_representatives_sets])
+                for element_members, tgd_representatives_sets in tgd_tuples_list])
+
+
+def find_greedy_committee(candidates_ids_set: set, approval_profile: dict, voters_weights: dict, committee_size: int,
+                          score_function, dc_candidates_sets: list = (), tgd_tuples_list: list = (),
+                          dc_cardinality_groups: list = (), tgd_cardinality_groups: list = (),
+                          initial_committee: list = ()):
+    """Find a committee by sequential Thiele (adding the candidate with the largest marginal gain at each step), while
+    skipping candidates that complete a DC set, and preferring candidates that complete a TGD right hand side set when
+    the remaining seats are needed for the unsatisfied TGDs.
+
+    :param candidates_ids_set: A set of candidates id's.
+    :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the group of
+    candidates id's this voter approves.
+    :param voters_weights: A dict, where the key is the voter id, and the value is the voter weight (or an array of the
+    weights, in the approval profile voters order).
+    :param committee_size: The committee size.
+    :param score_function: An ABC score function.
+    :param dc_candidates_sets: A list of DC candidates sets (candidates that cannot be all together in the committee).
+    :param tgd_tuples_list: A list of TGD tuples (the left hand side candidates set, the right hand side candidates
+    sets), as in the ABC to MIP convertor.
+    :param dc_cardinality_groups: A list of tuples of a candidates group and the max number of its members in the
+    committee (a compiled DC).
+    :param tgd_cardinality_groups: A list of tuples of a candidates group and the min number of its members in the
+    committee (a compiled TGD).
+    :param initial_committee: Candidates ids that are chosen first (e.g. the committee of a previous step of a sweep),
+    each one as long as it is eligible.
+    :return: The committee candidates ids list, or None if the greedy did not find a feasible committee.
+    """
+    candidates_ids_list = list(candidates_ids_set)
+    candidates_indices = {candidate_id: i for i, candidate_id in enumerate(candidates_ids_list)}
+    number_of_candidates = len(candidates_ids_list)
+    if committee_size > number_of_candidates:
+        return None
+
+    approval_profile = ApprovalProfile.create(approval_profile)
+    entries_voters, entries_candidates = get_approval_entries(approval_profile, candidates_indices)
+    voters_gains = get_voters_gains_table(approval_profile, voters_weights, committee_size, score_function)
+    voters_approval_count = np.zeros(len(approval_profile), dtype=np.int64)
+
+    # For each candidate, the DC sets containing it, and the number of chosen candidates of each DC set.
+    dc_candidates_sets, dc_sets_max_members, candidates_dc_sets = get_candidates_dc_sets(
+        dc_candidates_sets, candidates_indices, dc_cardinality_groups)
+    dc_sets_chosen_count = np.zeros(len(dc_candidates_sets), dtype=np.int64)
+    blocked_candidates = np.zeros(number_of_candidates, dtype=bool)
+    for dc_index, dc_candidates_set in enumerate(dc_candidates_sets):
+        if dc_sets_max_members[dc_index] <= 0:
+            blocked_candidates[dc_candidates_set] = True
+
+    initial_committee = list(dict.fromkeys([candidates_indices[candidate_id] for candidate_id in initial_committee
+                                            if candidate_id in candidates_indices]))
+    committee = []
+    committee_mask = np.zeros(number_of_candidates, dtype=bool)
+    for step in range(committee_size):
+        # The marginal gain of each candidate given the current committee (as floats, also without approval entries).
+        candidates_gains = np.bincount(entries_candidates,
+                                       weights=voters_gains[entries_voters, voters_approval_count[entries_voters]],
+                                       minlength=number_of_candidates).astype(np.float64)
+        eligible_candidates = ~committee_mask & ~blocked_candidates
+
+        # If the remaining seats are needed for the unsatisfied TGDs, choose only candidates that satisfy them.
+        tgd_candidates = get_unsatisfied_tgds_candidates(
+            {candidates_ids_list[candidate_index] for candidate_index in committee}, candidates_indices,
+            tgd_tuples_list, committee_size - len(committee), tgd_cardinality_groups)
+        if tgd_candidates is not None:
+            eligible_candidates &= np.isin(np.arange(number_of_candidates), list(tgd_candidates))
+        if not eligible_candidates.any():
+            return None
+
+        if step < len(initial_committee) and eligible_candidates[initial_committee[step]]:
+            chosen_candidate_index = initial_committee[step]
+        else:
+            candidates_gains[~eligible_candidates] = -np.inf
+            chosen_candidate_index = int(np.argmax(candidates_gains))
+        committee.append(chosen_candidate_index)
+        committee_mask[chosen_candidate_index] = True
+        voters_approval_count[entries_voters[entries_candidates == chosen_candidate_index]] += 1
+
+        # Block the candidates that complete a DC set.
+        for dc_index in candidates_dc_sets[chosen_candidate_index]:
+            dc_sets_chosen_count[dc_index] += 1
+            if dc_sets_chosen_count[dc_index] == dc_sets_max_members[dc_index]:
+                for candidate_index in dc_candidates_sets[dc_index]:
+                    if not committee_mask[candidate_index]:
+                        blocked_candidates[candidate_index] = True
+
+    committee = [candidates_ids_list[candidate_index] for candidate_index in committee]
+    if not is_feasible_committee(committee, committee_size, [], tgd_tuples_list,
+                                 tgd_cardinality_groups=tgd_cardinality_groups):
+        return None
+    return committee
+
+
+def get_approval_entries(approval_profile: dict, candidates_indices: dict) -> tuple:
+    """Convert the approval profile to (voter index, candidate index) entries (the voters are indexed by the approval
+    profile order).
+    :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the group of
+    candidates id's this voter approves.
+    :param candidates_indices: A dict from the candidate id to its index.
+    :return: The entries voters indices array, and the entries candidates indices array.
+    """
+    return ApprovalProfile.create(approval_profile).get_approval_entries(candidates_indices)
+
+
+def get_voters_gains_table(approval_profile: dict, voters_weights: dict, committee_size: int,
+                           score_function) -> np.ndarray:
+    """Calculate the (weighted) marginal gains table of the voters, i.e. table[v, i] = (f(i + 1) - f(i)) * weight(v),
+    where table[v, committee_size] = 0.
+    :param approval_profile: An approval profile, or a dict where the key is the voter id, and the value is the group of
+    candidates id's this voter approves.
+    :param voters_weights: A dict, where the key is the voter id, and the value is the voter weight (or an array of the
+    weights, in the approval profile voters order).
+    :param committee_size: The committee size.
+    :param score_function: An ABC score function.
+    :return: The voters gains table (the voters are indexed by the approval profile order).
+    """
+    # The marginal gains depend only on the approval profile size (hence calculated once per distinct size).
+    approval_profile = ApprovalProfile.create(approval_profile)
+    profiles_sizes, voters_profile_size_index = np.unique(approval_profile.get_voters_profile_size(),
+                                                          return_inverse=True)
+    sizes_gains = np.array([[score_function(i + 1, profile_size) - score_function(i, profile_size)
+                             for i in range(committee_size)] + [0] for profile_size in profiles_sizes.tolist()],
+                           dtype=np.float64).reshape(len(profiles_sizes), committee_size + 1)
+    return sizes_gains[voters_profile_size_index] * \
+        approval_profile.get_voters_weights_array(voters_weights)[:, np.newaxis]
+
+
+def get_candidates_dc_sets(dc_candidates_sets: list, candidates_indices: dict,
+                           dc_cardinality_groups: list = ()) -> tuple:
+    """Convert the DC sets and the DC cardinality groups to candidates indices lists with the max number of members in
+    the committee (a DC set with a non-candidate member is always satisfied, hence dropped, while a non-candidate member
+    of a cardinality group is never chosen, hence removed), and map each candidate to the DC sets containing it.
+    :param dc_candidates_sets: A list of DC candidates sets (candidates that cannot be all together in the committee).
+    :param candidates_indices: A dict from the candidate id to its index.
+    :param dc_cardinality_groups: A list of tuples of a candidates group and the max number of its members in the
+    committee (a compiled DC).
+    :return: The DC sets as candidates indices lists, the max number of members of each DC set, and a dict from the
+    candidate index to its DC sets indices.
+    """
+    dc_candidates_sets = [[candidates_indices[candidate_id] for candidate_id in dc_candidates_set]
+                          for dc_candidates_set in dc_candidates_sets
+                          if all([candidate_id in candidates_indices for candidate_id in dc_candidates_set])]
+    dc_sets_max_members = [len(dc_candidates_set) - 1 for dc_candidates_set in dc_candidates_sets]
+    for candidates_group, max_members in dc_cardinality_groups:
+        candidates_group = [candidates_indices[candidate_id] for candidate_id in candidates_group
+                            if candidate_id in candidates_indices]
+        if len(candidates_group) > max_members:
+            dc_candidates_sets.append(candidates_group)
+            dc_sets_max_members.append(max_members)
+    candidates_dc_sets = defaultdict(list)
+    for dc_index, dc_candidates_set in enumerate(dc_candidates_sets):
+        for candidate_index in dc_candidates_set:
+            candidates_dc_sets[candidate_index].append(dc_index)
+    return dc_candidates_sets, dc_sets_max_members, candidates_dc_sets
+
+
+def get_unsatisfied_tgds_candidates(committee: set, candidates_indices: dict, tgd_tuples_list: list,
+                                    remaining_seats: int, tgd_cardinality_groups: list = ()):
+    """Find the TGDs that are active (their left hand side is in the committee) but not satisfied yet.
+    :param committee: A set of the committee candidates ids.
+    :param candidates_indices: A dict from the candidate id to its index.
+    :param tgd_tuples_list: A list of TGD tuples (the left hand side candidates set, the right hand side candidates
+    sets), as in the ABC to MIP convertor.
+    :param remaining_seats: The number of remaining seats in the committee.
+    :param tgd_cardinality_groups: A list of tuples of a candidates group and the min number of its members in the
+    committee (a compiled TGD).
+    :return: None if there are more remaining seats than the seats required by the unsatisfied TGDs, otherwise the set
+    of candidates (indices) that complete a right hand side set (with a single missing candidate) of an unsatisfied TGD,
+    or that are members of an unsatisfied cardinality group.
+    """
+    unsatisfied_tgds = [tgd_representatives_sets for element_members, tgd_representatives_sets in tgd_tuples_list
+                        if set(element_members) <= committee and
+                        not any([set(representatives_set) <= committee
+                                 for representatives_set in tgd_representatives_sets])]
+    # The unsatisfied cardinality groups, and the number of missing members in each.
+    unsatisfied_groups = [(candidates_group, min_members - len(committee & set(candidates_group)))
+                          for candidates_group, min_members in tgd_cardinality_groups
+                          if len(committee & set(candidates_group)) < min_members]
+    if len(unsatisfied_tgds) + sum([missing_members for _, missing_members in unsatisfied_groups]) < remaining_seats:
+        return None
+    tgd_candidates = set()
+    for tgd_representatives_sets in unsatisfied_tgds:
+        for representatives_set in tgd_representatives_sets:
+            missing_candidates = set(representatives_set) - committee
+            if len(missing_candidates) == 1 and next(iter(missing_candidates)) in candidates_indices:
+                tgd_candidates.add(candidates_indices[next(iter(missing_candidates))])
+    for candidates_group, _ in unsatisfied_groups:
+        tgd_candidates.update([candidates_indices[candidate_id] for candidate_id in candidates_group
+                               if candidate_id not in committee and candidate_id in candidates_indices])
+    return tgd_candidates
+
+
+if __name__ == '__main__':
+    pass
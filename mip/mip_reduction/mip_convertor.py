@@ -1,9 +1,18 @@
+import multiprocessing
+import queue
 import time
 import ortools.linear_solver.pywraplp as pywraplp
+from ortools.linear_solver import linear_solver_pb2
 
 import config
+import mip.mip_reduction.cp_sat_solver as cp_sat_solver
 
 MODULE_NAME = "MIP Convertor"
+# Extra seconds to wait for the portfolio members results, beyond the solver time limit.
+PORTFOLIO_TIMEOUT_GRACE = 10
+PORTFOLIO_POLLING_INTERVAL = 1
+# The statuses proven by a portfolio member, which end the race.
+PORTFOLIO_PROVEN_STATUSES = (pywraplp.Solver.OPTIMAL, pywraplp.Solver.INFEASIBLE, pywraplp.Solver.UNBOUNDED)
 
 
 class MIPConvertor:
@@ -20,6 +29,8 @@ class MIPConvertor:
         self._solved = False
         self.solver_status = None
         self.solving_time = -1
+        # The portfolio member (solver name and parameters) that solved the problem, when solving with a portfolio.
+        self.portfolio_winner = None
 
     def solve(self) -> None:
         """Solve the MIP problem, and saves the time it took,
@@ -28,12 +39,86 @@ class MIPConvertor:
         """
         # Solve the MIP problem.
         start_time = time.time()
-        self.solver_status = self._model.Solve()
+        if config.SOLVER_PORTFOLIO and isinstance(self._model, pywraplp.Solver):
+            self.solver_status = self._solve_with_portfolio(config.SOLVER_PORTFOLIO_MEMBERS)
+        else:
+            self.solver_status = self._model.Solve()
         end_time = time.time()
         if self.solver_status == pywraplp.Solver.OPTIMAL:
             self._solved = True
         self.solving_time = end_time - start_time
 
+    def _solve_with_portfolio(self, portfolio_members: list) -> int:
+        """Solve the MIP problem by racing a portfolio of solvers in parallel worker processes.
+        The model is exported once, and each worker loads it into its own solver. The first member that proves
+        optimality, infeasibility or unboundedness wins (and the rest are stopped), otherwise the best solution of all
+        the members is used (or an error status, if no member found a solution).
+        The winning solution is loaded back into the model solver.
+
+        :param portfolio_members: A list of tuples of a pywraplp solver name and its solver specific parameters.
+        :return: The solver status.
+        """
+        model_proto = linear_solver_pb2.MPModelProto()
+        self._model.ExportModelToProto(model_proto)
+        serialized_model = model_proto.SerializeToString()
+
+        results_queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_solve_portfolio_member,
+                                           args=(member_index, solver_name, solver_parameters,
+                                                 config.SOLVER_TIME_LIMIT, serialized_model, results_queue),
+                                           daemon=True)
+                   for member_index, (solver_name, solver_parameters) in enumerate(portfolio_members)]
+        for worker in workers:
+            worker.start()
+
+        # Wait for the first proven result (or for all the members results).
+        best_result = None
+        deadline = time.time() + config.SOLVER_TIME_LIMIT / 1000 + PORTFOLIO_TIMEOUT_GRACE
+        number_of_results = 0
+        while number_of_results < len(workers) and time.time() < deadline:
+            try:
+                result = results_queue.get(timeout=PORTFOLIO_POLLING_INTERVAL)
+            except queue.Empty:
+                # A member could fail without any result (e.g. a solver that is not available).
+                if not any([worker.is_alive() for worker in workers]) and results_queue.empty():
+                    break
+                continue
+            number_of_results += 1
+            member_index, status, serialized_response = result
+            config.debug_print(MODULE_NAME, f"Portfolio member {portfolio_members[member_index]} finished with "
+                                            f"status {status}.\n")
+            if status in PORTFOLIO_PROVEN_STATUSES:
+                best_result = result
+                break
+            if status == pywraplp.Solver.FEASIBLE:
+                if best_result is None or best_result[1] != pywraplp.Solver.FEASIBLE or \
+                        self._is_better_objective(serialized_response, best_result[2], model_proto.maximize):
+                    best_result = result
+            elif best_result is None:
+                best_result = result
+
+        # Stop the rest of the members.
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+        if best_result is None:
+            return pywraplp.Solver.NOT_SOLVED
+        member_index, status, serialized_response = best_result
+        self.portfolio_winner = portfolio_members[member_index]
+        config.debug_print(MODULE_NAME, f"The portfolio winner is {self.portfolio_winner}.\n")
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            self._model.LoadSolutionFromProto(linear_solver_pb2.MPSolutionResponse.FromString(serialized_response))
+        return status
+
+    @staticmethod
+    def _is_better_objective(serialized_response: bytes, other_serialized_response: bytes, maximize: bool) -> bool:
+        objective_value = linear_solver_pb2.MPSolutionResponse.FromString(serialized_response).objective_value
+        other_objective_value = \
+            linear_solver_pb2.MPSolutionResponse.FromString(other_serialized_response).objective_value
+        return objective_value > other_objective_value if maximize else objective_value < other_objective_value
+
     def get_model_state(self) -> str:
         """Creates representation for the model current state.
 
@@ -63,13 +148,35 @@ class MIPConvertor:
                     print(f"Var name is {str(var)}, and var value is {str(var.solution_value())}")
 
 
-def create_solver(solver_name: str, solver_time_limit: int) -> pywraplp.Solver:
-    """Create a new pywraplp solver.
+def _solve_portfolio_member(member_index: int, solver_name: str, solver_parameters: str, solver_time_limit: int,
+                            serialized_model: bytes, results_queue: multiprocessing.Queue) -> None:
+    """Solve an exported model with a single portfolio member (runs in a worker process).
+    :param member_index: The portfolio member index.
+    :param solver_name: The pywraplp solver name.
+    :param solver_parameters: The solver specific parameters (as a string).
+    :param solver_time_limit: The solver time limit in milliseconds.
+    :param serialized_model: The serialized model proto.
+    :param results_queue: A queue for the (member index, status, serialized solution response) result.
+    """
+    solver = create_solver(solver_name, solver_time_limit)
+    solver.LoadModelFromProto(linear_solver_pb2.MPModelProto.FromString(serialized_model))
+    if solver_parameters:
+        solver.SetSolverSpecificParametersAsString(solver_parameters)
+    status = solver.Solve()
+    response = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    results_queue.put((member_index, status, response.SerializeToString()))
+
+
+def create_solver(solver_name: str, solver_time_limit: int):
+    """Create a new pywraplp solver (or a native CP-SAT solver).
     :param solver_name: The solver name.
     :param solver_time_limit: The solver time limit in milliseconds.
     :return:
     """
-    if solver_name == "GUROBI":
+    if solver_name == config.NATIVE_CP_SAT_SOLVER_NAME:
+        solver = cp_sat_solver.CPSATSolver()
+    elif solver_name == "GUROBI":
         solver = pywraplp.Solver.CreateSolver("GUROBI_MIXED_INTEGER_PROGRAMMING")
     else:
         solver = pywraplp.Solver.CreateSolver(solver_name)
@@ -0,0 +1,199 @@
+"""A utility module for constructing a MIP model in bulk, using arrays of variables and sparse (row, column,
+coefficient) constraints matrices, instead of a per-expression construction.
+"""
+import numpy as np
+import ortools.linear_solver.pywraplp as pywraplp
+from ortools.linear_solver import linear_solver_pb2
+
+MODULE_NAME = "MIP Model Builder"
+
+
+class MIPModelBuilder:
+    def __init__(self, name_variables: bool = False):
+        """A class for accumulating MIP variables and constraints as arrays, and loading them to a solver at once.
+        The variables and the constraints are referred by dense integer indices (by their order of addition).
+
+        :param name_variables: Whether to name the model variables (naming costs construction time and memory).
+        """
+        self._name_variables = name_variables
+
+        # Variables arrays.
+        self._variables_lower_bounds = []
+        self._variables_upper_bounds = []
+        self._variables_is_integer = []
+        self._variables_objective_coefficients = []
+        self._variables_names = []
+        self.number_of_variables = 0
+
+        # Constraints arrays (the matrix is saved in a sparse coordinate format).
+        self._constraints_rows = []
+        self._constraints_columns = []
+        self._constraints_coefficients = []
+        self._constraints_lower_bounds = []
+        self._constraints_upper_bounds = []
+        self.number_of_constraints = 0
+
+        self._maximize = True
+
+    def add_variables(self, lower_bounds, upper_bounds, is_integer: bool, objective_coefficients=0.0,
+                      names=None) -> np.ndarray:
+        """Add a group of variables to the model.
+
+        :param lower_bounds: An array of the variables lower bounds (its length determines the number of variables).
+        :param upper_bounds: An array (or a scalar) of the variables upper bounds.
+        :param is_integer: Whether the variables are integers.
+        :param objective_coefficients: An array (or a scalar) of the variables objective coefficients.
+        :param names: An optional function from the variable (local) index to its name, used only when naming is on.
+        :return: The (global) indices of the new variables.
+        """
+        lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+        number_of_new_variables = len(lower_bounds)
+        self._variables_lower_bounds.append(lower_bounds)
+        self._variables_upper_bounds.append(np.broadcast_to(
+            np.asarray(upper_bounds, dtype=np.float64), (number_of_new_variables,)))
+        self._variables_is_integer.append(np.full(number_of_new_variables, is_integer))
+        self._variables_objective_coefficients.append(np.broadcast_to(
+            np.asarray(objective_coefficients, dtype=np.float64), (number_of_new_variables,)))
+        if self._name_variables and names is not None:
+            self._variables_names.extend([names(i) for i in range(number_of_new_variables)])
+        else:
+            self._variables_names.extend([""] * number_of_new_variables)
+
+        new_variables_indices = np.arange(self.number_of_variables, self.number_of_variables + number_of_new_variables)
+        self.number_of_variables += number_of_new_variables
+        return new_variables_indices
+
+    def add_constraints(self, rows, columns, coefficients, lower_bounds, upper_bounds) -> np.ndarray:
+        """Add a group of linear constraints lower_bound <= sum(coefficient * variable) <= upper_bound.
+
+        :param rows: An array of the (local) constraint index of each matrix entry, in the range 0..len(lower_bounds).
+        :param columns: An array of the (global) variable index of each matrix entry.
+        :param coefficients: An array (or a scalar) of the coefficient of each matrix entry.
+        :param lower_bounds: An array of the constraints lower bounds (its length determines the number of
+        constraints), use -np.inf for no lower bound.
+        :param upper_bounds: An array (or a scalar) of the constraints upper bounds, use np.inf for no upper bound.
+        :return: The (global) indices of the new constraints.
+        """
+        lower_bounds = np.asarray(lower_bounds, dtype=np.float64)
+        number_of_new_constraints = len(lower_bounds)
+        rows = np.asarray(rows, dtype=np.int64)
+        self._constraints_rows.append(rows + self.number_of_constraints)
+        self._constraints_columns.append(np.asarray(columns, dtype=np.int64))
+        self._constraints_coefficients.append(np.broadcast_to(
+            np.asarray(coefficients, dtype=np.float64), rows.shape))
+        self._constraints_lower_bounds.append(lower_bounds)
+        self._constraints_upper_bounds.append(np.broadcast_to(
+            np.asarray(upper_bounds, dtype=np.float64), (number_of_new_constraints,)))
+
+        new_constraints_indices = np.arange(self.number_of_constraints,
+                                            self.number_of_constraints + number_of_new_constraints)
+        self.number_of_constraints += number_of_new_constraints
+        return new_constraints_indices
+
+    def set_maximization(self, maximize: bool) -> None:
+        self._maximize = maximize
+
+    def to_proto(self, model_proto: linear_solver_pb2.MPModelProto = None) -> linear_solver_pb2.MPModelProto:
+        """Write the model into a model proto.
+
+        :param model_proto: An existing model proto to append the model to (the builder variables indices are shifted
+        accordingly), if None a new model proto is created.
+        :return: The model proto.
+        """
+        if model_proto is None:
+            model_proto = linear_solver_pb2.MPModelProto()
+        variables_offset = len(model_proto.variable)
+        model_proto.variable.extend([
+            linear_solver_pb2.MPVariableProto(lower_bound=lower_bound, upper_bound=upper_bound,
+                                              objective_coefficient=objective_coefficient, is_integer=is_integer,
+                                              name=name)
+            for lower_bound, upper_bound, objective_coefficient, is_integer, name
+            in zip(*self._get_variables_arrays())])
+
+        rows_pointers, columns, coefficients = self._get_constraints_matrix()
+        columns = (columns + variables_offset).tolist()
+        coefficients = coefficients.tolist()
+        rows_pointers = rows_pointers.tolist()
+        lower_bounds, upper_bounds = self._get_constraints_bounds()
+        model_proto.constraint.extend([
+            linear_solver_pb2.MPConstraintProto(lower_bound=lower_bound, upper_bound=upper_bound,
+                                                var_index=columns[rows_pointers[row]:rows_pointers[row + 1]],
+                                                coefficient=coefficients[rows_pointers[row]:rows_pointers[row + 1]])
+            for row, (lower_bound, upper_bound) in enumerate(zip(lower_bounds, upper_bounds))])
+        model_proto.maximize = self._maximize
+        return model_proto
+
+    def _get_variables_arrays(self) -> tuple:
+        # The variables lower bounds, upper bounds, objective coefficients, integrality and names (as lists).
+        if self.number_of_variables == 0:
+            return [], [], [], [], []
+        return (np.concatenate(self._variables_lower_bounds).tolist(),
+                np.concatenate(self._variables_upper_bounds).tolist(),
+                np.concatenate(self._variables_objective_coefficients).tolist(),
+                np.concatenate(self._variables_is_integer).tolist(),
+                self._variables_names)
+
+    def _get_constraints_bounds(self) -> tuple:
+        # The constraints lower bounds and upper bounds (as lists).
+        if self.number_of_constraints == 0:
+            return [], []
+        return (np.concatenate(self._constraints_lower_bounds).tolist(),
+                np.concatenate(self._constraints_upper_bounds).tolist())
+
+    def _get_constraints_matrix(self) -> tuple:
+        # The constraints matrix in a compressed rows format (the entries of row i are in the range
+        # rows_pointers[i]:rows_pointers[i + 1] of the columns and the coefficients), without duplicated entries.
+        if self.number_of_constraints == 0:
+            return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        # Sort the matrix entries by rows (and columns), and merge duplicated entries.
+        rows = np.concatenate(self._constraints_rows)
+        columns = np.concatenate(self._constraints_columns)
+        coefficients = np.concatenate(self._constraints_coefficients)
+        order = np.lexsort((columns, rows))
+        rows, columns, coefficients = rows[order], columns[order], coefficients[order]
+        is_new_entry = np.ones(len(rows), dtype=bool)
+        is_new_entry[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+        entries_starts = np.flatnonzero(is_new_entry)
+        if len(entries_starts) < len(rows):
+            coefficients = np.add.reduceat(coefficients, entries_starts)
+            rows, columns = rows[entries_starts], columns[entries_starts]
+        rows_pointers = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=self.number_of_constraints))))
+        return rows_pointers, columns, coefficients
+
+    def load(self, solver: pywraplp.Solver) -> int:
+        """Load the model into the solver, in addition to the solver existing model.
+        An empty solver loads the model proto at once (with LoadModelFromProto), otherwise the variables and the
+        constraints are added to the solver one by one, so the solver objects obtained before the load stay valid.
+
+        :param solver: The input solver wrapper.
+        :return: The variables offset, i.e. the builder variable with index i is solver.variable(offset + i).
+        """
+        variables_offset = solver.NumVariables()
+        if variables_offset == 0 and solver.NumConstraints() == 0:
+            error_message = solver.LoadModelFromProto(self.to_proto())
+            if error_message:
+                raise ValueError(f"Loading the model to the solver failed: {error_message}")
+            return variables_offset
+
+        objective = solver.Objective()
+        variables = []
+        for lower_bound, upper_bound, objective_coefficient, is_integer, name in zip(*self._get_variables_arrays()):
+            variable = solver.Var(lower_bound, upper_bound, is_integer, name)
+            if objective_coefficient != 0:
+                objective.SetCoefficient(variable, objective_coefficient)
+            variables.append(variable)
+        rows_pointers, columns, coefficients = self._get_constraints_matrix()
+        columns, coefficients, rows_pointers = columns.tolist(), coefficients.tolist(), rows_pointers.tolist()
+        for row, (lower_bound, upper_bound) in enumerate(zip(*self._get_constraints_bounds())):
+            constraint = solver.Constraint(lower_bound, upper_bound)
+            for entry in range(rows_pointers[row], rows_pointers[row + 1]):
+                constraint.SetCoefficient(variables[columns[entry]], coefficients[entry])
+        if self._maximize:
+            objective.SetMaximization()
+        else:
+            objective.SetMinimization()
+        return variables_offset
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,182 @@
+"""A utility module for presolving the contextual constraints - a unit propagation over the extracted DC sets and TGD
+tuples, finding the candidates that must be in the committee (forced in) and the candidates that cannot be in it (forced
+out) before the model is constructed, and reducing the extracted constraints accordingly.
+"""
+import numpy as np
+
+MODULE_NAME = "Presolve"
+
+
+class ConstraintsCollector:
+    def __init__(self):
+        """A collector of the extracted contextual constraints, with the constraints definition functions of the ABC to
+        MIP convertor (hence an extractor define_constraint can define its constraint in it).
+        """
+        self.dc_candidates_sets = []
+        self.tgd_tuples_list = []
+        self.dc_cardinality_groups = []
+        self.tgd_cardinality_groups = []
+
+    def define_dc(self, dc_candidates_sets, activation_key=None):
+        self.dc_candidates_sets.extend(to_rows(dc_candidates_sets))
+
+    def define_tgd(self, tgd_tuples_list: list, activation_key=None):
+        self.tgd_tuples_list.extend(tgd_tuples_list)
+
+    def define_dc_cardinality(self, candidates_groups: list, max_members: int, activation_key=None):
+        self.dc_cardinality_groups.extend([(candidates_group, max_members) for candidates_group in candidates_groups])
+
+    def define_tgd_cardinality(self, candidates_groups: list, min_members: int, activation_key=None):
+        self.tgd_cardinality_groups.extend([(candidates_group, min_members) for candidates_group in candidates_groups])
+
+
+def to_rows(candidates_sets) -> list:
+    """Get the candidates sets as a list (an array of sets is converted to lists of python ints)."""
+    if isinstance(candidates_sets, np.ndarray):
+        return candidates_sets.tolist()
+    return list(candidates_sets)
+
+
+def propagate_constraints(candidates_ids_set: set, dc_candidates_sets: list = (), tgd_tuples_list: list = (),
+                          dc_cardinality_groups: list = (), tgd_cardinality_groups: list = ()):
+    """Propagate the contextual constraints implications (a unit propagation), starting from the TGDs that force
+    candidates into the committee (e.g. a TGD with an empty left hand side and a single representatives set), up to a
+    fixpoint. A DC set (or group) with its max number of forced in members forces its other members out, a TGD with a
+    forced in left hand side forces in the members common to all its possible representatives sets, and a TGD group
+    with exactly min_members possible members forces them in.
+    Note: The committee size is not used, hence the result is valid for any committee size.
+    :param candidates_ids_set: The candidates ids set (the other ids are never in the committee).
+    :param dc_candidates_sets: A list of DC candidates sets (candidates that cannot be all together in the committee).
+    :param tgd_tuples_list: A list of TGD tuples (the left hand side candidates set, the right hand side candidates
+    sets), as in the ABC to MIP convertor.
+    :param dc_cardinality_groups: A list of tuples of a candidates group and the max number of its members in the
+    committee (a compiled DC).
+    :param tgd_cardinality_groups: A list of tuples of a candidates group and the min number of its members in the
+    committee (a compiled TGD).
+    :return: A tuple of the forced in candidates set and the forced out candidates set, or None if the propagation
+    proves that the constraints are infeasible.
+    """
+    # A DC set with a member that is not a candidate is always satisfied, hence the DC sets and the DC groups are both
+    # kept as (candidates set, max members).
+    dc_sets = [(dc_set, len(dc_set) - 1) for dc_set in map(set, to_rows(dc_candidates_sets))
+               if dc_set <= candidates_ids_set]
+    dc_sets += [(set(candidates_group) & candidates_ids_set, max_members)
+                for candidates_group, max_members in dc_cardinality_groups]
+    candidates_dc_sets = dict()
+    for dc_index, (dc_set, _) in enumerate(dc_sets):
+        for candidate_id in dc_set:
+            candidates_dc_sets.setdefault(candidate_id, []).append(dc_index)
+    # A TGD with a left hand side member that is not a candidate is never enforced, and a representatives set with a
+    # member that is not a candidate is never chosen.
+    tgds = [(set(element_members), [representatives_set for representatives_set in
+                                    map(set, to_rows(tgd_representatives_sets))
+                                    if representatives_set <= candidates_ids_set])
+            for element_members, tgd_representatives_sets in tgd_tuples_list
+            if set(element_members) <= candidates_ids_set]
+    tgd_groups = [(set(candidates_group) & candidates_ids_set, min_members)
+                  for candidates_group, min_members in tgd_cardinality_groups]
+
+    forced_in, forced_out = set(), set()
+    new_forced_in = set()
+    while True:
+        # Only the DC sets of the new forced in candidates could force candidates out.
+        for candidate_id in new_forced_in:
+            for dc_index in candidates_dc_sets.get(candidate_id, []):
+                dc_set, max_members = dc_sets[dc_index]
+                forced_in_members = len(dc_set & forced_in)
+                if forced_in_members > max_members:
+                    return None
+                if forced_in_members == max_members:
+                    forced_out.update(dc_set - forced_in)
+
+        new_forced_in = set()
+        for element_members, representatives_sets in tgds:
+            if element_members <= forced_in:
+                possible_representatives_sets = [representatives_set for representatives_set in representatives_sets
+                                                 if not representatives_set & forced_out]
+                if len(possible_representatives_sets) == 0:
+                    return None
+                new_forced_in.update(set.intersection(*possible_representatives_sets))
+        for candidates_group, min_members in tgd_groups:
+            possible_members = candidates_group - forced_out
+            if len(possible_members) < min_members:
+                return None
+            if len(possible_members) == min_members:
+                new_forced_in.update(possible_members)
+
+        new_forced_in -= forced_in
+        if new_forced_in & forced_out:
+            return None
+        if len(new_forced_in) == 0:
+            return forced_in, forced_out
+        forced_in.update(new_forced_in)
+
+
+def _remove_rows_with_members(candidates_sets, members: set):
+    # Remove the candidates sets (rows) with any of the members.
+    if len(members) == 0 or len(candidates_sets) == 0:
+        return candidates_sets
+    if not isinstance(candidates_sets, np.ndarray):
+        return [candidates_set for candidates_set in candidates_sets if not set(candidates_set) & members]
+    return candidates_sets[~np.isin(candidates_sets, list(members)).any(axis=1)]
+
+
+def reduce_dc_candidates_sets(dc_candidates_sets, forced_out: set):
+    """Remove the DC sets that are always satisfied (with a forced out member).
+    :param dc_candidates_sets: An array of the DC candidates sets (rows).
+    :param forced_out: The forced out candidates set.
+    :return: The reduced DC candidates sets array.
+    """
+    return _remove_rows_with_members(dc_candidates_sets, forced_out)
+
+
+def reduce_tgd_tuples_list(tgd_tuples_list: list, forced_in: set, forced_out: set) -> list:
+    """Remove the TGDs that are never enforced (with a forced out left hand side member) or always satisfied (with a
+    forced in left hand side and a forced in representatives set), and the representatives sets that are never chosen
+    (with a forced out member).
+    :param tgd_tuples_list: A list of TGD tuples, as in the ABC to MIP convertor.
+    :param forced_in: The forced in candidates set.
+    :param forced_out: The forced out candidates set.
+    :return: The reduced TGD tuples list.
+    """
+    reduced_tgd_tuples_list = []
+    for element_members, tgd_representatives_sets in tgd_tuples_list:
+        if set(element_members) & forced_out:
+            continue
+        tgd_representatives_sets = _remove_rows_with_members(tgd_representatives_sets, forced_out)
+        if set(element_members) <= forced_in and \
+                any([set(representatives_set) <= forced_in
+                     for representatives_set in to_rows(tgd_representatives_sets)]):
+            continue
+        reduced_tgd_tuples_list.append((element_members, tgd_representatives_sets))
+    return reduced_tgd_tuples_list
+
+
+def reduce_dc_cardinality_groups(candidates_groups: list, max_members: int, forced_out: set) -> list:
+    """Remove the forced out members of the compiled DC groups, and the groups that are always satisfied (with at most
+    max_members members).
+    :param candidates_groups: A list of candidates groups.
+    :param max_members: The max number of members of each group in the committee.
+    :param forced_out: The forced out candidates set.
+    :return: The reduced candidates groups list.
+    """
+    candidates_groups = [[candidate_id for candidate_id in candidates_group if candidate_id not in forced_out]
+                         for candidates_group in candidates_groups]
+    return [candidates_group for candidates_group in candidates_groups if len(candidates_group) > max_members]
+
+
+def reduce_tgd_cardinality_groups(candidates_groups: list, min_members: int, forced_in: set, forced_out: set) -> list:
+    """Remove the forced out members of the compiled TGD groups, and the groups that are always satisfied (with at least
+    min_members forced in members).
+    :param candidates_groups: A list of candidates groups.
+    :param min_members: The min number of members of each group in the committee.
+    :param forced_in: The forced in candidates set.
+    :param forced_out: The forced out candidates set.
+    :return: The reduced candidates groups list.
+    """
+    return [[candidate_id for candidate_id in candidates_group if candidate_id not in forced_out]
+            for candidates_group in candidates_groups if len(set(candidates_group) & forced_in) < min_members]
+
+
+if __name__ == '__main__':
+    pass
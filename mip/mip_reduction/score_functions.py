@@ -67,6 +67,49 @@ def sav_score_rule_function(v_approval_number: int, v_approval_profile_size: int
     return v_approval_number/v_approval_profile_size
 
 
+# Score functions with non-negative and non-increasing marginal gains, i.e. for every i:
+# f(i + 1) - f(i) <= f(i) - f(i - 1) and f(i + 1) - f(i) >= 0.
+# For those functions the voter contribution can be modeled by ordered slots with decreasing weights.
+CONCAVE_SCORE_FUNCTIONS = (av_thiele_function,
+                           cc_thiele_function,
+                           pav_thiele_function,
+                           k_2_truncated_av_thiele_function,
+                           sav_score_rule_function)
+
+
+def is_concave_score_function(score_function) -> bool:
+    """Test whether a score function is known to be concave (in the voter approval number).
+    :param score_function: An ABC score function.
+    :return: True if the score function is known to be concave, false otherwise.
+    """
+    return score_function in CONCAVE_SCORE_FUNCTIONS
+
+
+# Score functions that are linear in the voter approval number, i.e. f(i) = i * f(1) (and f(0) = 0).
+# For those functions the committee score is a weighted sum of the committee members.
+LINEAR_SCORE_FUNCTIONS = (av_thiele_function,
+                          sav_score_rule_function)
+
+
+def is_linear_score_function(score_function) -> bool:
+    """Test whether a score function is known to be linear (in the voter approval number).
+    :param score_function: An ABC score function.
+    :return: True if the score function is known to be linear, false otherwise.
+    """
+    return score_function in LINEAR_SCORE_FUNCTIONS
+
+
+def marginal_gains(score_function, max_approval_number: int, v_approval_profile_size: int) -> list:
+    """Calculate the marginal gains of a score function, i.e. f(i) - f(i - 1) for i in 1..max_approval_number.
+    :param score_function: An ABC score function.
+    :param max_approval_number: The max size of the intersection between the committee and voter 'v' approval profile.
+    :param v_approval_profile_size: Voter 'v' approval profile size.
+    :return: A list of the marginal gains, where the i-th place is the gain of the (i+1)-th approved committee member.
+    """
+    return [score_function(i, v_approval_profile_size) - score_function(i - 1, v_approval_profile_size)
+            for i in range(1, max_approval_number + 1)]
+
+
 if __name__ == '__main__':
     # Sanity tests.
     assert av_thiele_function(4, 10) == 4
@@ -78,3 +121,8 @@ if __name__ == '__main__':
     assert k_2_truncated_av_thiele_function(1, 10) == 1
     assert k_2_truncated_av_thiele_function(0, 10) == 0
     assert sav_score_rule_function(2, 4) == 0.5
+    assert is_concave_score_function(pav_thiele_function)
+    assert is_linear_score_function(sav_score_rule_function)
+    assert not is_linear_score_function(pav_thiele_function)
+    assert marginal_gains(cc_thiele_function, 3, 10) == [1, 0, 0]
+    assert marginal_gains(pav_thiele_function, 2, 10) == [1, 0.5]
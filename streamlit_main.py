@@ -14,8 +14,8 @@ def main():
 
     # User input ABC with Context problem settings.
     selected_db, selected_rule, committee_size, tgds, dcs = abc_settings_input.abc_settings_input()
-    voters_starting_point, voters_group_size, candidates_starting_point, candidates_group_size, solver_timeout = \
-        abc_settings_input.advanced_abc_settings_input(selected_db)
+    voters_starting_point, voters_group_size, candidates_starting_point, candidates_group_size, solver_timeout, \
+        approximate_mode = abc_settings_input.advanced_abc_settings_input(selected_db)
 
     if config.FRONTED_DEBUG:
         # Display selected options (debug purposes).
@@ -36,6 +36,11 @@ def main():
         config.SCORE_FUNCTION = config.SCORE_RULES[selected_rule]
         # Converting to milliseconds.
         config.SOLVER_TIME_LIMIT = solver_timeout * 1000 * 60
+        # Set the approximate engine (or the default solver) according to the selected mode.
+        if approximate_mode:
+            config.SOLVER_NAME = config.APPROXIMATE_SOLVER_NAME
+        elif config.SOLVER_NAME == config.APPROXIMATE_SOLVER_NAME:
+            config.SOLVER_NAME = config.SOLVER_NAMES[0]
         current_experiment = combined_constraints_experiment.CombinedConstraintsExperiment(experiment_name, selected_db,
                                                                                            dcs, tgds,
                                                                                            committee_size,
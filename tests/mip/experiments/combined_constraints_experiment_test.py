@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 
 import config
 import mip.mip_reduction.score_functions as score_functions
@@ -154,6 +155,26 @@ class TestCombinedExperiment(unittest.TestCase):
         print(f"The resulted experiment df:\n{resulted_df}\n")
         # A valid committee: (1 or 3), (2 or 7), (5), (8).
 
+    def test_extract_data_from_db_native_cp_sat_one_dc_and_one_tgd(self):
+        config.SOLVER_NAME = config.NATIVE_CP_SAT_SOLVER_NAME
+        experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+            self.experiment_name,
+            self.db_name,
+            self.dcs, self.tgds,
+            self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+            self.voters_group_size, self.candidates_group_size)
+
+        resulted_df = experiment.run_experiment()
+
+        # Test the result.
+        print(f"The resulted experiment df:\n{resulted_df}\n")
+        # A valid committee: (1 or 3), (2 or 7), (5), (8).
+        self.assertEqual(resulted_df['solving_status'][0], config.SOLVER_FOUND_OPTIMAL_STATUS)
+        resulted_committee = {int(candidate_id) for candidate_id in
+                              resulted_df['resulted_committee'][0].split(', ') if candidate_id != ''}
+        self.assertEqual(len(resulted_committee), self.committee_size)
+        self.assertTrue({5, 8} <= resulted_committee)
+
     def test_extract_data_from_db_sanity_one_dc_and_one_tgd_fail_due_to_tgd(self):
         self.committee_size = 3
         experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
@@ -183,3 +204,241 @@ class TestCombinedExperiment(unittest.TestCase):
         # Test the result.
         print(f"The resulted experiment df:\n{resulted_df}\n")
         # A valid committee: None.
+
+    def test_add_voters(self):
+        # Adding voters to an experiment that already ran gives the same result as running with all the voters.
+        resulted_dfs = []
+        for first_voters_group_size in [self.voters_group_size, 2]:
+            experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                self.experiment_name,
+                self.db_name,
+                self.dcs, self.tgds,
+                self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+                first_voters_group_size, self.candidates_group_size)
+            experiment.keep_voters_extensible()
+            resulted_df = experiment.run_experiment()
+            if first_voters_group_size < self.voters_group_size:
+                self.assertTrue(experiment.can_add_voters())
+                experiment.add_voters(self.voters_group_size)
+                resulted_df = experiment.run_experiment()
+            resulted_dfs.append(resulted_df)
+
+        # Test the result.
+        print(f"The resulted experiments dfs:\n{resulted_dfs[0]}\n{resulted_dfs[1]}\n")
+        for column_name in ['voters_group_size (non-empty approval profile)', 'solving_status',
+                            'resulted_committee_score']:
+            self.assertEqual(resulted_dfs[0][column_name][0], resulted_dfs[1][column_name][0])
+        # The contextual constraints are not extracted again.
+        self.assertEqual(resulted_dfs[1]['mip_construction_time_dc(sec)'][0], 0)
+
+    def test_set_committee_size(self):
+        # Resizing the committee of an experiment that already ran gives the same result as running with the new
+        # committee size. With the TGD (a committee member of each of the 4 genres) the smaller committee size is
+        # proven infeasible by the feasibility pre-check, hence there is no model to resize and the experiment is
+        # rebuilt (as in the ticking committee size runner).
+        for tgds in [self.tgds, []]:
+            resulted_dfs = []
+            for first_committee_size in [self.committee_size, self.committee_size - 1]:
+                experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                    self.experiment_name,
+                    self.db_name,
+                    self.dcs, tgds,
+                    first_committee_size, self.voters_starting_point, self.candidates_starting_point,
+                    self.voters_group_size, self.candidates_group_size)
+                experiment.set_max_committee_size(self.committee_size)
+                resulted_df = experiment.run_experiment()
+                if first_committee_size < self.committee_size:
+                    if len(tgds) > 0:
+                        self.assertEqual(resulted_df['solving_status'][0], config.SOLVER_PROVEN_INFEASIBLE_STATUS)
+                        self.assertFalse(experiment.can_set_committee_size(self.committee_size))
+                        resulted_df = self._run_experiment(tgds, self.committee_size)
+                    else:
+                        self.assertTrue(experiment.can_set_committee_size(self.committee_size))
+                        experiment.set_committee_size(self.committee_size)
+                        resulted_df = experiment.run_experiment()
+                        # Nothing is extracted again.
+                        self.assertEqual(resulted_df['extract_data_time(sec)'][0], 0)
+                resulted_dfs.append(resulted_df)
+
+            # Test the result.
+            print(f"The resulted experiments dfs:\n{resulted_dfs[0]}\n{resulted_dfs[1]}\n")
+            for column_name in ['committee_size', 'solving_status', 'resulted_committee_score']:
+                self.assertEqual(resulted_dfs[0][column_name][0], resulted_dfs[1][column_name][0])
+
+    def test_ticking_committee_size_runner(self):
+        # The runner rebuilds the experiment after a committee size which is proven infeasible by the feasibility
+        # pre-check (instead of resizing it).
+        saved_results = []
+        with mock.patch.object(combined_constraints_experiment.experiment, 'experiment_save_excel',
+                               lambda df, experiment_name, results_file_path: saved_results.append(df.copy())):
+            combined_constraints_experiment.combined_constraints_experiment_runner_ticking_committee_size(
+                self.experiment_name, self.db_name, self.dcs, self.tgds,
+                self.voters_starting_point, self.voters_group_size,
+                self.candidates_starting_point, self.candidates_group_size,
+                self.committee_size - 1, 1, self.committee_size + 1)
+        resulted_df = saved_results[-1].reset_index(drop=True)
+
+        # Test the result.
+        print(f"The resulted experiments df:\n{resulted_df}\n")
+        self.assertEqual(resulted_df['solving_status'].tolist(),
+                         [config.SOLVER_PROVEN_INFEASIBLE_STATUS, config.SOLVER_FOUND_OPTIMAL_STATUS])
+        self.assertGreater(resulted_df['extract_data_time(sec)'][1], 0)
+        self.assertEqual(resulted_df['saved_construction_time(sec)'][1], 0)
+        self.assertEqual(resulted_df['resulted_committee_score'][1],
+                         self._run_experiment(self.tgds, self.committee_size)['resulted_committee_score'][0])
+
+    def test_approximate_ticking_committee_size_runner(self):
+        # The approximate engine committees are feasible but not proven optimal, which doesn't stop the sweep (unlike a
+        # timeout).
+        saved_results = []
+        with mock.patch.object(config, 'SOLVER_NAME', config.APPROXIMATE_SOLVER_NAME), \
+                mock.patch.object(config, 'APPROXIMATE_BOUND_GAP', False), \
+                mock.patch.object(combined_constraints_experiment.experiment, 'experiment_save_excel',
+                                  lambda df, experiment_name, results_file_path: saved_results.append(df.copy())):
+            combined_constraints_experiment.combined_constraints_experiment_runner_ticking_committee_size(
+                self.experiment_name, self.db_name, self.dcs, [],
+                self.voters_starting_point, self.voters_group_size,
+                self.candidates_starting_point, self.candidates_group_size,
+                self.committee_size - 2, 1, self.committee_size + 1)
+        resulted_df = saved_results[-1].reset_index(drop=True)
+
+        # Test the result.
+        print(f"The resulted experiments df:\n{resulted_df}\n")
+        self.assertEqual(resulted_df['solving_status'].tolist(), [config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS] * 3)
+        self.assertNotIn('-', resulted_df['resulted_committee'].tolist())
+
+    def _run_experiment(self, tgds: list, committee_size: int):
+        return combined_constraints_experiment.CombinedConstraintsExperiment(
+            self.experiment_name,
+            self.db_name,
+            self.dcs, tgds,
+            committee_size, self.voters_starting_point, self.candidates_starting_point,
+            self.voters_group_size, self.candidates_group_size).run_experiment()
+
+    def test_set_active_constraints(self):
+        # Switching the (guarded) constraints of an experiment gives the same result as running with only the active
+        # constraints.
+        guarded_experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+            self.experiment_name,
+            self.db_name,
+            self.dcs, self.tgds,
+            self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+            self.voters_group_size, self.candidates_group_size)
+        guarded_experiment.guard_constraints()
+        for dcs_indices, tgds_indices in [([0], [0]), ([], []), ([0], []), ([], [0])]:
+            guarded_experiment.set_active_constraints(dcs_indices, tgds_indices)
+            guarded_df = guarded_experiment.run_experiment()
+            experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                self.experiment_name,
+                self.db_name,
+                [self.dcs[i] for i in dcs_indices], [self.tgds[i] for i in tgds_indices],
+                self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+                self.voters_group_size, self.candidates_group_size)
+            resulted_df = experiment.run_experiment()
+
+            # Test the result.
+            print(f"The resulted experiments dfs:\n{guarded_df}\n{resulted_df}\n")
+            for column_name in ['solving_status', 'resulted_committee_score']:
+                self.assertEqual(guarded_df[column_name][0], resulted_df[column_name][0])
+
+    def test_constraints_feasibility_pre_check(self):
+        # A TGD requiring a committee member of each of the 4 genres, and a DC of no two committee members with the same
+        # genre, are infeasible for a committee of size 3 (the TGD is the constraint which makes them infeasible).
+        for committee_size, infeasible_constraint in [(3, "TGD 1"), (11, "committee size"), (4, None)]:
+            experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                self.experiment_name,
+                self.db_name,
+                self.dcs, self.tgds,
+                committee_size, self.voters_starting_point, self.candidates_starting_point,
+                self.voters_group_size, self.candidates_group_size)
+            resulted_df = experiment.run_experiment()
+
+            # Test the result.
+            print(f"The resulted experiment df:\n{resulted_df}\n")
+            self.assertEqual(experiment.infeasible_constraint, infeasible_constraint)
+            self.assertEqual(resulted_df['feasibility_check_result'][0],
+                             'feasible' if infeasible_constraint is None else 'infeasible')
+            if infeasible_constraint is not None:
+                self.assertEqual(resulted_df['solving_status'][0], config.SOLVER_PROVEN_INFEASIBLE_STATUS)
+                self.assertEqual(resulted_df['infeasible_constraint'][0], infeasible_constraint)
+                # The voters are not extracted.
+                self.assertEqual(resulted_df['voters_group_size (non-empty approval profile)'][0], 0)
+
+    def test_inconclusive_feasibility_pre_check(self):
+        # The pre-check solver stops before proving anything (as if it timed out), hence the experiment runs as usual
+        # and proves the infeasibility of a committee of size 3 itself.
+        create_solver = combined_constraints_experiment.mip_convertor.create_solver
+
+        def create_pre_check_solver(solver_name, solver_time_limit):
+            solver = create_solver(solver_name, solver_time_limit)
+            self.assertEqual(solver_time_limit, config.FEASIBILITY_PRE_CHECK_TIME_LIMIT)
+            return mock.Mock(wraps=solver, **{'Solve.return_value': config.SOLVER_MODEL_NOT_SOLVED_ERROR_STATUS})
+
+        experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+            self.experiment_name,
+            self.db_name,
+            self.dcs, self.tgds,
+            3, self.voters_starting_point, self.candidates_starting_point,
+            self.voters_group_size, self.candidates_group_size)
+        with mock.patch.object(combined_constraints_experiment.mip_convertor, 'create_solver',
+                               side_effect=create_pre_check_solver):
+            resulted_df = experiment.run_experiment()
+
+        # Test the result.
+        print(f"The resulted experiment df:\n{resulted_df}\n")
+        self.assertIsNone(experiment.infeasible_constraint)
+        self.assertEqual(resulted_df['feasibility_check_result'][0], 'inconclusive')
+        self.assertEqual(resulted_df['infeasible_constraint'][0], '-')
+        self.assertEqual(resulted_df['solving_status'][0], config.SOLVER_PROVEN_INFEASIBLE_STATUS)
+        # The voters are extracted.
+        self.assertGreater(resulted_df['voters_group_size (non-empty approval profile)'][0], 0)
+
+    def test_presolve(self):
+        # Candidates 5 and 8 are the only candidates of their genres, hence the TGD forces them into the committee (and
+        # their TGD groups are removed), the result is the same as without the presolve.
+        resulted_dfs = []
+        for presolve in [True, False]:
+            config.PRESOLVE = presolve
+            experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                self.experiment_name,
+                self.db_name,
+                self.dcs, self.tgds,
+                self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+                self.voters_group_size, self.candidates_group_size)
+            resulted_dfs.append(experiment.run_experiment())
+            print(f"The resulted experiment df:\n{resulted_dfs[-1]}\n")
+            self.assertEqual(experiment.presolve_fixed_candidates, {5, 8} if presolve else set())
+        config.PRESOLVE = True
+
+        # Test the result.
+        self.assertEqual(resulted_dfs[0]['presolve_fixed_candidates'][0], 2)
+        self.assertEqual(resulted_dfs[0]['presolve_removed_constraints'][0], 2)
+        for resulted_df in resulted_dfs:
+            self.assertEqual(resulted_df['solving_status'][0], config.SOLVER_FOUND_OPTIMAL_STATUS)
+            resulted_committee = {int(candidate_id) for candidate_id in
+                                  resulted_df['resulted_committee'][0].split(', ') if candidate_id != ''}
+            self.assertTrue({5, 8} <= resulted_committee)
+        self.assertEqual(resulted_dfs[0]['resulted_committee_score'][0], resulted_dfs[1]['resulted_committee_score'][0])
+
+    def test_candidates_symmetry_breaking(self):
+        # Candidates 4 and 6 have no approving voters and the same genre, hence they are interchangeable (candidates 5
+        # and 8 are fixed by the presolve), the result is the same as without the symmetry breaking.
+        resulted_dfs = []
+        for candidates_symmetry_breaking in [True, False]:
+            config.CANDIDATES_SYMMETRY_BREAKING = candidates_symmetry_breaking
+            experiment = combined_constraints_experiment.CombinedConstraintsExperiment(
+                self.experiment_name,
+                self.db_name,
+                self.dcs, self.tgds,
+                self.committee_size, self.voters_starting_point, self.candidates_starting_point,
+                self.voters_group_size, self.candidates_group_size)
+            resulted_dfs.append(experiment.run_experiment())
+            print(f"The resulted experiment df:\n{resulted_dfs[-1]}\n")
+            self.assertEqual(experiment.candidates_classes, [[4, 6]] if candidates_symmetry_breaking else [])
+        config.CANDIDATES_SYMMETRY_BREAKING = True
+
+        # Test the result.
+        self.assertEqual(resulted_dfs[0]['symmetric_candidates_classes'][0], 1)
+        self.assertEqual(resulted_dfs[0]['symmetric_candidates'][0], 2)
+        for column_name in ['solving_status', 'resulted_committee_score']:
+            self.assertEqual(resulted_dfs[0][column_name][0], resulted_dfs[1][column_name][0])
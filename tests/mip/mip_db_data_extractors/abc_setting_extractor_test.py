@@ -54,4 +54,20 @@ class TestABCSettingExtractor(unittest.TestCase):
         expected_approval_profile[1] = {3}
         expected_approval_profile[2] = {1, 2}
         expected_approval_profile[3] = {3, 1}
-        self.assertEqual(expected_approval_profile, extractor._approval_profile)
+        self.assertEqual(expected_approval_profile, extractor._approval_profile.to_dict())
+
+    def test_presolve_abc_setting(self):
+        extractor = abc_setting_extractor.ABCSettingExtractor(self.abc_convertor, self.db_engine,
+                                                              self.committee_size,
+                                                              self.voters_starting_point,
+                                                              self.candidates_starting_point,
+                                                              self.voters_group_size, self.candidates_group_size,
+                                                              self._voting_rule_score_function)
+        extractor._extract_data_from_db()
+        # Candidate 3 cannot be in the committee, hence voter 1 (that approves only candidate 3) is removed.
+        extractor.presolve_abc_setting({3})
+
+        # Test the result.
+        self.assertNotIn(3, extractor.get_candidates_ids_set())
+        self.assertEqual(extractor.presolve_removed_voters, 1)
+        self.assertEqual(extractor._approval_profile.to_dict(), {2: {1, 2}, 3: {3, 1}})
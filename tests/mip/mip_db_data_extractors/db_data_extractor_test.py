@@ -1,8 +1,11 @@
 import unittest
 import os
+import sqlite3
+import numpy as np
 import pandas as pd
 
 import config
+import mip.experiments.constraints as constraints
 import mip.mip_db_data_extractors.db_data_extractor as db_data_extractor
 import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
 import ortools.linear_solver.pywraplp as pywraplp
@@ -30,6 +33,9 @@ class TestDBDataExtractor(unittest.TestCase):
 
     def tearDown(self):
         config.remove_db(config.TESTS_DB_NAME)
+        config.JOIN_QUERY_PLANNER = True
+        config.LOG_QUERY_PLAN = False
+        config.RANGE_JOIN_MIN_ROWS = 1000
 
     def test_extract_data_from_db_sanity(self):
         # Define the join tables input.
@@ -56,7 +62,9 @@ class TestDBDataExtractor(unittest.TestCase):
             'y': ['false', 'false', 'false']
         }
         expected_result_legal_assignments = pd.DataFrame(data)
-        self.assertTrue(expected_result_legal_assignments.equals(legal_assignments))
+        # The rows order depends on the join order (of the planned query).
+        self.assertTrue(expected_result_legal_assignments.equals(
+            legal_assignments.sort_values('c', ignore_index=True)))
 
     def test_extract_data_from_db__comparison_atoms_sanity(self):
         # Define the join tables input.
@@ -79,3 +87,180 @@ class TestDBDataExtractor(unittest.TestCase):
 
         print(legal_assignments)
         # Make sure manually that there are no same candidates.
+
+    def test_join_tables_chunks_sanity(self):
+        tables_dict = dict()
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't2')] = [('c2', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        candidate_tables = ['t1', 't2']
+        comparison_atoms = [('c1', '<', 'c2')]
+        extractor = db_data_extractor.DBDataExtractor(
+            self.abc_convertor, self.db_engine,
+            self.candidates_starting_point,
+            self.candidates_group_size)
+
+        # The chunks are (at most) of the chunk size, and together they are the join rows of the selected variables.
+        chunks = list(extractor.join_tables_chunks(candidate_tables, tables_dict, dict(), comparison_atoms,
+                                                   ['c1', 'c2'], chunk_size=2))
+        self.assertTrue(all([chunk.shape[0] <= 2 and chunk.shape[1] == 2 for chunk in chunks]))
+        legal_assignments = extractor.join_tables(candidate_tables, tables_dict, dict(), comparison_atoms)
+        self.assertEqual(sorted(map(tuple, np.concatenate(chunks).tolist())),
+                         sorted(set(map(tuple, legal_assignments[['c1', 'c2']].values.tolist()))))
+
+    def test_interchangeable_committee_members(self):
+        tables_dict = dict()
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't2')] = [('c2', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't3')] = [('c3', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        committee_members_list = ['c1', 'c2', 'c3']
+        candidate_tables = ['t1', 't2', 't3']
+        comparison_atoms = [('c1', '!=', 'c2'), ('c2', '!=', 'c3'), ('c3', '!=', 'c1')]
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_interchangeable_committee_members(
+            tables_dict, committee_members_list, candidate_tables, comparison_atoms, dict()), [['c1', 'c2', 'c3']])
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_ordering_atoms(
+            tables_dict, committee_members_list, candidate_tables, comparison_atoms, dict()),
+            [('c1', '<', 'c2'), ('c2', '<', 'c3')])
+
+        # Candidates c1 and c3 are both different from c2 only (hence they are interchangeable, but could be the same),
+        # and a constant or an order breaks the symmetry.
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_ordering_atoms(
+            tables_dict, committee_members_list, candidate_tables, comparison_atoms[:2], dict()),
+            [('c1', '<=', 'c3')])
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_ordering_atoms(
+            tables_dict, committee_members_list, candidate_tables, comparison_atoms[:1], dict()),
+            [('c1', '<', 'c2')])
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_ordering_atoms(
+            tables_dict, committee_members_list, candidate_tables, [], {'c3': 4}), [('c1', '<=', 'c2')])
+        self.assertEqual(db_data_extractor.DBDataExtractor.get_ordering_atoms(
+            tables_dict, committee_members_list, candidate_tables, [('c1', '<', 'c2'), ('c3', '>', 'c2')], dict()), [])
+
+        # The join has a single ordering of each committee members values.
+        extractor = db_data_extractor.DBDataExtractor(
+            self.abc_convertor, self.db_engine,
+            self.candidates_starting_point,
+            self.candidates_group_size)
+        legal_assignments = extractor.join_tables(candidate_tables, tables_dict, dict(), comparison_atoms)
+        ordered_legal_assignments = extractor.join_tables(candidate_tables, tables_dict, dict(), comparison_atoms,
+                                                          committee_members_list)
+        self.assertEqual(len(legal_assignments), 6 * len(ordered_legal_assignments))
+        self.assertEqual({frozenset(row) for row in legal_assignments[committee_members_list].values.tolist()},
+                         {frozenset(row) for row in ordered_legal_assignments[committee_members_list].values.tolist()})
+
+    def _create_movies_constraints_tables(self):
+        # The movies dataset constraints tables, derived from the test db tables.
+        con = sqlite3.connect(os.path.join('.', config.TESTS_DB_NAME))
+        con.execute(f"CREATE TABLE movie_genre AS SELECT {config.CANDIDATES_COLUMN_NAME}, genres AS genre "
+                    f"FROM {config.CANDIDATES_TABLE_NAME}")
+        con.execute("CREATE TABLE selected_genres AS SELECT DISTINCT genres AS genre FROM popular")
+        con.execute(f"CREATE TABLE movie_original_language AS SELECT {config.CANDIDATES_COLUMN_NAME}, "
+                    f"adult AS original_language FROM {config.CANDIDATES_TABLE_NAME}")
+        con.execute("CREATE TABLE selected_languages AS SELECT DISTINCT adult AS original_language FROM popular")
+        con.execute(f"CREATE INDEX movie_genre_genre_index ON movie_genre (genre, {config.CANDIDATES_COLUMN_NAME})")
+        con.execute("ANALYZE")
+        con.commit()
+        con.close()
+
+    def test_join_query_planner_regression(self):
+        # The planned join query has the same result as the flat join query, over the shipped constraints definitions
+        # (with tables in the test db).
+        self._create_movies_constraints_tables()
+        db_engine = db_interface.Database(os.path.join('.', config.TESTS_DB_NAME))
+        extractor = db_data_extractor.DBDataExtractor(
+            self.abc_convertor, db_engine,
+            self.candidates_starting_point,
+            self.candidates_group_size)
+        self.assertEqual(db_engine.get_table_statistics('movie_genre'), (8, {'genre': 2}))
+        self.assertEqual(db_engine.get_table_statistics(config.CANDIDATES_TABLE_NAME)[1],
+                         {config.CANDIDATES_COLUMN_NAME: 1})
+
+        joins = []
+        for constraint in [constraints.MOVIES_DATASET_DC_NO_THREE_MEMBERS_WITH_SAME_GENRE,
+                           constraints.MOVIES_DATASET_DC_NO_TWO_MEMBERS_WITH_SAME_GENRE]:
+            tables_dict, committee_members_list, candidates_tables, comparison_atoms, constants = constraint
+            joins.append((candidates_tables, tables_dict, constants, comparison_atoms, committee_members_list))
+        for constraint in [
+                constraints.MOVIES_DATASET_TGD_FOR_EACH_IMPORTANT_GENRE_AT_LEAST_ONE_REPRESENTATION,
+                constraints.MOVIES_DATASET_TGD_FOR_EACH_IMPORTANT_ORIGINAL_LANGUAGE_AT_LEAST_ONE_REPRESENTATION]:
+            tables_dict_start, _, candidates_tables_start, constants_start, comparison_atoms_start, \
+                tables_dict_end, committee_members_list_end, candidates_tables_end, constants_end, \
+                comparison_atoms_end = constraint
+            joins.append((candidates_tables_start, tables_dict_start, constants_start, comparison_atoms_start, None))
+            joins.append((candidates_tables_start + candidates_tables_end, {**tables_dict_start, **tables_dict_end},
+                          {**constants_start, **constants_end}, comparison_atoms_start + comparison_atoms_end,
+                          committee_members_list_end))
+        joins.append((['t2'], constraints.MOVIES_DATASET_DC_NO_TWO_MEMBERS_WITH_SAME_GENRE[0], {'x': 'comedy'},
+                      [('c1', '!=', '3')], None))
+
+        config.LOG_QUERY_PLAN = True
+        for candidates_tables, tables_dict, constants, comparison_atoms, selected_variables in joins:
+            config.JOIN_QUERY_PLANNER = False
+            flat_legal_assignments = extractor.join_tables(candidates_tables, tables_dict, constants, comparison_atoms)
+            config.JOIN_QUERY_PLANNER = True
+            legal_assignments = extractor.join_tables(candidates_tables, tables_dict, constants, comparison_atoms)
+            self.assertGreater(len(legal_assignments), 0)
+            self.assertEqual(sorted(map(tuple, legal_assignments.values.tolist())),
+                             sorted(map(tuple, flat_legal_assignments.values.tolist())))
+            if selected_variables is not None:
+                legal_assignments = extractor.join_tables(candidates_tables, tables_dict, constants, comparison_atoms,
+                                                          selected_variables=selected_variables)
+                self.assertEqual(list(legal_assignments.columns), selected_variables)
+                self.assertEqual(sorted(map(tuple, legal_assignments.values.tolist())),
+                                 sorted(set(map(tuple, flat_legal_assignments[selected_variables].values.tolist()))))
+        self.assertEqual(len(extractor.join_query_plans), 2 * len(joins) + 4)
+        db_engine.__del__()
+
+    def test_inequality_range_joins(self):
+        # The inner table of the inequality atom is joined by index range probes, with the same result as the flat
+        # join query.
+        tables_dict = dict()
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't2')] = [('c2', config.CANDIDATES_COLUMN_NAME), ('y', 'genres')]
+        candidate_tables = ['t1', 't2']
+        comparison_atoms = [('c1', '<', 'c2'), ('x', '!=', 'y')]
+        extractor = db_data_extractor.DBDataExtractor(
+            self.abc_convertor, self.db_engine,
+            self.candidates_starting_point,
+            self.candidates_group_size)
+
+        config.JOIN_QUERY_PLANNER = False
+        flat_legal_assignments = extractor.join_tables(candidate_tables, tables_dict, dict(), comparison_atoms)
+        config.JOIN_QUERY_PLANNER = True
+        config.RANGE_JOIN_MIN_ROWS = 0
+        config.LOG_QUERY_PLAN = True
+        legal_assignments = extractor.join_tables(candidate_tables, tables_dict, dict(), comparison_atoms)
+        self.assertGreater(len(legal_assignments), 0)
+        self.assertEqual(sorted(map(tuple, legal_assignments[['c1', 'x', 'c2', 'y']].values.tolist())),
+                         sorted(map(tuple, flat_legal_assignments[['c1', 'x', 'c2', 'y']].values.tolist())))
+        self.assertRegex(extractor.join_query_plans[-1], r'SEARCH \w+ USING (COVERING )?INDEX \w+_range_join_\d+_index')
+
+        # The streamed join has the same DC tuples, and the temporary tables are dropped after the joins.
+        chunks = list(extractor.join_tables_chunks(candidate_tables, tables_dict, dict(), comparison_atoms,
+                                                   ['c1', 'c2'], chunk_size=2))
+        self.assertEqual(sorted(map(tuple, np.concatenate(chunks).tolist())),
+                         sorted(set(map(tuple, flat_legal_assignments[['c1', 'c2']].values.tolist()))))
+        self.assertEqual(self.db_engine.run_query("SELECT name FROM sqlite_temp_master WHERE type='table'").shape[0],
+                         0)
+
+    def test_run_query_columns_sanity(self):
+        sql_query = f"SELECT DISTINCT {config.CANDIDATES_COLUMN_NAME}, genres FROM {config.CANDIDATES_TABLE_NAME} " \
+                    f"WHERE {config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ? AND adult=? " \
+                    f"ORDER BY {config.CANDIDATES_COLUMN_NAME};"
+        result = self.db_engine.run_query_columns(sql_query, (0, 10, 'false'))
+        legal_assignments = self.db_engine.run_query(sql_query, (0, 10, 'false'))
+
+        # Test the result, the integer column is downcast and the text column is kept.
+        self.assertEqual(result[config.CANDIDATES_COLUMN_NAME].dtype, np.int8)
+        self.assertEqual(result[config.CANDIDATES_COLUMN_NAME].tolist(),
+                         legal_assignments[config.CANDIDATES_COLUMN_NAME].tolist())
+        self.assertEqual(result['genres'].tolist(), legal_assignments['genres'].tolist())
+
+    def test_read_only_database_sanity(self):
+        db_engine = db_interface.Database(config.TESTS_DB_PATH, read_only=True)
+        sql_query = f"SELECT COUNT(*) AS candidates_number FROM {config.CANDIDATES_TABLE_NAME};"
+        self.assertEqual(db_engine.run_query_columns(sql_query)['candidates_number'].tolist(),
+                         self.db_engine.run_query_columns(sql_query)['candidates_number'].tolist())
+
+        # The shared db file cannot be changed.
+        with self.assertRaises(sqlite3.OperationalError):
+            db_engine.run_query(f"DELETE FROM {config.CANDIDATES_TABLE_NAME};")
+        db_engine.__del__()
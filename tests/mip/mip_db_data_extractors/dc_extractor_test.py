@@ -1,6 +1,8 @@
 import unittest
+from itertools import combinations
 import numpy as np
 import os
+import sqlite3
 
 import config
 import mip.mip_db_data_extractors.dc_extractor as dc_extractor
@@ -31,8 +33,13 @@ class TestDCExtractor(unittest.TestCase):
 
     def tearDown(self):
         config.remove_db(config.TESTS_DB_NAME)
+        config.COMPILE_CARDINALITY_CONSTRAINTS = True
+        config.DC_STREAMING_EXTRACTION = True
+        config.ORDER_INTERCHANGEABLE_COMMITTEE_MEMBERS = True
 
     def test_extract_data_from_db_sanity(self):
+        # Extract the DC sets (without compiling the DC).
+        config.COMPILE_CARDINALITY_CONSTRAINTS = False
         # Define the DC.
         dc_dict = dict()
         dc_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = \
@@ -65,3 +72,78 @@ class TestDCExtractor(unittest.TestCase):
              ]
         print(f"The expected output is: {expected_dc_sets}\nThe actual output is: {extractor._dc_candidates_sets}")
         self.assertEqual(np.array_equal(expected_dc_sets, extractor._dc_candidates_sets), True)
+
+    def _get_genres_dc_extractor(self, committee_members_number: int, comparison_sign: str = '<',
+                                 table_name: str = config.CANDIDATES_TABLE_NAME):
+        # A DC of 'no committee_members_number committee members with the same genre'.
+        dc_dict = dict()
+        for i in range(1, committee_members_number + 1):
+            dc_dict[(table_name, f't{i}')] = \
+                [(f'c{i}', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        comparison_atoms = [(f'c{i}', comparison_sign, f'c{i + 1}') for i in range(1, committee_members_number)]
+        committee_members_list = [f'c{i}' for i in range(1, committee_members_number + 1)]
+        candidates_tables = [f't{i}' for i in range(1, committee_members_number + 1)]
+        return dc_extractor.DCExtractor(
+            self.abc_convertor, self.db_engine,
+            dc_dict, comparison_atoms, dict(),
+            committee_members_list, candidates_tables,
+            self.candidates_starting_point, self.candidates_group_size)
+
+    def test_extract_compiled_data_from_db(self):
+        extractor = self._get_genres_dc_extractor(2)
+        extractor._extract_data_from_db()
+
+        # The DC is compiled into the genres groups (with at least two candidates).
+        self.assertIsNone(extractor._dc_candidates_sets)
+        self.assertEqual(sorted([sorted(candidates_group) for candidates_group in extractor._dc_cardinality_groups]),
+                         [[1, 3, 4, 6], [2, 7]])
+
+        extractor = self._get_genres_dc_extractor(3)
+        extractor._extract_data_from_db()
+        self.assertEqual([sorted(candidates_group) for candidates_group in extractor._dc_cardinality_groups],
+                         [[1, 3, 4, 6]])
+
+    def test_extract_compiled_data_from_db_with_null_attribute(self):
+        # Candidates 5 and 8 have no genre, they never join (NULL = NULL is not true), hence they are not a DC group.
+        con = sqlite3.connect(os.path.join('.', config.TESTS_DB_NAME))
+        con.execute(f"CREATE TABLE movie_genre AS SELECT {config.CANDIDATES_COLUMN_NAME}, CASE WHEN "
+                    f"{config.CANDIDATES_COLUMN_NAME} IN (5, 8) THEN NULL ELSE genres END AS genres "
+                    f"FROM {config.CANDIDATES_TABLE_NAME}")
+        con.commit()
+        con.close()
+        self.db_engine = db_interface.Database(os.path.join('.', config.TESTS_DB_NAME))
+
+        extractor = self._get_genres_dc_extractor(2, table_name='movie_genre')
+        extractor._extract_data_from_db()
+        compiled_groups = sorted([sorted(candidates_group) for candidates_group in extractor._dc_cardinality_groups])
+        self.assertEqual(compiled_groups, [[1, 3, 4, 6], [2, 7]])
+
+        # The compiled groups pairs are exactly the not compiled DC sets.
+        config.COMPILE_CARDINALITY_CONSTRAINTS = False
+        extractor._extract_data_from_db()
+        self.assertEqual(sorted(map(tuple, extractor._dc_candidates_sets.tolist())),
+                         sorted([pair for candidates_group in compiled_groups
+                                 for pair in combinations(candidates_group, 2)]))
+        self.db_engine.__del__()
+
+    def test_extract_not_compiled_data_from_db(self):
+        # The comparison atoms do not order the committee members, hence the DC is not compiled.
+        extractor = self._get_genres_dc_extractor(2, '!=')
+        extractor._extract_data_from_db()
+        self.assertIsNone(extractor._dc_cardinality_groups)
+        # The streamed DC tuples are canonicalized, hence each pair is kept once (instead of in both orders).
+        self.assertEqual(len(extractor._dc_candidates_sets), 7)
+
+        # The interchangeable committee members are ordered in the join, hence each pair is extracted once.
+        config.DC_STREAMING_EXTRACTION = False
+        extractor._extract_data_from_db()
+        self.assertEqual(len(extractor._dc_candidates_sets), 7)
+        self.assertTrue((extractor._dc_candidates_sets[:, 0] < extractor._dc_candidates_sets[:, 1]).all())
+
+        config.ORDER_INTERCHANGEABLE_COMMITTEE_MEMBERS = False
+        extractor._extract_data_from_db()
+        self.assertEqual(len(extractor._dc_candidates_sets), 14)
+
+
+if __name__ == '__main__':
+    unittest.main()
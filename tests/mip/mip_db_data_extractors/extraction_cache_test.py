@@ -0,0 +1,137 @@
+import unittest
+import shutil
+import tempfile
+import numpy as np
+
+import config
+import mip.mip_db_data_extractors.extraction_cache as extraction_cache
+import mip.mip_db_data_extractors.abc_setting_extractor as abc_setting_extractor
+import mip.mip_db_data_extractors.dc_extractor as dc_extractor
+import mip.mip_db_data_extractors.tgd_extractor as tgd_extractor
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.score_functions as score_functions
+import ortools.linear_solver.pywraplp as pywraplp
+import database.database_server_interface as db_interface
+
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting.
+        self.candidates_starting_point = 0
+        self.voters_starting_point = 0
+        self.candidates_group_size = 10
+        self.voters_group_size = 8
+        self.committee_size = 3
+        # ----------------------------------------------------------------
+        # Define the MIP convertor.
+        solver_name = "CP_SAT"
+        self.solver = pywraplp.Solver.CreateSolver(solver_name)
+        self.assertIsNotNone(self.solver, f"Couldn't create {solver_name} solver.")
+        self.abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(self.solver)
+        # ----------------------------------------------------------------
+        # Use an empty extraction cache folder, and the (not copied) tests db.
+        config.EXTRACTION_CACHE = True
+        self._extraction_cache_folder_path = config.EXTRACTION_CACHE_FOLDER_PATH
+        config.EXTRACTION_CACHE_FOLDER_PATH = tempfile.mkdtemp()
+        self.db_engine = db_interface.Database(config.TESTS_DB_PATH, read_only=True)
+
+    def tearDown(self):
+        shutil.rmtree(config.EXTRACTION_CACHE_FOLDER_PATH, ignore_errors=True)
+        config.EXTRACTION_CACHE_FOLDER_PATH = self._extraction_cache_folder_path
+        config.EXTRACTION_CACHE_SIZE_LIMIT = 2 * 1024 ** 3
+        config.EXTRACTION_CACHE = False
+        config.COMPILE_CARDINALITY_CONSTRAINTS = True
+
+    def _get_genres_dc_extractor(self):
+        # A DC of 'no two committee members with the same genre'.
+        dc_dict = dict()
+        dc_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        dc_dict[(config.CANDIDATES_TABLE_NAME, 't2')] = [('c2', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        return dc_extractor.DCExtractor(self.abc_convertor, self.db_engine, dc_dict, [('c1', '<', 'c2')], dict(),
+                                        ['c1', 'c2'], ['t1', 't2'], self.candidates_starting_point,
+                                        self.candidates_group_size)
+
+    def _get_genres_tgd_extractor(self):
+        # A TGD of 'for each genre there are at least two committee members with this genre'.
+        tgd_dict_start = dict()
+        tgd_dict_start[config.CANDIDATES_TABLE_NAME, 't0'] = [('x', 'genres')]
+        tgd_dict_end = dict()
+        tgd_dict_end[config.CANDIDATES_TABLE_NAME, 't1'] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tgd_dict_end[config.CANDIDATES_TABLE_NAME, 't2'] = [('c2', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        return tgd_extractor.TGDExtractor(self.abc_convertor, self.db_engine,
+                                          tgd_dict_start, [], ['t0'], dict(), [],
+                                          tgd_dict_end, ['c1', 'c2'], ['t1', 't2'], dict(), [('c1', '<', 'c2')],
+                                          self.candidates_starting_point, self.candidates_group_size)
+
+    def test_abc_setting_cache_hit(self):
+        extractors = [abc_setting_extractor.ABCSettingExtractor(
+            self.abc_convertor, self.db_engine, self.committee_size, self.voters_starting_point,
+            self.candidates_starting_point, self.voters_group_size, self.candidates_group_size,
+            score_functions.av_thiele_function) for _ in range(2)]
+        for extractor in extractors:
+            extractor.extract_data_from_db()
+
+        # Test the result.
+        self.assertEqual([extractor.extraction_cache_hit for extractor in extractors], [False, True])
+        self.assertEqual(extractors[0]._approval_profile.to_dict(), extractors[1]._approval_profile.to_dict())
+        self.assertEqual(extractors[0]._candidates_ids_set, extractors[1]._candidates_ids_set)
+        self.assertEqual(extractors[0]._voters_ending_point, extractors[1]._voters_ending_point)
+
+        # The same extractor has the same cache key (of the requested ids ranges) when it is extracted again.
+        extractors[0].extract_data_from_db()
+        self.assertTrue(extractors[0].extraction_cache_hit)
+
+    def test_dc_cache_hit(self):
+        for compile_cardinality_constraints in [False, True]:
+            config.COMPILE_CARDINALITY_CONSTRAINTS = compile_cardinality_constraints
+            extractors = [self._get_genres_dc_extractor() for _ in range(2)]
+            for extractor in extractors:
+                extractor.extract_data_from_db()
+
+            # Test the result.
+            self.assertEqual([extractor.extraction_cache_hit for extractor in extractors], [False, True])
+            if compile_cardinality_constraints:
+                self.assertEqual(extractors[0]._dc_cardinality_groups, extractors[1]._dc_cardinality_groups)
+            else:
+                self.assertTrue(np.array_equal(extractors[0]._dc_candidates_sets, extractors[1]._dc_candidates_sets))
+
+    def test_tgd_cache_hit(self):
+        config.COMPILE_CARDINALITY_CONSTRAINTS = False
+        extractors = [self._get_genres_tgd_extractor() for _ in range(2)]
+        for extractor in extractors:
+            extractor.extract_data_from_db()
+
+        # Test the result.
+        self.assertEqual([extractor.extraction_cache_hit for extractor in extractors], [False, True])
+        tgd_tuples_lists = [[(sorted(element_members), sorted([sorted(representatives_set)
+                                                               for representatives_set in tgd_representatives_sets]))
+                             for element_members, tgd_representatives_sets in extractor._tgd_tuples_list]
+                            for extractor in extractors]
+        self.assertEqual(tgd_tuples_lists[0], tgd_tuples_lists[1])
+
+    def test_cache_key(self):
+        # A change of the constraint, or the candidates range, changes the key.
+        extractor = self._get_genres_dc_extractor()
+        cache_key = extraction_cache.get_cache_key(config.TESTS_DB_PATH, extractor._get_cache_definition(),
+                                                   extractor._get_cache_ranges())
+        extractor._comparison_atoms = [('c1', '!=', 'c2')]
+        self.assertNotEqual(cache_key, extraction_cache.get_cache_key(
+            config.TESTS_DB_PATH, extractor._get_cache_definition(), extractor._get_cache_ranges()))
+        extractor._comparison_atoms = [('c1', '<', 'c2')]
+        extractor._candidates_ending_point -= 1
+        self.assertNotEqual(cache_key, extraction_cache.get_cache_key(
+            config.TESTS_DB_PATH, extractor._get_cache_definition(), extractor._get_cache_ranges()))
+
+    def test_cache_eviction(self):
+        # The cache can hold only one entry, the least recently used one is evicted.
+        config.EXTRACTION_CACHE_SIZE_LIMIT = 300
+        extraction_cache.save('first', {'array': np.arange(10)})
+        self.assertIsNotNone(extraction_cache.load('first'))
+        extraction_cache.save('second', {'array': np.arange(10)})
+        self.assertIsNone(extraction_cache.load('first'))
+        self.assertTrue(np.array_equal(extraction_cache.load('second')['array'], np.arange(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
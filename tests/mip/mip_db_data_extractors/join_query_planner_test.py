@@ -0,0 +1,47 @@
+import unittest
+
+import config
+import mip.mip_db_data_extractors.join_query_planner as join_query_planner
+
+
+class TestJoinQueryPlanner(unittest.TestCase):
+    def test_estimate_table_cardinality(self):
+        table_statistics = (1000, {'genre': 100, config.CANDIDATES_COLUMN_NAME: 2})
+        self.assertEqual(join_query_planner.estimate_table_cardinality(table_statistics, [], 0), 1000)
+        self.assertEqual(join_query_planner.estimate_table_cardinality(table_statistics, ['genre'], 0), 100)
+        self.assertAlmostEqual(join_query_planner.estimate_table_cardinality(table_statistics, ['language'], 1),
+                               1000 * join_query_planner.DEFAULT_EQUALITY_SELECTIVITY *
+                               join_query_planner.DEFAULT_COMPARISON_SELECTIVITY)
+        # 50 of the 500 candidates are in the candidates ids range.
+        self.assertEqual(join_query_planner.estimate_table_cardinality(table_statistics, [], 0, 50), 100)
+
+    def test_order_tables(self):
+        # The smallest table first, then the smallest connected table (the unconnected t4 is cross joined last).
+        tables_cardinalities = {'t1': 100, 't2': 10, 't3': 50, 't4': 1}
+        tables_variables = {'t1': {'c1', 'x'}, 't2': {'c2', 'y'}, 't3': {'x', 'y'}, 't4': {'z'}}
+        self.assertEqual(join_query_planner.order_tables(tables_cardinalities, tables_variables),
+                         ['t4', 't2', 't3', 't1'])
+
+    def test_plan_join_query(self):
+        tables_dict = dict()
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't1')] = [('c1', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        tables_dict[(config.CANDIDATES_TABLE_NAME, 't2')] = [('c2', config.CANDIDATES_COLUMN_NAME), ('x', 'genres'),
+                                                             ('y', 'adult')]
+        tables_statistics = {config.CANDIDATES_TABLE_NAME: (10, {config.CANDIDATES_COLUMN_NAME: 1})}
+        query, parameters, range_join_tables = join_query_planner.plan_join_query(
+            tables_dict, ['t1', 't2'], {'y': 'false'}, [('c1', '<', 'c2'), ('c2', '!=', '3')], (1, 5, 5),
+            tables_statistics, ['c1', 'c2'])
+
+        # The constant, the candidates range and the single table atom are in the (first joined) t2 subquery, and only
+        # the committee members and the join variable are projected.
+        self.assertTrue(query.startswith('SELECT DISTINCT t1.c1 AS c1, t2.c2 AS c2\n'))
+        self.assertIn(f"(SELECT {config.CANDIDATES_COLUMN_NAME} AS c2, genres AS x FROM {config.CANDIDATES_TABLE_NAME} "
+                      f"WHERE {config.CANDIDATES_COLUMN_NAME} BETWEEN ? AND ? AND adult=? AND "
+                      f"{config.CANDIDATES_COLUMN_NAME}!=3) AS t2\nCROSS JOIN", query)
+        self.assertIn('WHERE t2.x = t1.x AND t1.c1<t2.c2', query)
+        self.assertEqual(parameters, [1, 5, 'false', 1, 5])
+        self.assertEqual(range_join_tables, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
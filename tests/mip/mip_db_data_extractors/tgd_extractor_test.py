@@ -1,4 +1,6 @@
 import unittest
+import os
+import sqlite3
 
 import config
 import mip.mip_db_data_extractors.tgd_extractor as tgd_extractor
@@ -26,7 +28,94 @@ class TestTGDExtractor(unittest.TestCase):
         # Create the database engine.
         self.db_engine = db_interface.Database(config.TESTS_DB_PATH)
 
+    def tearDown(self):
+        config.COMPILE_CARDINALITY_CONSTRAINTS = True
+        config.BATCH_TGD_EXTRACTION = True
+
+    def _get_genres_tgd_extractor(self, committee_members_number: int, table_name: str = config.CANDIDATES_TABLE_NAME):
+        # A TGD of 'for each genre there are at least committee_members_number committee members with this genre'.
+        tgd_dict_start = dict()
+        tgd_dict_start[table_name, 't0'] = [('x', 'genres')]
+        tgd_dict_end = dict()
+        for i in range(1, committee_members_number + 1):
+            tgd_dict_end[table_name, f't{i}'] = \
+                [(f'c{i}', config.CANDIDATES_COLUMN_NAME), ('x', 'genres')]
+        return tgd_extractor.TGDExtractor(
+            self.abc_convertor, self.db_engine,
+            tgd_dict_start, [], ['t0'], dict(), [],
+            tgd_dict_end,
+            [f'c{i}' for i in range(1, committee_members_number + 1)],
+            [f't{i}' for i in range(1, committee_members_number + 1)],
+            dict(),
+            [(f'c{i}', '<', f'c{i + 1}') for i in range(1, committee_members_number)],
+            self.candidates_starting_point,
+            self.candidates_group_size)
+
+    def test_extract_compiled_data_from_db(self):
+        extractor = self._get_genres_tgd_extractor(1)
+        extractor._extract_data_from_db()
+
+        # The TGD is compiled into the genres groups.
+        self.assertEqual(extractor._tgd_tuples_list, [])
+        self.assertEqual(sorted([sorted(candidates_group) for candidates_group in extractor._tgd_cardinality_groups]),
+                         [[1, 3, 4, 6], [2, 7], [5], [8]])
+
+        # The groups with less than two candidates are kept (the TGD can not be satisfied for them).
+        extractor = self._get_genres_tgd_extractor(2)
+        extractor._extract_data_from_db()
+        self.assertEqual(len(extractor._tgd_cardinality_groups), 4)
+
+    def test_extract_compiled_data_from_db_with_null_attribute(self):
+        # Candidates 5 and 8 have no genre, hence the TGD can not be satisfied for the (NULL) genre of the left hand
+        # side, with or without compiling it.
+        config.copy_db(config.TESTS_DB_NAME)
+        con = sqlite3.connect(os.path.join('.', config.TESTS_DB_NAME))
+        con.execute(f"CREATE TABLE movie_genre AS SELECT {config.CANDIDATES_COLUMN_NAME}, CASE WHEN "
+                    f"{config.CANDIDATES_COLUMN_NAME} IN (5, 8) THEN NULL ELSE genres END AS genres "
+                    f"FROM {config.CANDIDATES_TABLE_NAME}")
+        con.commit()
+        con.close()
+        self.db_engine = db_interface.Database(os.path.join('.', config.TESTS_DB_NAME))
+        try:
+            extractor = self._get_genres_tgd_extractor(1, 'movie_genre')
+            extractor._extract_data_from_db()
+            compiled_groups = sorted([sorted(candidates_group)
+                                      for candidates_group in extractor._tgd_cardinality_groups])
+            self.assertEqual(compiled_groups, [[], [1, 3, 4, 6], [2, 7]])
+
+            config.COMPILE_CARDINALITY_CONSTRAINTS = False
+            extractor = self._get_genres_tgd_extractor(1, 'movie_genre')
+            extractor._extract_data_from_db()
+            self.assertEqual(sorted([sorted([representative for representatives_set in tgd_representatives_sets
+                                             for representative in representatives_set])
+                                     for _, tgd_representatives_sets in extractor._tgd_tuples_list]),
+                             compiled_groups)
+        finally:
+            self.db_engine.__del__()
+            config.remove_db(config.TESTS_DB_NAME)
+
+    def test_extract_data_from_db_in_batch(self):
+        # Extract the TGD tuples (without compiling the TGD), with a query per left hand side assignment and in batch.
+        config.COMPILE_CARDINALITY_CONSTRAINTS = False
+        for committee_members_number in [1, 2]:
+            tgd_tuples_lists = []
+            for batch_tgd_extraction in [False, True]:
+                config.BATCH_TGD_EXTRACTION = batch_tgd_extraction
+                extractor = self._get_genres_tgd_extractor(committee_members_number)
+                extractor._extract_data_from_db()
+                tgd_tuples_lists.append([(sorted(element_members),
+                                          sorted([sorted(representatives_set)
+                                                  for representatives_set in tgd_representatives_sets]))
+                                         for element_members, tgd_representatives_sets in extractor._tgd_tuples_list])
+
+            # Test the result.
+            self.assertEqual(tgd_tuples_lists[0], tgd_tuples_lists[1])
+        self.assertEqual(tgd_tuples_lists[1], [([], [[1, 3], [1, 4], [1, 6], [3, 4], [3, 6], [4, 6]]),
+                                               ([], [[2, 7]]), ([], []), ([], [])])
+
     def test_extract_data_from_db_sanity(self):
+        # Extract the TGD tuples (without compiling the TGD).
+        config.COMPILE_CARDINALITY_CONSTRAINTS = False
         # Define the TGD.
         tgd_dict_start = dict()
         tgd_dict_start[config.CANDIDATES_TABLE_NAME, 't1'] = [('x', 'genres')]
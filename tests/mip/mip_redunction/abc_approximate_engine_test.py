@@ -0,0 +1,147 @@
+import random
+from unittest import mock
+
+import numpy as np
+
+import config
+import mip.mip_reduction.abc_approximate_engine as abc_approximate_engine
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.greedy_warm_start as greedy_warm_start
+import mip.mip_reduction.mip_convertor as mip_convertor
+import mip.mip_reduction.score_functions as score_functions
+
+import unittest
+
+
+class TestABCApproximateEngine(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting.
+        self.candidates_ids_set = {0, 1, 2, 3, 4}
+        self.approval_profile_dict = {0: {1, 2}, 1: {2, 4}, 2: {3, 1}, 3: {4}, 4: {1, 2}, 5: {1}, 6: {1, 2},
+                                      7: {1}}
+        self.committee_size = 3
+
+    def _solve(self, score_function, dc_candidates_sets=(), tgd_tuples_list=(),
+               approval_profile_dict=None, candidates_ids_set=None, committee_size=None):
+        engine = abc_approximate_engine.ABCApproximateEngine()
+        engine.define_abc_setting(candidates_ids_set if candidates_ids_set is not None else self.candidates_ids_set,
+                                  dict(approval_profile_dict if approval_profile_dict is not None
+                                       else self.approval_profile_dict),
+                                  committee_size if committee_size is not None else self.committee_size,
+                                  score_function)
+        if len(dc_candidates_sets) > 0:
+            engine.define_dc(dc_candidates_sets)
+        if len(tgd_tuples_list) > 0:
+            engine.define_tgd(tgd_tuples_list)
+        engine.solve()
+        return engine
+
+    def test_approximate_engine_sanity(self):
+        engine = self._solve(score_functions.av_thiele_function)
+        # The AV top candidates are 1, 2 and 4, and the bound gap proves optimality.
+        self.assertEqual(set(engine.get_committee()), {1, 2, 4})
+        self.assertEqual(engine.get_committee_score(engine.get_committee()), 12)
+        self.assertEqual(engine.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+        self.assertEqual(engine.bound_gap, 0)
+
+    def test_approximate_engine_constraints(self):
+        # Candidates 1 and 2 cannot be together, and candidate 0 must be in the committee.
+        dc_candidates_sets = [{1, 2}]
+        tgd_tuples_list = [(set(), [{0}])]
+        engine = self._solve(score_functions.pav_thiele_function, dc_candidates_sets, tgd_tuples_list)
+        committee = engine.get_committee()
+        self.assertEqual(set(committee), {0, 1, 4})
+        self.assertTrue(greedy_warm_start.is_feasible_committee(committee, self.committee_size, dc_candidates_sets,
+                                                                tgd_tuples_list))
+        self.assertIn(engine.solver_status,
+                      (config.SOLVER_FOUND_OPTIMAL_STATUS, config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS))
+
+    def test_approximate_engine_not_proven_status(self):
+        # Without the bound gap the committee is not proven optimal, which is not a timeout.
+        with mock.patch.object(config, 'APPROXIMATE_BOUND_GAP', False):
+            engine = self._solve(score_functions.av_thiele_function)
+        self.assertEqual(set(engine.get_committee()), {1, 2, 4})
+        self.assertEqual(engine.solver_status, config.SOLVER_FEASIBLE_NOT_PROVEN_STATUS)
+
+    def test_approximate_engine_cardinality_constraints(self):
+        # At most one of the candidates 1, 2 and 4, and at least two of the candidates 0 and 3.
+        engine = abc_approximate_engine.ABCApproximateEngine()
+        engine.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict), self.committee_size,
+                                  score_functions.av_thiele_function)
+        engine.define_dc_cardinality([[1, 2, 4]], 1)
+        engine.define_tgd_cardinality([[0, 3]], 2)
+        engine.solve()
+        self.assertEqual(set(engine.get_committee()), {0, 1, 3})
+
+    def test_approximate_engine_infeasible(self):
+        # Candidate 1 cannot be with any other candidate.
+        dc_candidates_sets = [{1, 0}, {1, 2}, {1, 3}, {1, 4}]
+        tgd_tuples_list = [(set(), [{1}])]
+        engine = self._solve(score_functions.pav_thiele_function, dc_candidates_sets, tgd_tuples_list)
+        self.assertEqual(engine.solver_status, config.SOLVER_ABNORMAL_ERROR_STATUS)
+        self.assertEqual(engine.get_committee(), [])
+
+    def test_approximate_engine_bound_gap(self):
+        # A random instance, the optimal score (found by the MIP solver) should be within the bound gap.
+        random.seed(0)
+        candidates_ids_set = set(range(20))
+        approval_profile_dict = {voter_id: set(random.sample(range(20), random.randint(1, 5)))
+                                 for voter_id in range(200)}
+        dc_candidates_sets = [{0, 1}, {2, 3}, {4, 5}]
+        tgd_tuples_list = [({6}, [{7}, {8}])]
+        committee_size = 5
+
+        engine = self._solve(score_functions.pav_thiele_function, dc_candidates_sets, tgd_tuples_list,
+                             approval_profile_dict, candidates_ids_set, committee_size)
+        committee = engine.get_committee()
+        self.assertTrue(greedy_warm_start.is_feasible_committee(committee, committee_size, dc_candidates_sets,
+                                                                tgd_tuples_list))
+
+        abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(mip_convertor.create_solver("SCIP", 60 * 1000))
+        abc_convertor.define_abc_setting(candidates_ids_set, dict(approval_profile_dict), committee_size,
+                                         score_functions.pav_thiele_function)
+        abc_convertor.define_dc(dc_candidates_sets)
+        abc_convertor.define_tgd(tgd_tuples_list)
+        abc_convertor.solve()
+        optimal_score = abc_convertor.get_committee_score(abc_convertor.get_committee())
+
+        committee_score = engine.get_committee_score(committee)
+        self.assertLessEqual(committee_score, optimal_score + 1e-6)
+        self.assertGreaterEqual(committee_score / (1 - engine.bound_gap), optimal_score - 1e-6)
+
+
+    def test_swap_violations_delta(self):
+        # The violations of each swapped committee, counted incrementally from the touched constraints, are the same as
+        # counted from scratch.
+        random.seed(0)
+        candidates_ids_set = set(range(12))
+        engine = abc_approximate_engine.ABCApproximateEngine()
+        engine.define_abc_setting(candidates_ids_set, {voter_id: {voter_id % 12} for voter_id in range(24)}, 4,
+                                  score_functions.av_thiele_function)
+        engine.define_dc([set(random.sample(range(12), 2)) for _ in range(6)] + [{0, 1, 2}, {3, 20}])
+        engine.define_tgd([(set(random.sample(range(12), random.randint(0, 2))),
+                            [set(random.sample(range(12), random.randint(1, 2))) for _ in range(2)] + [{4, 30}])
+                           for _ in range(6)] + [({5, 40}, [{6}])])
+        engine.define_dc_cardinality([[7, 8, 9, 10]], 1)
+        engine.define_tgd_cardinality([[0, 5, 11]], 2)
+        engine._prepare_search_data()
+
+        committee = random.sample(range(12), 4)
+        violations = engine._count_violations(committee)
+        for _ in range(200):
+            member_position = random.randrange(4)
+            candidate_index = random.choice([candidate_index for candidate_index in range(12)
+                                             if candidate_index not in committee])
+            constraints_deltas = engine._get_swap_deltas(committee[member_position], candidate_index)
+            violations += engine._get_violations_delta(constraints_deltas)
+            engine._apply_swap(constraints_deltas)
+            committee[member_position] = candidate_index
+            members_counts = [engine._dc_members_count.copy(), engine._tgd_full_representatives_count.copy()]
+            self.assertEqual(violations, engine._count_violations(committee))
+            self.assertTrue(np.array_equal(members_counts[0], engine._dc_members_count))
+            self.assertTrue(np.array_equal(members_counts[1], engine._tgd_full_representatives_count))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import mip.mip_reduction.abc_to_cp_sat_convertor as abc_to_cp_sat_convertor
+import mip.mip_reduction.abc_to_mip_convertor as abc_to_mip_convertor
+import mip.mip_reduction.cp_sat_solver as cp_sat_solver
+import mip.mip_reduction.score_functions as score_functions
+import ortools.linear_solver.pywraplp as pywraplp
+
+import pandas as pd
+import unittest
+import config
+
+
+class TestABCToCPSATConvertor(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting.
+        self.candidates_ids_set = {0, 1, 2, 3, 4}
+        self.approval_profile_dict = {0: {1, 2}, 1: {2, 4}, 2: {3, 1}, 3: {4}, 4: {1, 2}, 5: {1}, 6: {1, 2},
+                                      7: {1}, 8: {0, 3, 4}}
+        self.committee_size = 3
+        # Candidates 1 and 2 cannot be together, and if candidate 4 is chosen then 0 or 3 must be chosen as well.
+        data = {'c1': [1],
+                'c2': [2]}
+        self.dc_df = pd.DataFrame(data)
+        self.tgd_tuples_list = [({4}, [{0}, {3}])]
+
+    def _get_committee_score(self, committee: list, score_function) -> float:
+        return sum([score_function(len(set(committee) & approval_profile), len(approval_profile))
+                    for approval_profile in self.approval_profile_dict.values()])
+
+    def test_convertor_compared_to_mip(self):
+        for score_function in [score_functions.av_thiele_function, score_functions.cc_thiele_function,
+                               score_functions.pav_thiele_function, score_functions.k_2_truncated_av_thiele_function,
+                               score_functions.sav_score_rule_function]:
+            for score_formulation in [False, True]:
+                config.CONCAVE_SCORE_FORMULATION = score_formulation
+                config.LINEAR_SCORE_FORMULATION = score_formulation
+                # ----------------------------------------------------------------
+                # Convert and solve with the MIP convertor.
+                solver = pywraplp.Solver.CreateSolver("SCIP")
+                abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                 self.committee_size, score_function)
+                abc_convertor.define_dc(self.dc_df.values)
+                abc_convertor.define_tgd(self.tgd_tuples_list)
+                abc_convertor.solve()
+                mip_committee = abc_convertor.get_committee()
+                # ----------------------------------------------------------------
+                # Convert and solve with the CP-SAT convertor.
+                cp_sat_abc_convertor = abc_to_cp_sat_convertor.ABCToCPSATConvertor(
+                    cp_sat_solver.CPSATSolver(num_workers=2))
+                cp_sat_abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                        self.committee_size, score_function)
+                cp_sat_abc_convertor.define_dc(self.dc_df.values)
+                cp_sat_abc_convertor.define_tgd(self.tgd_tuples_list)
+                cp_sat_abc_convertor.solve()
+                cp_sat_committee = cp_sat_abc_convertor.get_committee()
+                config.CONCAVE_SCORE_FORMULATION = True
+                config.LINEAR_SCORE_FORMULATION = True
+                # ----------------------------------------------------------------
+                # Test the result.
+                self.assertEqual(cp_sat_abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+                self.assertEqual(len(cp_sat_committee), self.committee_size)
+                self.assertFalse({1, 2} <= set(cp_sat_committee))
+                self.assertTrue(4 not in cp_sat_committee or {0, 3} & set(cp_sat_committee))
+                cp_sat_committee_score = self._get_committee_score(cp_sat_committee, score_function)
+                self.assertAlmostEqual(cp_sat_committee_score,
+                                       self._get_committee_score(mip_committee, score_function), places=5,
+                                       msg=f"ERROR: The CP-SAT optimum is different than expected.\n")
+                self.assertAlmostEqual(cp_sat_committee_score, cp_sat_abc_convertor.get_objective_value(), places=5)
+
+    def test_convertor_cardinality_constraints(self):
+        for max_members, min_members in [(1, 2), (2, 1)]:
+            cp_sat_abc_convertor = abc_to_cp_sat_convertor.ABCToCPSATConvertor(
+                cp_sat_solver.CPSATSolver(num_workers=2))
+            cp_sat_abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                    self.committee_size, score_functions.av_thiele_function)
+            cp_sat_abc_convertor.define_dc_cardinality([[1, 2, 4]], max_members)
+            cp_sat_abc_convertor.define_tgd_cardinality([[0, 3]], min_members)
+            cp_sat_abc_convertor.solve()
+            cp_sat_committee = set(cp_sat_abc_convertor.get_committee())
+            self.assertEqual(cp_sat_abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+            self.assertLessEqual(len(cp_sat_committee & {1, 2, 4}), max_members)
+            self.assertGreaterEqual(len(cp_sat_committee & {0, 3}), min_members)
+
+    def _define_constraints(self, abc_convertor, constraints_keys: list, guarded: bool) -> None:
+        # Define the constraints of the given keys (each guarded by its key, if required).
+        constraints = {'dc': lambda key: abc_convertor.define_dc(self.dc_df.values, key),
+                       'tgd': lambda key: abc_convertor.define_tgd(self.tgd_tuples_list, key),
+                       'dc_cardinality': lambda key: abc_convertor.define_dc_cardinality([[1, 2, 4]], 1, key),
+                       'tgd_cardinality': lambda key: abc_convertor.define_tgd_cardinality([[0, 3]], 2, key)}
+        for constraints_key in constraints_keys:
+            constraints[constraints_key](constraints_key if guarded else None)
+
+    def test_convertor_activation_literals(self):
+        # Solving a model with all the constraints guarded, under each constraints subset, gives the same optimum as a
+        # model with only the constraints of the subset.
+        all_constraints_keys = ['dc', 'tgd', 'dc_cardinality', 'tgd_cardinality']
+        constraints_subsets = [[], ['dc'], ['tgd'], ['dc', 'tgd'], ['dc_cardinality', 'tgd_cardinality'],
+                               all_constraints_keys, []]
+        for create_convertor in [lambda: abc_to_mip_convertor.ABCToMIPConvertor(pywraplp.Solver.CreateSolver("SCIP")),
+                                 lambda: abc_to_cp_sat_convertor.ABCToCPSATConvertor(
+                                     cp_sat_solver.CPSATSolver(num_workers=2))]:
+            guarded_convertor = create_convertor()
+            guarded_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                 self.committee_size, score_functions.pav_thiele_function)
+            self._define_constraints(guarded_convertor, all_constraints_keys, True)
+            for constraints_subset in constraints_subsets:
+                guarded_convertor.set_active_constraints(constraints_subset)
+                guarded_convertor.solve()
+
+                abc_convertor = create_convertor()
+                abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                 self.committee_size, score_functions.pav_thiele_function)
+                self._define_constraints(abc_convertor, constraints_subset, False)
+                abc_convertor.solve()
+                # ----------------------------------------------------------------
+                # Test the result.
+                self.assertEqual(guarded_convertor.solver_status, abc_convertor.solver_status)
+                self.assertAlmostEqual(
+                    self._get_committee_score(guarded_convertor.get_committee(), score_functions.pav_thiele_function),
+                    self._get_committee_score(abc_convertor.get_committee(), score_functions.pav_thiele_function),
+                    places=5, msg=f"ERROR: The optimum of {constraints_subset} is different than expected.\n")
+
+    def test_convertor_exact_score_scaling(self):
+        # ----------------------------------------------------------------
+        # Convert to CP-SAT domain (PAV scores are 1, 1/2, 1/3 hence scaled by 6).
+        cp_sat_abc_convertor = abc_to_cp_sat_convertor.ABCToCPSATConvertor(cp_sat_solver.CPSATSolver())
+        cp_sat_abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                self.committee_size, score_functions.pav_thiele_function)
+        cp_sat_abc_convertor.solve()
+        # ----------------------------------------------------------------
+        # Test the result.
+        self.assertEqual(cp_sat_abc_convertor.score_scaling_factor, 6)
+        self.assertEqual(cp_sat_abc_convertor.get_objective_value(),
+                         self._get_committee_score(cp_sat_abc_convertor.get_committee(),
+                                                   score_functions.pav_thiele_function))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,6 +24,7 @@ class TestABCToMIPConvertor(unittest.TestCase):
         
         """
         config.LIFTED_INFERENCE = False
+        self._solver_portfolio_members = config.SOLVER_PORTFOLIO_MEMBERS
         self.committee_size = 3
         self.voting_rule_score_function = score_functions.av_thiele_function
         # ----------------------------------------------------------------
@@ -35,6 +36,14 @@ class TestABCToMIPConvertor(unittest.TestCase):
         # Define the MIP convertor.
         self.abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(self.solver)
 
+    def tearDown(self):
+        config.CONCAVE_SCORE_FORMULATION = True
+        config.LINEAR_SCORE_FORMULATION = True
+        config.BULK_MODEL_CONSTRUCTION = True
+        config.LIFTED_INFERENCE = False
+        config.SOLVER_PORTFOLIO = False
+        config.SOLVER_PORTFOLIO_MEMBERS = self._solver_portfolio_members
+
     def test_convertor_sanity(self):
         # ----------------------------------------------------------------
         # Convert to MIP domain.
@@ -337,6 +346,294 @@ class TestABCToMIPConvertor(unittest.TestCase):
         self.assertEqual(expected_result, str(self.abc_convertor),
                          f"ERROR: The solution is different than expected.\n")
 
+    def test_convertor_concave_score_formulation(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting.
+        data = {'c1': [4],
+                'c2': [1]}
+        dc_df = pd.DataFrame(data)
+        for score_function in [score_functions.pav_thiele_function, score_functions.cc_thiele_function,
+                               score_functions.k_2_truncated_av_thiele_function]:
+            objective_values = []
+            for concave_score_formulation in [False, True]:
+                config.CONCAVE_SCORE_FORMULATION = concave_score_formulation
+                solver = pywraplp.Solver.CreateSolver("CP_SAT")
+                abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                # ----------------------------------------------------------------
+                # Convert to MIP domain.
+                abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                                 dict(self.approval_profile_dict),
+                                                 self.committee_size,
+                                                 score_function)
+                abc_convertor.define_dc(dc_df.values)
+                # ----------------------------------------------------------------
+                # Solve the MIP problem.
+                abc_convertor.solve()
+                objective_values.append(solver.Objective().Value())
+            # ----------------------------------------------------------------
+            # Test the result.
+            self.assertAlmostEqual(objective_values[0], objective_values[1], places=5,
+                                   msg=f"ERROR: The concave score formulation optimum is different than expected.\n")
+
+    def test_convertor_linear_score_formulation(self):
+        for score_function in [score_functions.av_thiele_function, score_functions.sav_score_rule_function]:
+            committees_scores = []
+            for linear_score_formulation in [False, True]:
+                config.LINEAR_SCORE_FORMULATION = linear_score_formulation
+                config.CONCAVE_SCORE_FORMULATION = linear_score_formulation
+                solver = pywraplp.Solver.CreateSolver("CP_SAT")
+                abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                # ----------------------------------------------------------------
+                # Convert to MIP domain.
+                abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                                 dict(self.approval_profile_dict),
+                                                 self.committee_size,
+                                                 score_function)
+                abc_convertor.define_tgd([({1}, [{2, 4}, {3, 4}])])
+                # ----------------------------------------------------------------
+                # Solve the MIP problem.
+                abc_convertor.solve()
+                committee = {candidate_id for candidate_id, value in abc_convertor.model_candidates_variables.items()
+                             if value.solution_value() > 0.5}
+                committees_scores.append(sum([score_function(len(committee & approval_profile), len(approval_profile))
+                                              for approval_profile in self.approval_profile_dict.values()]))
+            # ----------------------------------------------------------------
+            # Test the result.
+            self.assertAlmostEqual(committees_scores[0], committees_scores[1], places=5,
+                                   msg=f"ERROR: The linear score formulation optimum is different than expected.\n")
+            self.assertAlmostEqual(committees_scores[1], solver.Objective().Value(), places=5)
+            # Only the candidates variables and the TGD variables are defined.
+            self.assertEqual(len(self.candidates_ids_set) + 3, solver.NumVariables())
+
+    def test_convertor_bulk_model_construction(self):
+        data = {'c1': [4],
+                'c2': [1]}
+        dc_df = pd.DataFrame(data)
+        for score_function in [score_functions.pav_thiele_function, score_functions.av_thiele_function]:
+            for score_formulation in [False, True]:
+                models_sizes = []
+                objective_values = []
+                for bulk_model_construction in [False, True]:
+                    config.BULK_MODEL_CONSTRUCTION = bulk_model_construction
+                    config.CONCAVE_SCORE_FORMULATION = score_formulation
+                    config.LINEAR_SCORE_FORMULATION = score_formulation
+                    solver = pywraplp.Solver.CreateSolver("SCIP")
+                    abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                    # ----------------------------------------------------------------
+                    # Convert to MIP domain.
+                    abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                                     dict(self.approval_profile_dict),
+                                                     self.committee_size,
+                                                     score_function)
+                    abc_convertor.define_dc(dc_df.values)
+                    # ----------------------------------------------------------------
+                    # Solve the MIP problem.
+                    abc_convertor.solve()
+                    models_sizes.append((solver.NumVariables(), solver.NumConstraints()))
+                    objective_values.append(solver.Objective().Value())
+                # ----------------------------------------------------------------
+                # Test the result.
+                self.assertEqual(models_sizes[0], models_sizes[1])
+                self.assertAlmostEqual(objective_values[0], objective_values[1], places=5,
+                                       msg=f"ERROR: The bulk model construction optimum is different than expected.\n")
+
+    def test_convertor_solver_portfolio(self):
+        objective_values = []
+        for solver_portfolio in [False, True]:
+            config.SOLVER_PORTFOLIO = solver_portfolio
+            config.SOLVER_PORTFOLIO_MEMBERS = [("SCIP", ""), ("CP_SAT", "num_workers:2")]
+            solver = pywraplp.Solver.CreateSolver("SCIP")
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+            # ----------------------------------------------------------------
+            # Convert to MIP domain.
+            abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                             dict(self.approval_profile_dict),
+                                             self.committee_size,
+                                             score_functions.pav_thiele_function)
+            abc_convertor.define_tgd([({1}, [{2, 4}, {3, 4}])])
+            # ----------------------------------------------------------------
+            # Solve the MIP problem.
+            abc_convertor.solve()
+            objective_values.append(solver.Objective().Value())
+        # ----------------------------------------------------------------
+        # Test the result.
+        self.assertEqual(abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+        self.assertIn(abc_convertor.portfolio_winner, config.SOLVER_PORTFOLIO_MEMBERS)
+        self.assertAlmostEqual(objective_values[0], objective_values[1], places=5,
+                               msg=f"ERROR: The solver portfolio optimum is different than expected.\n")
+        self.assertEqual(len(abc_convertor.get_committee()), self.committee_size)
+
+    def test_convertor_solver_portfolio_infeasible(self):
+        # The (invalid parameters) CP-SAT member fails with an error status, and SCIP proves the infeasibility (every
+        # pair of candidates is a DC set, hence there is no committee of size 3).
+        config.SOLVER_PORTFOLIO = True
+        config.SOLVER_PORTFOLIO_MEMBERS = [("CP_SAT", "num_workers:-5"), ("SCIP", "")]
+        solver = pywraplp.Solver.CreateSolver("SCIP")
+        abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+        abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                         dict(self.approval_profile_dict),
+                                         self.committee_size,
+                                         score_functions.pav_thiele_function)
+        abc_convertor.define_dc([[c1, c2] for c1 in self.candidates_ids_set for c2 in self.candidates_ids_set
+                                 if c1 < c2])
+        abc_convertor.solve()
+        # ----------------------------------------------------------------
+        # Test the result (the proven status is preferred over the error status).
+        self.assertEqual(abc_convertor.solver_status, config.SOLVER_PROVEN_INFEASIBLE_STATUS)
+        self.assertEqual(abc_convertor.portfolio_winner, ("SCIP", ""))
+
+    def test_convertor_greedy_warm_start(self):
+        for solver_name in ["SCIP", "CP_SAT"]:
+            solver = pywraplp.Solver.CreateSolver(solver_name)
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+            # ----------------------------------------------------------------
+            # Convert to MIP domain.
+            abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                             dict(self.approval_profile_dict),
+                                             self.committee_size,
+                                             score_functions.pav_thiele_function)
+            abc_convertor.define_dc(pd.DataFrame({'c1': [1], 'c2': [2]}).values)
+            # ----------------------------------------------------------------
+            # Solve the MIP problem.
+            abc_convertor.solve()
+            # ----------------------------------------------------------------
+            # Test the result.
+            self.assertIsNotNone(abc_convertor.warm_start_committee)
+            self.assertFalse({1, 2} <= set(abc_convertor.warm_start_committee))
+            self.assertLessEqual(abc_convertor.warm_start_score,
+                                 abc_convertor.get_committee_score(abc_convertor.get_committee()) + 1e-6)
+            self.assertAlmostEqual(abc_convertor.get_committee_score(abc_convertor.get_committee()),
+                                   solver.Objective().Value(), places=5)
+
+    def test_convertor_add_voters(self):
+        # Adding voters to a solved model gives the same optimum as defining all the voters at once.
+        voters_ids = list(self.approval_profile_dict.keys())
+        for score_function in [score_functions.pav_thiele_function, score_functions.av_thiele_function]:
+            for score_formulation in [False, True]:
+                for bulk_model_construction in [False, True]:
+                    config.BULK_MODEL_CONSTRUCTION = bulk_model_construction
+                    config.CONCAVE_SCORE_FORMULATION = score_formulation
+                    config.LINEAR_SCORE_FORMULATION = score_formulation
+                    config.LIFTED_INFERENCE = bulk_model_construction
+                    objective_values = []
+                    for first_voters_number in [len(voters_ids), 3]:
+                        solver = pywraplp.Solver.CreateSolver("SCIP")
+                        abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                        abc_convertor.define_abc_setting(
+                            self.candidates_ids_set,
+                            {voter_id: self.approval_profile_dict[voter_id]
+                             for voter_id in voters_ids[:first_voters_number]},
+                            self.committee_size, score_function)
+                        abc_convertor.define_dc(pd.DataFrame({'c1': [1], 'c2': [2]}).values)
+                        abc_convertor.solve()
+                        if first_voters_number < len(voters_ids):
+                            abc_convertor.previous_committee = abc_convertor.get_committee()
+                            abc_convertor.add_voters({voter_id: self.approval_profile_dict[voter_id]
+                                                      for voter_id in voters_ids[first_voters_number:]})
+                            abc_convertor.solve()
+                        objective_values.append(solver.Objective().Value())
+                        self.assertEqual(abc_convertor.voters_group_size, len(voters_ids))
+                        self.assertAlmostEqual(abc_convertor.get_committee_score(abc_convertor.get_committee()),
+                                               solver.Objective().Value(), places=5)
+                    # ----------------------------------------------------------------
+                    # Test the result.
+                    self.assertAlmostEqual(objective_values[0], objective_values[1], places=5,
+                                           msg=f"ERROR: The optimum after adding voters is different than expected.\n")
+
+    def test_convertor_set_committee_size(self):
+        # Resizing a solved model (defined for a larger committee size) gives the same optimum as defining it with the
+        # new committee size.
+        for score_function in [score_functions.pav_thiele_function, score_functions.av_thiele_function]:
+            for score_formulation in [False, True]:
+                for bulk_model_construction in [False, True]:
+                    config.BULK_MODEL_CONSTRUCTION = bulk_model_construction
+                    config.CONCAVE_SCORE_FORMULATION = score_formulation
+                    config.LINEAR_SCORE_FORMULATION = score_formulation
+                    solver = pywraplp.Solver.CreateSolver("SCIP")
+                    resized_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+                    resized_convertor.max_committee_size = 4
+                    resized_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                         1, score_function)
+                    resized_convertor.define_dc(pd.DataFrame({'c1': [1], 'c2': [2]}).values)
+                    for committee_size in range(1, 5):
+                        self.assertTrue(resized_convertor.can_set_committee_size(committee_size))
+                        resized_convertor.previous_committee = resized_convertor.get_committee() \
+                            if committee_size > 1 else None
+                        resized_convertor.set_committee_size(committee_size)
+                        resized_convertor.solve()
+
+                        abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(pywraplp.Solver.CreateSolver("SCIP"))
+                        abc_convertor.define_abc_setting(self.candidates_ids_set, dict(self.approval_profile_dict),
+                                                         committee_size, score_function)
+                        abc_convertor.define_dc(pd.DataFrame({'c1': [1], 'c2': [2]}).values)
+                        abc_convertor.solve()
+                        # ----------------------------------------------------------------
+                        # Test the result.
+                        self.assertEqual(len(resized_convertor.get_committee()), committee_size)
+                        self.assertAlmostEqual(
+                            resized_convertor.get_committee_score(resized_convertor.get_committee()),
+                            abc_convertor.get_committee_score(abc_convertor.get_committee()), places=5,
+                            msg=f"ERROR: The optimum after resizing the committee is different than expected.\n")
+                    self.assertFalse(resized_convertor.can_set_committee_size(5))
+
+    def test_convertor_cardinality_constraints(self):
+        for solver_name in ["SCIP", "CP_SAT"]:
+            solver = pywraplp.Solver.CreateSolver(solver_name)
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+            # ----------------------------------------------------------------
+            # Convert to MIP domain.
+            abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                             dict(self.approval_profile_dict),
+                                             self.committee_size,
+                                             self.voting_rule_score_function)
+            # At most one of the candidates 1, 2 and 4, and at least two of the candidates 0 and 3.
+            abc_convertor.define_dc_cardinality([[1, 2, 4]], 1)
+            abc_convertor.define_tgd_cardinality([[0, 3]], 2)
+            # ----------------------------------------------------------------
+            # Solve the MIP problem.
+            abc_convertor.solve()
+            # ----------------------------------------------------------------
+            # Test the result.
+            self.assertEqual(abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+            self.assertEqual(set(abc_convertor.get_committee()), {0, 1, 3})
+            self.assertEqual(set(abc_convertor.warm_start_committee), {0, 1, 3})
+
+            # An empty group can not have a member in the committee.
+            solver = pywraplp.Solver.CreateSolver(solver_name)
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(solver)
+            abc_convertor.define_abc_setting(self.candidates_ids_set,
+                                             dict(self.approval_profile_dict),
+                                             self.committee_size,
+                                             self.voting_rule_score_function)
+            abc_convertor.define_tgd_cardinality([[]], 1)
+            abc_convertor.solve()
+            self.assertEqual(abc_convertor.solver_status, config.SOLVER_PROVEN_INFEASIBLE_STATUS)
+
+    def test_convertor_fix_candidates_and_symmetry_breaking(self):
+        # Candidates 1 and 2 have the same approving voters, and candidates 0 and 4 have none.
+        approval_profile_dict = {0: {1, 2}, 1: {1, 2}, 2: {3}}
+        for solver_name in ["SCIP", "CP_SAT"]:
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(pywraplp.Solver.CreateSolver(solver_name))
+            abc_convertor.define_abc_setting(self.candidates_ids_set, approval_profile_dict, 4,
+                                             self.voting_rule_score_function)
+            abc_convertor.define_candidates_symmetry_breaking([[2, 1], [4, 0]])
+            abc_convertor.solve()
+            # ----------------------------------------------------------------
+            # Test the result (only the first member of the class of 0 and 4 can be chosen).
+            self.assertEqual(abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+            self.assertEqual(set(abc_convertor.get_committee()), {0, 1, 2, 3})
+            self.assertEqual(abc_convertor.candidates_classes, [[1, 2], [0, 4]])
+            self.assertFalse(abc_convertor.can_add_voters())
+
+            # A fixed candidate is in the committee.
+            abc_convertor = abc_to_mip_convertor.ABCToMIPConvertor(pywraplp.Solver.CreateSolver(solver_name))
+            abc_convertor.define_abc_setting(self.candidates_ids_set, approval_profile_dict, 3,
+                                             self.voting_rule_score_function)
+            abc_convertor.fix_candidates([4])
+            abc_convertor.solve()
+            self.assertEqual(abc_convertor.solver_status, config.SOLVER_FOUND_OPTIMAL_STATUS)
+            self.assertEqual(set(abc_convertor.get_committee()), {1, 2, 4})
+            self.assertEqual(set(abc_convertor.warm_start_committee), {1, 2, 4})
 
 # Test running instructions:
 # python -m unittest .\tests\abc_to_mip_convertor_test.py
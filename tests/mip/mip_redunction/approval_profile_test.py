@@ -0,0 +1,53 @@
+import numpy as np
+
+import mip.mip_reduction.approval_profile as approval_profile
+
+import unittest
+
+
+class TestApprovalProfile(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define an approval profile.
+        self.approval_profile_dict = {0: {1, 2}, 1: {2, 4}, 2: {3, 1}, 3: {4}, 4: {1, 2}, 5: {1}, 6: {1, 2},
+                                      7: {1}, 8: {3}, 9: {3}}
+
+    def test_approval_profile_sanity(self):
+        profile = approval_profile.ApprovalProfile.create(self.approval_profile_dict)
+        self.assertEqual(len(profile), 10)
+        self.assertEqual(profile.to_dict(), self.approval_profile_dict)
+        self.assertEqual(profile[2], frozenset({1, 3}))
+        self.assertEqual(profile.approved_candidates.dtype, np.int32)
+        self.assertEqual(profile.get_voters_profile_size().tolist(), [2, 2, 2, 1, 2, 1, 2, 1, 1, 1])
+        self.assertEqual(profile.get_committee_approval_count([1, 3]).tolist(), [1, 0, 2, 0, 1, 1, 1, 1, 1, 1])
+
+    def test_approval_profile_from_pairs(self):
+        # The pairs are not ordered, and may contain duplications.
+        profile = approval_profile.ApprovalProfile.from_pairs(np.array([7, 3, 7, 3, 5, 7]),
+                                                              np.array([20, 10, 10, 10, 30, 20]))
+        self.assertEqual(profile.keys(), [3, 5, 7])
+        self.assertEqual(profile.to_dict(), {3: {10}, 5: {30}, 7: {10, 20}})
+
+    def test_approval_profile_lift(self):
+        lifted_profile = approval_profile.ApprovalProfile.create(self.approval_profile_dict).lift()
+        # The lifted voters are ordered by their first appearance.
+        self.assertEqual(lifted_profile.to_dict(), {0: {1, 2}, 1: {2, 4}, 2: {1, 3}, 3: {4}, 4: {1}, 5: {3}})
+        self.assertEqual(lifted_profile.voters_weights.tolist(), [3, 1, 1, 1, 2, 2])
+        self.assertEqual(lifted_profile.get_voters_weights_dict(), {0: 3, 1: 1, 2: 1, 3: 1, 4: 2, 5: 2})
+
+    def test_approval_profile_concatenate(self):
+        profile = approval_profile.ApprovalProfile.create({0: {1, 2}, 1: {2}}).concatenate(
+            approval_profile.ApprovalProfile.create({5: {3, 1}, 6: {4}}))
+        self.assertEqual(profile.to_dict(), {0: {1, 2}, 1: {2}, 5: {1, 3}, 6: {4}})
+        self.assertEqual(profile.candidates_ids.tolist(), [1, 2, 3, 4])
+        self.assertEqual(profile.voters_weights.tolist(), [1, 1, 1, 1])
+
+    def test_approval_profile_select_voters(self):
+        profile = approval_profile.ApprovalProfile.create(self.approval_profile_dict).lift()
+        selected_profile = profile.select_voters(np.array([True, False, True, False, True, False]))
+        self.assertEqual(selected_profile.to_dict(), {0: {1, 2}, 2: {1, 3}, 4: {1}})
+        self.assertEqual(selected_profile.voters_weights.tolist(), [3, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
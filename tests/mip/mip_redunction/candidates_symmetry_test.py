@@ -0,0 +1,40 @@
+import numpy as np
+
+import mip.mip_reduction.candidates_symmetry as candidates_symmetry
+
+import unittest
+
+
+class TestCandidatesSymmetry(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting (candidates 0 and 1 have the same approving voters, and candidates 3, 4 and 5 have none).
+        self.candidates_ids_set = {0, 1, 2, 3, 4, 5}
+        self.approval_profile_dict = {0: {0, 1, 2}, 1: {0, 1}, 2: {2}}
+
+    def test_symmetric_candidates_classes_sanity(self):
+        constraints = candidates_symmetry.get_constraints_set()
+        candidates_classes = candidates_symmetry.find_symmetric_candidates_classes(
+            self.candidates_ids_set, self.approval_profile_dict, constraints)
+        self.assertEqual(candidates_classes, [[0, 1], [3, 4, 5]])
+
+    def test_symmetric_candidates_classes_constraints(self):
+        # Candidates 3 and 4 cannot be together (a DC), hence they are symmetric (swapping them maps the DC set onto
+        # itself), but not with candidate 5. Candidate 0 is the representative of a TGD, unlike candidate 1.
+        constraints = candidates_symmetry.get_constraints_set(np.array([[3, 4]]), [({2}, np.array([[0]]))])
+        candidates_classes = candidates_symmetry.find_symmetric_candidates_classes(
+            self.candidates_ids_set, self.approval_profile_dict, constraints)
+        self.assertEqual(candidates_classes, [[3, 4]])
+
+        # A compiled DC group of candidates 3, 4 and 5.
+        constraints = candidates_symmetry.get_constraints_set(dc_cardinality_groups=[([3, 4, 5], 1)])
+        candidates_classes = candidates_symmetry.find_symmetric_candidates_classes(
+            self.candidates_ids_set, self.approval_profile_dict, constraints)
+        self.assertEqual(candidates_classes, [[0, 1], [3, 4, 5]])
+
+    def test_canonical_committee(self):
+        self.assertEqual(candidates_symmetry.get_canonical_committee([1, 2, 5], [[0, 1], [3, 4, 5]]), [0, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+from itertools import combinations
+import numpy as np
+
+import mip.mip_reduction.dc_contraction as dc_contraction
+
+import unittest
+
+
+class TestDCContraction(unittest.TestCase):
+    def assert_valid_contraction(self, dc_candidates_sets, hypercliques):
+        # Every DC set is contained in a hyperclique, and every k-subset of a hyperclique is a DC set.
+        arity = len(dc_candidates_sets[0])
+        dc_candidates_sets = set(map(frozenset, dc_candidates_sets))
+        for dc_candidates_set in dc_candidates_sets:
+            self.assertTrue(any([dc_candidates_set <= set(hyperclique) for hyperclique in hypercliques]))
+        for hyperclique in hypercliques:
+            for members in combinations(hyperclique, arity):
+                self.assertIn(frozenset(members), dc_candidates_sets)
+
+    def test_unique_rows(self):
+        dc_rows = np.array([[3, 1], [1, 3], [2, 1], [1, 3]])
+        self.assertEqual(dc_contraction.get_unique_rows(dc_rows).tolist(), [[1, 2], [1, 3]])
+        self.assertFalse(dc_contraction.has_repeated_members(dc_contraction.get_unique_rows(dc_rows)))
+        self.assertTrue(dc_contraction.has_repeated_members(np.array([[1, 2], [3, 3]])))
+
+        # The distinct rows of the chunks are the distinct rows of the whole array.
+        dc_rows = np.random.default_rng(0).integers(0, 6, size=(100, 2))
+        unique_rows = dc_contraction.get_unique_rows_from_chunks(np.array_split(dc_rows, 7), 2)
+        self.assertEqual(unique_rows.tolist(), dc_contraction.get_unique_rows(dc_rows).tolist())
+        self.assertEqual(dc_contraction.get_unique_rows_from_chunks([], 3).shape, (0, 3))
+
+    def test_adjacency(self):
+        pointers, neighbors = dc_contraction.get_adjacency(np.array([[0, 1], [1, 2], [0, 1]]), 3)
+        self.assertEqual(pointers.tolist(), [0, 1, 3, 4])
+        self.assertEqual(neighbors.tolist(), [1, 0, 2, 1])
+
+    def test_contract_pairs(self):
+        # A clique of candidates 1, 2, 3 and 4, and a pair of candidates 4 and 7.
+        dc_candidates_sets = [[c1, c2] for c1, c2 in combinations([1, 2, 3, 4], 2)] + [[7, 4]]
+        hypercliques = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets)
+        self.assertEqual(sorted(hypercliques), [[1, 2, 3, 4], [4, 7]])
+        self.assert_valid_contraction(dc_candidates_sets, hypercliques)
+        # An array of DC tuples is contracted the same.
+        self.assertEqual(sorted(dc_contraction.contract_dc_candidates_sets(np.array(dc_candidates_sets))),
+                         [[1, 2, 3, 4], [4, 7]])
+
+    def test_contract_triples(self):
+        # The pairs graph of these triples is a clique of candidates 1, 2, 3 and 4, but the triple 2, 3, 4 is not a DC
+        # set, hence the candidates can not be contracted into a single hyperclique.
+        dc_candidates_sets = [[1, 2, 3], [1, 2, 4], [1, 3, 4]]
+        hypercliques = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets)
+        self.assertEqual(len(hypercliques), 3)
+        self.assert_valid_contraction(dc_candidates_sets, hypercliques)
+
+        dc_candidates_sets.append([2, 3, 4])
+        hypercliques = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets)
+        self.assertEqual(hypercliques, [[1, 2, 3, 4]])
+
+    def test_contraction_budget(self):
+        dc_candidates_sets = [[c1, c2] for c1, c2 in combinations(range(6), 2)]
+        self.assertEqual(dc_contraction.contract_dc_candidates_sets(dc_candidates_sets), [list(range(6))])
+
+        # With no time left the DC sets are kept as they are.
+        hypercliques = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets, time_budget=-1)
+        self.assertEqual(sorted(hypercliques), dc_candidates_sets)
+
+        hypercliques = dc_contraction.contract_dc_candidates_sets(dc_candidates_sets, max_clique_size=3)
+        self.assertTrue(all([len(hyperclique) <= 3 for hyperclique in hypercliques]))
+        self.assert_valid_contraction(dc_candidates_sets, hypercliques)
+
+
+if __name__ == '__main__':
+    unittest.main()
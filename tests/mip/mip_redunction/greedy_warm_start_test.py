@@ -0,0 +1,60 @@
+import mip.mip_reduction.greedy_warm_start as greedy_warm_start
+import mip.mip_reduction.score_functions as score_functions
+
+import unittest
+
+
+class TestGreedyWarmStart(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define ABC setting.
+        self.candidates_ids_set = {0, 1, 2, 3, 4}
+        self.approval_profile_dict = {0: {1, 2}, 1: {2, 4}, 2: {3, 1}, 3: {4}, 4: {1, 2}, 5: {1}, 6: {1, 2},
+                                      7: {1}}
+        self.voters_weights = {voter_id: 1 for voter_id in self.approval_profile_dict}
+        self.committee_size = 3
+
+    def test_greedy_committee_sanity(self):
+        committee = greedy_warm_start.find_greedy_committee(self.candidates_ids_set, self.approval_profile_dict,
+                                                            self.voters_weights, self.committee_size,
+                                                            score_functions.av_thiele_function)
+        # The AV top candidates are 1, 2 and 4.
+        self.assertEqual(set(committee), {1, 2, 4})
+        self.assertEqual(greedy_warm_start.get_committee_score(committee, self.approval_profile_dict,
+                                                               self.voters_weights,
+                                                               score_functions.av_thiele_function), 12)
+
+    def test_greedy_committee_constraints(self):
+        # Candidates 1 and 2 cannot be together, and candidate 0 must be in the committee (a TGD with an empty left
+        # hand side).
+        dc_candidates_sets = [{1, 2}]
+        tgd_tuples_list = [(set(), [{0}])]
+        committee = greedy_warm_start.find_greedy_committee(self.candidates_ids_set, self.approval_profile_dict,
+                                                            self.voters_weights, self.committee_size,
+                                                            score_functions.pav_thiele_function,
+                                                            dc_candidates_sets, tgd_tuples_list)
+        self.assertEqual(set(committee), {0, 1, 4})
+        self.assertTrue(greedy_warm_start.is_feasible_committee(committee, self.committee_size, dc_candidates_sets,
+                                                                tgd_tuples_list))
+
+    def test_greedy_committee_infeasible(self):
+        # Candidate 1 cannot be with any other candidate.
+        dc_candidates_sets = [{1, 0}, {1, 2}, {1, 3}, {1, 4}]
+        tgd_tuples_list = [(set(), [{1}])]
+        committee = greedy_warm_start.find_greedy_committee(self.candidates_ids_set, self.approval_profile_dict,
+                                                            self.voters_weights, self.committee_size,
+                                                            score_functions.pav_thiele_function,
+                                                            dc_candidates_sets, tgd_tuples_list)
+        self.assertIsNone(committee)
+
+    def test_greedy_committee_empty_profile(self):
+        # Without approval entries every candidate has no gain, and the committee is chosen only by the constraints.
+        tgd_tuples_list = [(set(), [{3}])]
+        committee = greedy_warm_start.find_greedy_committee(self.candidates_ids_set, {}, {}, self.committee_size,
+                                                            score_functions.av_thiele_function, [], tgd_tuples_list)
+        self.assertEqual(len(committee), self.committee_size)
+        self.assertIn(3, committee)
+
+
+if __name__ == '__main__':
+    unittest.main()
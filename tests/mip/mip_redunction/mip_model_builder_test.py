@@ -0,0 +1,119 @@
+import mip.mip_reduction.mip_model_builder as mip_model_builder
+import ortools.linear_solver.pywraplp as pywraplp
+from ortools.linear_solver import linear_solver_pb2
+
+import numpy as np
+import unittest
+
+
+class TestMIPModelBuilder(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define the MIP solver.
+        solver_name = "SCIP"
+        self.solver = pywraplp.Solver.CreateSolver(solver_name)
+        self.assertIsNotNone(self.solver, f"Couldn't create {solver_name} solver.")
+
+    def test_model_builder_proto(self):
+        # ----------------------------------------------------------------
+        # Build a random model (with duplicated matrix entries, large indices and infinite bounds).
+        rng = np.random.default_rng(0)
+        number_of_variables = 300
+        number_of_constraints = 200
+        number_of_entries = 3000
+        model_builder = mip_model_builder.MIPModelBuilder(name_variables=True)
+        variables_upper_bounds = 1e9 * rng.random(number_of_variables)
+        variables_objective_coefficients = rng.random(number_of_variables)
+        integer_variables = model_builder.add_variables(np.zeros(number_of_variables), variables_upper_bounds, True,
+                                                        variables_objective_coefficients, names=lambda i: f"x_{i}")
+        continuous_variables = model_builder.add_variables(np.zeros(number_of_variables), np.inf, False)
+        rows = rng.integers(0, number_of_constraints, number_of_entries)
+        columns = rng.integers(0, 2 * number_of_variables, number_of_entries)
+        coefficients = rng.random(number_of_entries) - 0.5
+        lower_bounds = np.full(number_of_constraints, -np.inf)
+        upper_bounds = 100 * rng.random(number_of_constraints)
+        model_builder.add_constraints(rows, columns, coefficients, lower_bounds, upper_bounds)
+        model_builder.set_maximization(False)
+        # ----------------------------------------------------------------
+        # Append the model to an existing model proto.
+        existing_model_proto = linear_solver_pb2.MPModelProto()
+        existing_model_proto.variable.add(upper_bound=1, is_integer=True)
+        existing_model_proto.constraint.add(var_index=[0], coefficient=[2.0], upper_bound=1)
+        model_proto = model_builder.to_proto(existing_model_proto)
+        # ----------------------------------------------------------------
+        # Test the result.
+        self.assertFalse(model_proto.maximize)
+        self.assertEqual(len(model_proto.variable), 1 + 2 * number_of_variables)
+        self.assertEqual(len(model_proto.constraint), 1 + number_of_constraints)
+        self.assertEqual(model_proto.variable[0], existing_model_proto.variable[0])
+        self.assertEqual(model_proto.constraint[0], existing_model_proto.constraint[0])
+        for i in integer_variables.tolist():
+            variable_proto = model_proto.variable[1 + i]
+            self.assertEqual(variable_proto.name, f"x_{i}")
+            self.assertTrue(variable_proto.is_integer)
+            self.assertEqual(variable_proto.upper_bound, variables_upper_bounds[i])
+            self.assertEqual(variable_proto.objective_coefficient, variables_objective_coefficients[i])
+        for i in continuous_variables.tolist():
+            variable_proto = model_proto.variable[1 + i]
+            self.assertFalse(variable_proto.is_integer)
+            self.assertEqual(variable_proto.upper_bound, np.inf)
+            self.assertEqual(variable_proto.objective_coefficient, 0)
+        expected_matrix = np.zeros((number_of_constraints, 1 + 2 * number_of_variables))
+        np.add.at(expected_matrix, (rows, columns + 1), coefficients)
+        matrix = np.zeros((number_of_constraints, 1 + 2 * number_of_variables))
+        for row, constraint_proto in enumerate(model_proto.constraint[1:]):
+            self.assertEqual(len(set(constraint_proto.var_index)), len(constraint_proto.var_index))
+            matrix[row, list(constraint_proto.var_index)] = list(constraint_proto.coefficient)
+            self.assertEqual(constraint_proto.lower_bound, -np.inf)
+            self.assertEqual(constraint_proto.upper_bound, upper_bounds[row])
+        self.assertTrue(np.allclose(matrix, expected_matrix, rtol=0, atol=1e-12))
+
+    def test_model_builder_load(self):
+        # ----------------------------------------------------------------
+        # Add a model to a solver with an existing model.
+        # max 3x + 2y + z s.t. x + y <= 1, y + z <= 1 (with the existing model: x == 0).
+        existing_variable = self.solver.BoolVar("existing")
+        self.solver.Add(existing_variable == 0)
+        model_builder = mip_model_builder.MIPModelBuilder()
+        variables = model_builder.add_variables(np.zeros(3), 1, True, [3, 2, 1])
+        model_builder.add_constraints([0, 0, 1, 1], variables[[0, 1, 1, 2]], 1, [-np.inf, -np.inf], 1)
+        model_builder.add_constraints([0], variables[[0]], 1, [0], 0)
+        variables_offset = model_builder.load(self.solver)
+        # ----------------------------------------------------------------
+        # Solve the MIP problem.
+        status = self.solver.Solve()
+        # ----------------------------------------------------------------
+        # Test the result.
+        self.assertEqual(variables_offset, 1)
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        self.assertEqual(self.solver.NumVariables(), 4)
+        self.assertEqual(self.solver.NumConstraints(), 4)
+        self.assertEqual(self.solver.Objective().Value(), 2)
+        self.assertEqual([self.solver.variable(variables_offset + i).solution_value() for i in range(3)],
+                         [0, 1, 0])
+        # The solver objects obtained before the load are still valid.
+        self.assertEqual(existing_variable.solution_value(), 0)
+
+    def test_model_builder_load_empty_solver(self):
+        # ----------------------------------------------------------------
+        # Add a model to an empty solver (loaded from a model proto).
+        # min x + y s.t. x + y >= 1.5, x <= 0.5 (x is continuous, y is an integer).
+        model_builder = mip_model_builder.MIPModelBuilder()
+        x = model_builder.add_variables(np.zeros(1), 0.5, False, 1)
+        y = model_builder.add_variables(np.zeros(1), np.inf, True, 1)
+        model_builder.add_constraints([0, 0], np.concatenate((x, y)), 1, [1.5], np.inf)
+        model_builder.set_maximization(False)
+        variables_offset = model_builder.load(self.solver)
+        # ----------------------------------------------------------------
+        # Solve the MIP problem.
+        status = self.solver.Solve()
+        # ----------------------------------------------------------------
+        # Test the result.
+        self.assertEqual(variables_offset, 0)
+        self.assertEqual(status, pywraplp.Solver.OPTIMAL)
+        self.assertAlmostEqual(self.solver.Objective().Value(), 1.5)
+        self.assertAlmostEqual(self.solver.variable(0).solution_value(), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
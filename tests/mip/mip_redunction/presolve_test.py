@@ -0,0 +1,63 @@
+import numpy as np
+
+import mip.mip_reduction.presolve as presolve
+
+import unittest
+
+
+class TestPresolve(unittest.TestCase):
+    def setUp(self):
+        # ----------------------------------------------------------------
+        # Define the candidates.
+        self.candidates_ids_set = {0, 1, 2, 3, 4, 5}
+
+    def test_propagate_constraints_sanity(self):
+        # Candidate 0 must be in the committee (a TGD with an empty left hand side), hence candidate 1 is out (a DC),
+        # hence candidate 2 is in (the only possible representatives set of a TGD with the left hand side 0), and then
+        # candidate 3 is out (a DC group with max 1 member).
+        dc_candidates_sets = np.array([[0, 1], [4, 5]])
+        tgd_tuples_list = [(set(), np.array([[0]])), ({0}, np.array([[1], [2]])), ({4}, np.array([[5]]))]
+        dc_cardinality_groups = [([2, 3], 1)]
+        forced_in, forced_out = presolve.propagate_constraints(self.candidates_ids_set, dc_candidates_sets,
+                                                               tgd_tuples_list, dc_cardinality_groups)
+        self.assertEqual(forced_in, {0, 2})
+        self.assertEqual(forced_out, {1, 3})
+
+    def test_propagate_constraints_cardinality(self):
+        # A TGD group with exactly min_members possible members (candidate 6 is not a candidate).
+        forced_in, forced_out = presolve.propagate_constraints(self.candidates_ids_set,
+                                                               tgd_cardinality_groups=[([4, 5, 6], 2), ([0, 1], 1)])
+        self.assertEqual(forced_in, {4, 5})
+        self.assertEqual(forced_out, set())
+
+    def test_propagate_constraints_infeasible(self):
+        # Candidate 0 must be in the committee, but it cannot be with candidate 1, which must be in the committee too.
+        self.assertIsNone(presolve.propagate_constraints(self.candidates_ids_set, [{0, 1}],
+                                                         [(set(), [{0}]), (set(), [{1}])]))
+        # A TGD with an empty left hand side and no representatives.
+        self.assertIsNone(presolve.propagate_constraints(self.candidates_ids_set, tgd_tuples_list=[(set(), set())]))
+
+    def test_constraints_collector(self):
+        constraints_collector = presolve.ConstraintsCollector()
+        constraints_collector.define_dc(np.array([[0, 1]]))
+        constraints_collector.define_tgd_cardinality([[2, 3]], 1)
+        self.assertEqual(constraints_collector.dc_candidates_sets, [[0, 1]])
+        self.assertEqual(constraints_collector.tgd_cardinality_groups, [([2, 3], 1)])
+
+    def test_reduce_constraints(self):
+        forced_in, forced_out = {0, 2}, {1, 3}
+        self.assertEqual(presolve.reduce_dc_candidates_sets(np.array([[0, 1], [4, 5]]), forced_out).tolist(),
+                         [[4, 5]])
+        # The first TGD is satisfied, the second is never enforced, and the third loses a representatives set.
+        tgd_tuples_list = presolve.reduce_tgd_tuples_list(
+            [(set(), np.array([[0]])), ({1}, np.array([[4]])), ({0}, np.array([[3], [4]]))], forced_in, forced_out)
+        self.assertEqual(len(tgd_tuples_list), 1)
+        self.assertEqual(tgd_tuples_list[0][0], {0})
+        self.assertEqual(tgd_tuples_list[0][1].tolist(), [[4]])
+        self.assertEqual(presolve.reduce_dc_cardinality_groups([[1, 4, 5], [0, 3]], 1, forced_out), [[4, 5]])
+        self.assertEqual(presolve.reduce_tgd_cardinality_groups([[0, 4], [3, 4, 5]], 1, forced_in, forced_out),
+                         [[4, 5]])
+
+
+if __name__ == '__main__':
+    unittest.main()